@@ -1,24 +1,36 @@
 import os
 import sys
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 # Add the parent directory to Python path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from backend.db import init_db
 from backend.routes import api_bp  # make sure your routes handle feedback, sessions, etc.
 
+# Largest request body accepted (validation uploads are copied to disk)
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "500"))
+
 
 def create_app() -> Flask:
     load_dotenv()
 
     app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_MB * 1024 * 1024
     CORS(app)
 
+    # One pooled MongoClient per process; collection handles are resolved here, not per request
+    init_db()
+
     # Register blueprints
     app.register_blueprint(api_bp, url_prefix="/api")
 
+    @app.errorhandler(413)
+    def request_too_large(e):
+        return jsonify({"error": f"Request body exceeds {MAX_UPLOAD_MB} MB"}), 413
+
     @app.get("/health")
     def health_check():
         return {"status": "ok"}
@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 
@@ -10,6 +11,17 @@ class AppConfig:
 	collection_name: str
 	feedback_collection_name: str
 	session_collection_name: str
+	# Session actions live in bucket documents of up to actions_per_bucket entries
+	session_actions_collection_name: str = "session_actions"
+	actions_per_bucket: int = 100
+	# MongoClient pool, timeouts and write concern
+	max_pool_size: int = 100
+	min_pool_size: int = 0
+	server_selection_timeout_ms: int = 2000
+	connect_timeout_ms: int = 5000
+	socket_timeout_ms: Optional[int] = None
+	write_concern: str = "1"
+	journal: Optional[bool] = None
 
 
 def load_config() -> AppConfig:
@@ -20,6 +32,15 @@ def load_config() -> AppConfig:
 		collection_name=os.getenv("COLLECTION_NAME", "quality_stats"),
 		feedback_collection_name=os.getenv("FEEDBACK_COLLECTION_NAME", "feedback"),
 		session_collection_name=os.getenv("SESSION_COLLECTION_NAME", "user_sessions"),
+		session_actions_collection_name=os.getenv("SESSION_ACTIONS_COLLECTION_NAME", "session_actions"),
+		actions_per_bucket=int(os.getenv("SESSION_ACTIONS_PER_BUCKET", "100")),
+		max_pool_size=int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+		min_pool_size=int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+		server_selection_timeout_ms=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000")),
+		connect_timeout_ms=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+		socket_timeout_ms=int(os.environ["MONGO_SOCKET_TIMEOUT_MS"]) if os.getenv("MONGO_SOCKET_TIMEOUT_MS") else None,
+		write_concern=os.getenv("MONGO_WRITE_CONCERN", "1"),
+		journal=os.getenv("MONGO_JOURNAL", "").lower() in ("1", "true", "yes") if os.getenv("MONGO_JOURNAL") else None,
 	)
 
 
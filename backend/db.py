@@ -1,71 +1,684 @@
-from typing import Optional, Dict, List, Any, Callable
-from pymongo import MongoClient
+from typing import Optional, Dict, List, Any
+from pymongo import InsertOne, MongoClient, UpdateOne
 from pymongo.collection import Collection
+from pymongo.errors import ConfigurationError, ConnectionFailure, PyMongoError
+import atexit
+import bisect
+import logging
 import os
 import json
+import math
 import threading
+from datetime import datetime
 
-from backend.config import load_config
+from backend.config import AppConfig, load_config
+
+logger = logging.getLogger(__name__)
 
 
 _client: Optional[MongoClient] = None
 _use_mock = False
+_config: Optional[AppConfig] = None
+# Collection handles resolved once by init_db(), keyed by role
+_collections: Dict[str, Any] = {}
+_init_lock = threading.Lock()
 
 # Data directory for file-backed mock persistence
 _DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
-_FEEDBACK_FILE = os.path.join(_DATA_DIR, "feedback.json")
-_SESSIONS_FILE = os.path.join(_DATA_DIR, "sessions.json")
-_io_lock = threading.Lock()
+_MOCK_FILES = {
+    "quality": "quality_stats.json",
+    "feedback": "feedback.json",
+    "sessions": "sessions.json",
+    "session_actions": "session_actions.json",
+}
+# Mock writes are appended to a log; fsync and compaction run in the background
+_WAL_FSYNC_INTERVAL = float(os.getenv("MOCK_WAL_FSYNC_INTERVAL", "1.0"))
+_WAL_COMPACT_RECORDS = int(os.getenv("MOCK_WAL_COMPACT_RECORDS", "1000"))
+
+
+def _json_default(value: Any) -> Any:
+    # Datetimes round-trip as {"$date": iso} so they come back as datetimes
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return str(value)
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$date" in obj:
+        try:
+            return datetime.fromisoformat(obj["$date"])
+        except (TypeError, ValueError):
+            return obj
+    return obj
 
 
-def _ensure_data_dir() -> None:
-    os.makedirs(_DATA_DIR, exist_ok=True)
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
 
 
 def _load_mock_data(path: str) -> List[Dict[str, Any]]:
     try:
         if not os.path.exists(path):
             return []
-        with _io_lock:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # Basic validation to ensure it's a list of dicts
-                if isinstance(data, list):
-                    return [d for d in data if isinstance(d, dict)]
-                return []
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f, object_hook=_json_object_hook)
+            # Basic validation to ensure it's a list of dicts
+            if isinstance(data, list):
+                return [d for d in data if isinstance(d, dict)]
+            return []
     except Exception:
         # If loading fails, fall back to empty (avoid crashing app startup)
         return []
 
 
-def _save_mock_data(path: str, data: List[Dict[str, Any]]) -> None:
+class MockLog:
+    """
+    Snapshot plus append-only log for one mock collection.
+
+    ``<name>.json`` holds a snapshot (a JSON list of documents) and
+    ``<name>.log`` one JSON line per mutation with the document's full
+    post-image. Appends are flushed to the OS immediately and fsynced in
+    batches by a background thread, which also compacts the log into a new
+    snapshot once it holds ``compact_records`` entries: the log is rotated
+    to ``<name>.log.1`` and folded into the snapshot from disk, so writers
+    only wait for the rotation. Replaying a record is an upsert by ``_id``,
+    so a crash at any step of a compaction loses nothing.
+    """
+
+    def __init__(self, path: str, fsync_interval: float = _WAL_FSYNC_INTERVAL, compact_records: int = _WAL_COMPACT_RECORDS):
+        self.path = path
+        self.log_path = os.path.splitext(path)[0] + ".log"
+        self.rotated_path = self.log_path + ".1"
+        self.fsync_interval = fsync_interval
+        self.compact_records = compact_records
+        # Held by MockCollection around each mutation and its append
+        self.lock = threading.RLock()
+        self.data: List[Dict[str, Any]] = []
+        self._file = None
+        self._pending = 0
+        self._records = 0
+        self._needs_newline = False
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Read the snapshot and replay the log on top of it."""
+        with self.lock:
+            data = _load_mock_data(self.path)
+            for i, doc in enumerate(data):
+                # Files written before the log existed may lack ids
+                doc.setdefault("_id", f"mock_{i}")
+            # A rotated log left by an interrupted compaction predates the current one
+            self._replay(data, self.rotated_path)
+            self.data = data
+            self._records, self._needs_newline = self._replay(data, self.log_path)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"mock-log-{os.path.basename(self.path)}", daemon=True)
+                self._thread.start()
+        return data
+
+    @staticmethod
+    def _replay(data: List[Dict[str, Any]], log_path: str):
+        """
+        Upsert the post-images logged in ``log_path`` into ``data``.
+
+        Returns how many records were read and whether the last line is torn
+        (the next append must then start on a fresh line).
+        """
+        if not os.path.exists(log_path):
+            return 0, False
+        position = {doc.get("_id"): i for i, doc in enumerate(data)}
+        records = 0
+        torn = False
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                torn = not line.endswith("\n")
+                try:
+                    doc = json.loads(line, object_hook=_json_object_hook)["doc"]
+                except (ValueError, KeyError, TypeError):
+                    # A torn final line from a crash mid-append
+                    continue
+                records += 1
+                if doc.get("_id") in position:
+                    data[position[doc["_id"]]] = doc
+                else:
+                    position[doc.get("_id")] = len(data)
+                    data.append(doc)
+        return records, torn
+
+    def append(self, doc: Dict[str, Any]) -> None:
+        """Log one document's post-image. O(1) regardless of collection size."""
+        with self.lock:
+            if self._closed.is_set():
+                return
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                    self._file = open(self.log_path, "a", encoding="utf-8")
+                    if self._needs_newline:
+                        self._file.write("\n")
+                        self._needs_newline = False
+                self._file.write(_dumps({"op": "put", "doc": doc}) + "\n")
+                self._file.flush()
+                self._pending += 1
+                self._records += 1
+            except Exception:
+                # Swallow errors to avoid breaking API calls in mock mode
+                pass
+
+    def sync(self) -> None:
+        """fsync appended records."""
+        with self.lock:
+            if self._file is None or not self._pending:
+                return
+            try:
+                os.fsync(self._file.fileno())
+                self._pending = 0
+            except Exception:
+                pass
+
+    def compact(self) -> None:
+        """
+        Fold the log into a new snapshot.
+
+        Only the rotation of the log holds ``lock``. The snapshot is rebuilt
+        from the previous snapshot and the rotated log rather than from the
+        live documents, so serializing and fsyncing it never blocks writers.
+        """
+        try:
+            with self.lock:
+                # A rotated log still present (an earlier compaction failed) is folded first
+                if not os.path.exists(self.rotated_path):
+                    if not self._records:
+                        return
+                    if self._file is not None:
+                        self._file.flush()
+                        os.fsync(self._file.fileno())
+                        self._file.close()
+                        self._file = None
+                    os.replace(self.log_path, self.rotated_path)
+                    self._needs_newline = False
+                    self._pending = 0
+                    self._records = 0
+            data = []
+            if os.path.exists(self.path):
+                # Unlike load(), an unreadable snapshot must not be replaced by a partial one
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f, object_hook=_json_object_hook)
+            for i, doc in enumerate(data):
+                doc.setdefault("_id", f"mock_{i}")
+            self._replay(data, self.rotated_path)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(_dumps(data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            os.remove(self.rotated_path)
+        except Exception:
+            logger.exception("Compacting %s failed; the log keeps growing until a compaction succeeds", self.log_path)
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            self.sync()
+            if self._records >= self.compact_records:
+                self.compact()
+
+    def close(self) -> None:
+        """Stop the background thread and fsync what is left."""
+        self._closed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.sync()
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Indexes are created once per process, on first use of the real collection
+_indexes_ready = False
+
+
+def _comparable(doc_value: Any, query_value: Any) -> Any:
+    """Older mock files store datetimes as strings; parse them back for range comparisons."""
+    if isinstance(query_value, datetime) and isinstance(doc_value, str):
+        try:
+            return datetime.fromisoformat(doc_value)
+        except ValueError:
+            return None
+    return doc_value
+
+
+_RANGE_OPERATORS = {
+    "$gte": lambda a, b: a >= b,
+    "$gt": lambda a, b: a > b,
+    "$lte": lambda a, b: a <= b,
+    "$lt": lambda a, b: a < b,
+}
+
+
+def _in(value: Any, operand: Any) -> bool:
+    # Like MongoDB, an array field matches if any element is in the list
+    if isinstance(value, list):
+        return any(v in operand for v in value)
+    return value in operand
+
+
+_VALUE_OPERATORS = {
+    "$eq": lambda value, operand, present: value == operand,
+    # A missing field counts as null, so {"$ne": None} means "present and not null"
+    "$ne": lambda value, operand, present: value != operand,
+    "$in": lambda value, operand, present: _in(value, operand),
+    "$nin": lambda value, operand, present: not _in(value, operand),
+    "$exists": lambda value, operand, present: present == bool(operand),
+    "$type": lambda value, operand, present: present and _bson_type(value) in ([operand] if isinstance(operand, str) else operand),
+}
+
+
+def _bson_type(value: Any) -> str:
+    """MongoDB $type alias of a stored value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    for kind, alias in ((int, "int"), (float, "double"), (str, "string"), (datetime, "date"), (dict, "object"), (list, "array")):
+        if isinstance(value, kind):
+            return alias
+    return "object"
+
+
+def _is_operator_dict(expected: Any) -> bool:
+    return isinstance(expected, dict) and any(op.startswith("$") for op in expected)
+
+
+def _matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """Equality, range ($gte/$gt/$lte/$lt), $eq/$ne/$in/$nin/$exists/$type, $not and $or; other operators are not filtered on."""
+    for key, expected in (query or {}).items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in expected):
+                return False
+            continue
+        value = doc.get(key)
+        if _is_operator_dict(expected):
+            for op, operand in expected.items():
+                if op == "$not":
+                    if _matches(doc, {key: operand}):
+                        return False
+                    continue
+                check = _VALUE_OPERATORS.get(op)
+                if check is not None:
+                    if not check(value, operand, key in doc):
+                        return False
+                    continue
+                compare = _RANGE_OPERATORS.get(op)
+                if compare is None:
+                    continue
+                actual = _comparable(value, operand)
+                try:
+                    if actual is None or not compare(actual, operand):
+                        return False
+                except TypeError:
+                    return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Copy of ``doc`` limited by a top-level inclusion or exclusion projection."""
+    if not projection:
+        return dict(doc)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(fields.values()):
+        out = {k: doc[k] for k in fields if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    excluded = {k for k, v in projection.items() if not v}
+    return {k: v for k, v in doc.items() if k not in excluded}
+
+
+def _index_field(keys) -> str:
+    """Field a mock index covers: the key itself, or the first of a compound spec."""
+    if isinstance(keys, str):
+        return keys
+    first = keys[0]
+    return first if isinstance(first, str) else first[0]
+
+
+def _time_key(value: Any) -> Optional[datetime]:
+    """Sort key for the time part of an index; older files hold ISO strings."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+class MockIndex:
+    """
+    Index on one field: hash buckets for equality and a sorted list of the
+    datetime values for range terms, so time-window queries bisect instead
+    of scanning.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._buckets: Dict[Any, List[Dict[str, Any]]] = {}
+        # Documents whose value cannot be hashed (lists, dicts); always scanned
+        self._unhashable: List[Dict[str, Any]] = []
+        self._times: List[datetime] = []
+        self._timed_docs: List[Dict[str, Any]] = []
+        # Datetimes that cannot be ordered with the rest (e.g. tz-aware among naive)
+        self._unordered: List[Dict[str, Any]] = []
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        value = doc.get(self.field)
+        try:
+            self._buckets.setdefault(value, []).append(doc)
+        except TypeError:
+            self._unhashable.append(doc)
+        key = _time_key(value)
+        if key is not None:
+            try:
+                i = bisect.bisect_right(self._times, key)
+            except TypeError:
+                self._unordered.append(doc)
+                return
+            self._times.insert(i, key)
+            self._timed_docs.insert(i, doc)
+
+    def remove(self, doc: Dict[str, Any], value: Any) -> None:
+        try:
+            bucket = self._buckets.get(value, [])
+        except TypeError:
+            bucket = self._unhashable
+        _remove_identical(bucket, doc)
+        key = _time_key(value)
+        if key is not None and not _remove_identical(self._unordered, doc):
+            lo = bisect.bisect_left(self._times, key)
+            hi = bisect.bisect_right(self._times, key)
+            for i in range(lo, hi):
+                if self._timed_docs[i] is doc:
+                    del self._times[i]
+                    del self._timed_docs[i]
+                    break
+
+    def lookup(self, value: Any) -> Optional[List[Dict[str, Any]]]:
+        """Documents that may equal ``value``, or None if the index cannot answer."""
+        try:
+            bucket = self._buckets.get(value, [])
+        except TypeError:
+            return None
+        return bucket + self._unhashable if self._unhashable else bucket
+
+    def range(self, operators: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Documents that may satisfy datetime range ``operators``, or None if the index cannot answer."""
+        bounds = {op: operand for op, operand in operators.items() if op in _RANGE_OPERATORS}
+        if not bounds or len(bounds) != len(operators) or not all(isinstance(v, datetime) for v in bounds.values()):
+            return None
+        lo, hi = 0, len(self._times)
+        try:
+            if "$gte" in bounds:
+                lo = max(lo, bisect.bisect_left(self._times, bounds["$gte"]))
+            if "$gt" in bounds:
+                lo = max(lo, bisect.bisect_right(self._times, bounds["$gt"]))
+            if "$lte" in bounds:
+                hi = min(hi, bisect.bisect_right(self._times, bounds["$lte"]))
+            if "$lt" in bounds:
+                hi = min(hi, bisect.bisect_left(self._times, bounds["$lt"]))
+        except TypeError:
+            return None
+        return self._timed_docs[lo:hi] + self._unordered
+
+
+def _remove_identical(items: List[Any], item: Any) -> bool:
+    for i, candidate in enumerate(items):
+        if candidate is item:
+            del items[i]
+            return True
+    return False
+
+
+_MISSING = object()
+
+
+def _get_path(doc: Any, path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return _MISSING
+        doc = doc[part]
+    return doc
+
+
+def _value(value: Any) -> Any:
+    return None if value is _MISSING else value
+
+
+def _compare(op: str, a: Any, b: Any) -> bool:
+    # Aggregation comparisons order null below every other value
+    a, b = _value(a), _value(b)
+    if op == "$eq":
+        return a == b
+    if op == "$ne":
+        return a != b
+    if a is None or b is None:
+        a_rank, b_rank = a is not None, b is not None
+        return {"$gt": a_rank > b_rank, "$gte": a_rank >= b_rank, "$lt": a_rank < b_rank, "$lte": a_rank <= b_rank}[op]
     try:
-        _ensure_data_dir()
-        with _io_lock:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, default=str)
-    except Exception:
-        # Swallow errors to avoid breaking API calls in mock mode
-        pass
+        return _RANGE_OPERATORS[op](a, b)
+    except TypeError:
+        return False
+
+
+def _cond(args: Any, doc: Dict[str, Any]) -> Any:
+    if isinstance(args, dict):
+        args = [args["if"], args["then"], args["else"]]
+    return _evaluate(args[1] if _evaluate(args[0], doc) else args[2], doc)
+
+
+def _subtract(args: Any, doc: Dict[str, Any]) -> Any:
+    a, b = (_evaluate(arg, doc) for arg in args)
+    if a is None or b is None:
+        return None
+    if isinstance(a, datetime) or isinstance(b, datetime):
+        # Older mock files hold dates as strings
+        a, b = _time_key(a) or a, _time_key(b) or b
+    if isinstance(a, datetime) and isinstance(b, datetime):
+        # Date minus date is milliseconds, as in MongoDB
+        return (a - b).total_seconds() * 1000
+    return a - b
+
+
+def _round(args: Any, doc: Dict[str, Any]) -> Any:
+    value = _evaluate(args[0] if isinstance(args, list) else args, doc)
+    places = _evaluate(args[1], doc) if isinstance(args, list) and len(args) > 1 else 0
+    return None if value is None else round(value, places)
+
+
+def _divide(args: Any, doc: Dict[str, Any]) -> Any:
+    a, b = (_evaluate(arg, doc) for arg in args)
+    return None if a is None or b is None else a / b
+
+
+def _date_to_string(args: Dict[str, Any], doc: Dict[str, Any]) -> Any:
+    date = _time_key(_evaluate(args["date"], doc))
+    return date.strftime(args.get("format", "%Y-%m-%dT%H:%M:%S.%LZ").replace("%L", "000")) if date else None
+
+
+_EXPRESSIONS = {
+    "$cond": _cond,
+    "$ifNull": lambda args, doc: next((v for v in (_evaluate(a, doc) for a in args) if v is not None), None),
+    "$dateToString": _date_to_string,
+    "$subtract": _subtract,
+    "$divide": _divide,
+    "$round": _round,
+    **{op: (lambda op: lambda args, doc: _compare(op, _evaluate(args[0], doc), _evaluate(args[1], doc)))(op)
+       for op in ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte")},
+}
 
 
-# In-memory storage for when MongoDB is not available (loaded from disk on import)
-_mock_feedback: List[Dict[str, Any]] = _load_mock_data(_FEEDBACK_FILE)
-_mock_sessions: List[Dict[str, Any]] = _load_mock_data(_SESSIONS_FILE)
+def _evaluate(expr: Any, doc: Dict[str, Any]) -> Any:
+    """Evaluate the aggregation expressions the routes use ($field paths, $$NOW, $cond, $ifNull, comparisons, arithmetic, $dateToString)."""
+    if isinstance(expr, str) and expr.startswith("$$"):
+        if expr != "$$NOW":
+            raise ValueError(f"Unsupported variable in mock mode: {expr}")
+        return datetime.utcnow()
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _value(_get_path(doc, expr[1:]))
+    if isinstance(expr, dict):
+        if len(expr) == 1 and next(iter(expr)).startswith("$"):
+            op, args = next(iter(expr.items()))
+            if op not in _EXPRESSIONS:
+                raise ValueError(f"Unsupported aggregation expression in mock mode: {op}")
+            return _EXPRESSIONS[op](args, doc)
+        return {key: _evaluate(value, doc) for key, value in expr.items()}
+    if isinstance(expr, list):
+        return [_evaluate(value, doc) for value in expr]
+    return expr
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _percentiles(values: List[Any], spec: Dict[str, Any]) -> List[Any]:
+    # Nearest-rank percentiles; MongoDB's "approximate" method agrees on small inputs
+    values = sorted(v for v in values if _is_number(v))
+    if not values:
+        return [None for _ in spec["p"]]
+    return [values[max(0, math.ceil(p * len(values)) - 1)] for p in spec["p"]]
+
+
+_ACCUMULATORS = {
+    "$sum": lambda values, spec: sum(v for v in values if _is_number(v)),
+    "$avg": lambda values, spec: (lambda nums: sum(nums) / len(nums) if nums else None)([v for v in values if _is_number(v)]),
+    "$min": lambda values, spec: min((v for v in values if v is not None), default=None),
+    "$max": lambda values, spec: max((v for v in values if v is not None), default=None),
+    "$push": lambda values, spec: list(values),
+    "$first": lambda values, spec: values[0] if values else None,
+    "$percentile": _percentiles,
+}
+
+
+def _group(docs: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    groups: Dict[str, Any] = {}
+    for doc in docs:
+        key = _evaluate(spec["_id"], doc)
+        groups.setdefault(_dumps(key), (key, []))[1].append(doc)
+    out = []
+    for key, members in groups.values():
+        row = {"_id": key}
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            op, arg = next(iter(accumulator.items()))
+            if op not in _ACCUMULATORS:
+                raise ValueError(f"Unsupported accumulator in mock mode: {op}")
+            expression = arg["input"] if op == "$percentile" else arg
+            row[field] = _ACCUMULATORS[op]([_evaluate(expression, doc) for doc in members], arg)
+        out.append(row)
+    return out
+
+
+def _unwind(docs: List[Dict[str, Any]], spec: Any) -> List[Dict[str, Any]]:
+    path = (spec["path"] if isinstance(spec, dict) else spec)[1:]
+    out = []
+    for doc in docs:
+        values = _get_path(doc, path)
+        if values is _MISSING or values is None or values == []:
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            out.append({**doc, path: value})
+    return out
+
+
+def _sort_value(value: Any) -> Any:
+    # Nulls (and missing fields) sort before everything else
+    return (0, 0) if value is None else (1, value)
+
+
+def _sort_docs(docs: List[Dict[str, Any]], spec: Dict[str, int]) -> List[Dict[str, Any]]:
+    # Stable sorts applied from the last key to the first
+    for key, direction in reversed(list(spec.items())):
+        docs = sorted(docs, key=lambda d: _sort_value(_value(_get_path(d, key))), reverse=direction == -1)
+    return docs
+
+
+def _aggregate(docs: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            docs = [doc for doc in docs if _matches(doc, spec)]
+        elif name == "$group":
+            docs = _group(docs, spec)
+        elif name == "$unwind":
+            docs = _unwind(docs, spec)
+        elif name == "$sort":
+            docs = _sort_docs(docs, spec)
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$project":
+            docs = [_project(doc, spec) for doc in docs]
+        elif name == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        else:
+            raise ValueError(f"Unsupported pipeline stage in mock mode: {name}")
+    return docs
 
 
 class MockCollection:
     """Mock collection that mimics MongoDB collection interface and persists to disk."""
-    def __init__(self, data_store: List[Dict[str, Any]], on_change: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+    def __init__(self, data_store: List[Dict[str, Any]], log: Optional[MockLog] = None):
         self.data_store = data_store
-        self._on_change = on_change or (lambda _data: None)
-    
+        self._log = log
+        self._lock = log.lock if log is not None else threading.RLock()
+        # Like MongoDB, _id is always indexed
+        self._indexes: Dict[str, MockIndex] = {}
+        self.create_index("_id", name="_id_")
+
+    def create_index(self, keys, unique: bool = False, name: Optional[str] = None, **kwargs) -> str:
+        """
+        Index the first field of ``keys`` for equality and datetime ranges.
+
+        Accepts pymongo's key forms. Uniqueness is not enforced.
+        """
+        field = _index_field(keys)
+        with self._lock:
+            if field not in self._indexes:
+                index = MockIndex(field)
+                for doc in self.data_store:
+                    index.add(doc)
+                self._indexes[field] = index
+        return name or f"{field}_1"
+
+    def _candidates(self, query: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Smallest index result covering an equality or time-range term of ``query``, else every document."""
+        best = None
+        for key, expected in (query or {}).items():
+            index = self._indexes.get(key)
+            if index is None:
+                continue
+            bucket = index.range(expected) if _is_operator_dict(expected) else index.lookup(expected)
+            if bucket is not None and (best is None or len(bucket) < len(best)):
+                best = bucket
+        return self.data_store if best is None else best
+
     def insert_one(self, document: Dict[str, Any]):
-        from datetime import datetime
-        document['_id'] = f"mock_{len(self.data_store)}_{datetime.utcnow().timestamp()}"
-        self.data_store.append(document)
-        # persist
-        self._on_change(self.data_store)
+        with self._lock:
+            document['_id'] = f"mock_{len(self.data_store)}_{datetime.utcnow().timestamp()}"
+            self.data_store.append(document)
+            for index in self._indexes.values():
+                index.add(document)
+            # persist
+            if self._log is not None:
+                self._log.append(document)
         class Result:
             def __init__(self, id):
                 self.inserted_id = id
@@ -73,16 +686,16 @@ class MockCollection:
 	
     def find(self, query=None, projection=None):
         class MockCursor:
-            def __init__(self, data):
+            def __init__(self, data, projection=None):
                 self.data = data
+                self._projection = projection
                 self._skip = 0
                 self._limit = None
                 self._sort_key = None
-                self._sort_order = 1
             
             def sort(self, key, order=-1):
-                self._sort_key = key
-                self._sort_order = order
+                # A field and direction, or pymongo's list of (field, direction)
+                self._sort_key = key if isinstance(key, list) else [(key, order)]
                 return self
             
             def skip(self, count):
@@ -92,102 +705,287 @@ class MockCollection:
             def limit(self, count):
                 self._limit = count
                 return self
+
+            def batch_size(self, count):
+                return self
             
             def __iter__(self):
                 result = list(self.data)
                 if self._sort_key:
                     try:
-                        result.sort(key=lambda x: x.get(self._sort_key, ''), reverse=(self._sort_order == -1))
-                    except:
+                        result = _sort_docs(result, dict(self._sort_key))
+                    except TypeError:
                         pass
                 result = result[self._skip:]
                 if self._limit:
                     result = result[:self._limit]
-                return iter(result)
+                # Copies, as from a server: callers can modify them freely
+                return (_project(doc, self._projection) for doc in result)
         
-        return MockCursor(self.data_store)
+        return MockCursor([doc for doc in self._candidates(query) if _matches(doc, query)], projection)
     
-    def find_one(self, query):
-        for doc in self.data_store:
-            if all(doc.get(k) == v for k, v in query.items()):
-                return doc
+    def find_one(self, query, projection=None):
+        for doc in self._candidates(query):
+            if _matches(doc, query):
+                return _project(doc, projection)
         return None
     
-    def update_one(self, query, update):
-        for doc in self.data_store:
-            if all(doc.get(k) == v for k, v in query.items()):
-                if '$set' in update:
-                    doc.update(update['$set'])
-                if '$push' in update:
-                    for key, value in update['$push'].items():
-                        if key not in doc:
-                            doc[key] = []
-                        doc[key].append(value)
-                if '$inc' in update:
-                    for key, value in update['$inc'].items():
-                        doc[key] = doc.get(key, 0) + value
-                # persist
-                self._on_change(self.data_store)
-                class Result:
-                    matched_count = 1
-                return Result()
+    @staticmethod
+    def _modify(doc: Dict[str, Any], update) -> None:
+        """Apply ``update`` to ``doc`` in place, without touching indexes or the log."""
+        if isinstance(update, list):
+            # Pipeline update: each stage's expressions see the document as that stage starts
+            for stage in update:
+                (name, spec), = stage.items()
+                if name in ('$set', '$addFields'):
+                    doc.update({key: _evaluate(value, doc) for key, value in spec.items()})
+                elif name == '$unset':
+                    for key in [spec] if isinstance(spec, str) else spec:
+                        doc.pop(key, None)
+                else:
+                    raise ValueError(f"Unsupported update pipeline stage in mock mode: {name}")
+            update = {}
+        if '$set' in update:
+            doc.update(update['$set'])
+        if '$push' in update:
+            for key, value in update['$push'].items():
+                if key not in doc:
+                    doc[key] = []
+                if isinstance(value, dict) and '$each' in value:
+                    doc[key].extend(value['$each'])
+                else:
+                    doc[key].append(value)
+        if '$inc' in update:
+            for key, value in update['$inc'].items():
+                doc[key] = doc.get(key, 0) + value
+
+    def _apply_update(self, doc: Dict[str, Any], update) -> None:
+        before = {field: doc.get(field) for field in self._indexes}
+        self._modify(doc, update)
+        for field, index in self._indexes.items():
+            # By value: an equal value written as a new object keeps its entry
+            if doc.get(field) != before[field]:
+                index.remove(doc, before[field])
+                index.add(doc)
+        # persist
+        if self._log is not None:
+            self._log.append(doc)
+
+    def _upsert(self, query: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+        # New document from the query's equality terms, $setOnInsert, then the
+        # update; built in full first so it is indexed and logged once
+        document = {key: value for key, value in query.items() if not _is_operator_dict(value)}
+        if isinstance(update, dict):
+            document.update(update.get('$setOnInsert', {}))
+        self._modify(document, update)
+        self.insert_one(document)
+        return document
+
+    def _update(self, query, update, upsert: bool):
+        """Apply ``update`` to the first match; returns (document before, document after, upserted)."""
+        with self._lock:
+            for doc in self._candidates(query):
+                if _matches(doc, query):
+                    before = _project(doc, None)
+                    self._apply_update(doc, update)
+                    return before, doc, False
+            if upsert:
+                return None, self._upsert(query, update), True
+        return None, None, False
+
+    def update_one(self, query, update, upsert: bool = False):
+        before, after, upserted = self._update(query, update, upsert)
         class Result:
-            matched_count = 0
+            matched_count = 1 if after is not None and not upserted else 0
+            upserted_id = after['_id'] if upserted else None
         return Result()
+
+    def find_one_and_update(self, query, update, projection=None, upsert: bool = False, return_document: bool = False, **kwargs):
+        """``return_document`` follows pymongo: ReturnDocument.AFTER (True) returns the updated document."""
+        before, after, upserted = self._update(query, update, upsert)
+        doc = after if return_document else before
+        return _project(doc, projection) if doc is not None else None
 	
-    def count_documents(self, query):
+    def bulk_write(self, requests, ordered: bool = True, **kwargs):
+        """Apply pymongo InsertOne/UpdateOne requests in order."""
+        class Result:
+            inserted_count = 0
+            matched_count = 0
+            upserted_count = 0
+        result = Result()
+        with self._lock:
+            for op in requests:
+                if isinstance(op, InsertOne):
+                    self.insert_one(op._doc)
+                    result.inserted_count += 1
+                elif isinstance(op, UpdateOne):
+                    before, after, upserted = self._update(op._filter, op._doc, op._upsert)
+                    result.upserted_count += int(upserted)
+                    result.matched_count += int(after is not None and not upserted)
+                else:
+                    raise ValueError(f"Unsupported bulk operation in mock mode: {type(op).__name__}")
+        return result
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs):
+        """
+        Run a pipeline of $match/$group/$unwind/$sort/$skip/$limit/$project/$count.
+
+        A leading $match uses the indexes like find(); later stages work on
+        the matched documents only.
+        """
+        docs = self.data_store
+        if pipeline and "$match" in pipeline[0]:
+            query = pipeline[0]["$match"]
+            docs = [doc for doc in self._candidates(query) if _matches(doc, query)]
+            pipeline = pipeline[1:]
+        return iter(_aggregate(docs, pipeline))
+
+    def estimated_document_count(self, **kwargs):
         return len(self.data_store)
 
+    def count_documents(self, query):
+        if not query:
+            return len(self.data_store)
+        return sum(1 for doc in self._candidates(query) if _matches(doc, query))
+
+
+def _write_concern_w(value: str):
+    """MONGO_WRITE_CONCERN is a node count ("1") or a tag such as "majority"."""
+    return int(value) if value.isdigit() else value
+
+
+_mock_logs: Dict[str, MockLog] = {}
+
+
+def _close_mock_logs() -> None:
+    for log in _mock_logs.values():
+        log.close()
+    _mock_logs.clear()
+
+
+atexit.register(_close_mock_logs)
+
+
+def _mock_collections() -> Dict[str, Any]:
+    # Each mock collection replays <name>.json + <name>.log and appends to the log on changes
+    _close_mock_logs()
+    collections = {}
+    for name, filename in _MOCK_FILES.items():
+        log = MockLog(os.path.join(_DATA_DIR, filename))
+        _mock_logs[name] = log
+        collections[name] = MockCollection(log.load(), log=log)
+    return collections
+
+
+def _ensure_indexes(collections: Dict[str, Any]) -> None:
+    """Declare the indexes the routes rely on (MongoDB and mock alike)."""
+    # Date-range scans for /api/quality; one rollup per dataset, rule settings and day
+    collections["quality"].create_index([("date", 1), ("dataset", 1), ("rules", 1)], unique=True, name="date_dataset_rules")
+    # POST /quality recognises an upload it has already stored by its fingerprint
+    collections["quality"].create_index([("fingerprint", 1), ("dataset", 1)], name="fingerprint_dataset")
+    # /session/action and /session/end look sessions up by session_id
+    collections["sessions"].create_index("session_id", name="session_id")
+    # /analytics counts and averages sessions in a start_time window
+    collections["sessions"].create_index("start_time", name="start_time")
+    # One bucket per (session, sequence number); action breakdowns scan by session start
+    collections["session_actions"].create_index([("session_id", 1), ("seq", 1)], unique=True, name="session_seq")
+    collections["session_actions"].create_index("session_start", name="session_start")
+    # GET /feedback pages newest first by (timestamp, _id) keyset
+    collections["feedback"].create_index([("timestamp", -1), ("_id", -1)], name="timestamp_id")
+
+
+def init_db(config: Optional[AppConfig] = None, force: bool = False) -> bool:
+    """
+    Create the process-wide MongoClient and resolve collection handles once.
+
+    Called at app startup; the get_*_collection helpers call it lazily if it
+    has not run yet. Falls back to the file-backed mock store only when
+    MongoDB is unreachable; once connected, index errors are logged and the
+    real client is kept. ``force`` re-resolves the handles and, after an
+    earlier fallback, tries MongoDB again. Returns True when connected to MongoDB.
+    """
+    global _client, _use_mock, _config, _collections, _indexes_ready
+    with _init_lock:
+        if _collections and not force:
+            return not _use_mock
+        config = config or load_config()
+        _config = config
+        if force:
+            _use_mock = False
+        if not _use_mock:
+            try:
+                options = {
+                    "maxPoolSize": config.max_pool_size,
+                    "minPoolSize": config.min_pool_size,
+                    "serverSelectionTimeoutMS": config.server_selection_timeout_ms,
+                    "connectTimeoutMS": config.connect_timeout_ms,
+                    "w": _write_concern_w(config.write_concern),
+                }
+                if config.socket_timeout_ms is not None:
+                    options["socketTimeoutMS"] = config.socket_timeout_ms
+                if config.journal is not None:
+                    options["journal"] = config.journal
+                if _client is None:
+                    client = MongoClient(config.mongodb_uri, **options)
+                    client.admin.command('ping')  # Test connection
+                    _client = client
+            except (ConnectionFailure, ConfigurationError):
+                # Unreachable server or unusable URI: run on the local mock store
+                _use_mock = True
+        if not _use_mock:
+            db = _client[config.database_name]
+            collections = {
+                "quality": db[config.collection_name],
+                "feedback": db[config.feedback_collection_name],
+                "sessions": db[config.session_collection_name],
+                "session_actions": db[config.session_actions_collection_name],
+            }
+            if not _indexes_ready:
+                try:
+                    _ensure_indexes(collections)
+                    _indexes_ready = True
+                except PyMongoError:
+                    # e.g. a conflicting existing index, no createIndex privilege, or rows
+                    # that break a unique index: keep MongoDB, but say so loudly
+                    logger.exception(
+                        "Could not create the MongoDB indexes in %s; queries may be slow and "
+                        "unique constraints are not enforced until this is fixed", config.database_name,
+                    )
+            # Leaving the mock store (forced reconnect): stop its log writers
+            _close_mock_logs()
+            _collections = collections
+            return True
+        _collections = _mock_collections()
+        _ensure_indexes(_collections)
+        return False
+
+
+def _collection(name: str) -> Collection:
+    if not _collections:
+        init_db()
+    return _collections[name]
+
 
 def get_collection() -> Collection:
-    global _client, _use_mock
-    if _use_mock:
-        return MockCollection([])
-	
-    config = load_config()
-    try:
-        if _client is None:
-            _client = MongoClient(config.mongodb_uri, serverSelectionTimeoutMS=2000)
-            _client.admin.command('ping')  # Test connection
-        db = _client[config.database_name]
-        return db[config.collection_name]
-    except Exception:
-        _use_mock = True
-        # generic unnamed collection; no persistence target
-        return MockCollection([])
+    """Daily quality rollups: one document per (dataset, rules, day) with valid/warning/error counts."""
+    return _collection("quality")
 
 
 def get_feedback_collection() -> Collection:
-    global _client, _use_mock, _mock_feedback
-    if _use_mock:
-        # persist to feedback.json on changes
-        return MockCollection(_mock_feedback, on_change=lambda data: _save_mock_data(_FEEDBACK_FILE, data))
-	
-    config = load_config()
-    try:
-        if _client is None:
-            _client = MongoClient(config.mongodb_uri, serverSelectionTimeoutMS=2000)
-            _client.admin.command('ping')  # Test connection
-        db = _client[config.database_name]
-        return db[config.feedback_collection_name]
-    except Exception:
-        _use_mock = True
-        return MockCollection(_mock_feedback, on_change=lambda data: _save_mock_data(_FEEDBACK_FILE, data))
+    return _collection("feedback")
 
 
 def get_session_collection() -> Collection:
-    global _client, _use_mock, _mock_sessions
-    if _use_mock:
-        # persist to sessions.json on changes
-        return MockCollection(_mock_sessions, on_change=lambda data: _save_mock_data(_SESSIONS_FILE, data))
-	
-    config = load_config()
-    try:
-        if _client is None:
-            _client = MongoClient(config.mongodb_uri, serverSelectionTimeoutMS=2000)
-            _client.admin.command('ping')  # Test connection
-        db = _client[config.database_name]
-        return db[config.session_collection_name]
-    except Exception:
-        _use_mock = True
-        return MockCollection(_mock_sessions, on_change=lambda data: _save_mock_data(_SESSIONS_FILE, data))
+    return _collection("sessions")
+
+
+def get_session_actions_collection() -> Collection:
+    """Session actions in buckets: {session_id, seq, session_start, count, actions: [...]}."""
+    return _collection("session_actions")
+
+
+def get_config() -> AppConfig:
+    """Configuration init_db() was called with."""
+    if _config is None:
+        init_db()
+    return _config
@@ -0,0 +1,280 @@
+"""
+Validation jobs run by a local worker pool.
+
+``POST /api/validate`` saves the upload under ``data/jobs/<job_id>/`` and
+queues it on a process pool; workers run the same validation as the
+headless batch tool (``quality_core.batch.validate_file``) and write
+``<name>.summary.json`` / ``<name>.issues.csv`` next to it. Job state lives
+in ``job.json`` in that directory, written by whichever process changes
+it, so any API worker process can answer status and result requests.
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from quality_core.batch import CSV_SUFFIXES, EXCEL_SUFFIXES, validate_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+SUPPORTED_SUFFIXES = CSV_SUFFIXES | EXCEL_SUFFIXES
+
+JOBS_DIR = Path(os.path.dirname(__file__)) / "data" / "jobs"
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "2"))
+# Finished jobs (and their files) are removed after this long
+JOB_TTL_SECONDS = int(os.getenv("VALIDATION_JOB_TTL_SECONDS", str(24 * 3600)))
+# Running workers touch their job's heartbeat file this often
+JOB_HEARTBEAT_SECONDS = 30
+# Running jobs of other API processes whose heartbeat is this old are given up as failed
+JOB_TIMEOUT_SECONDS = int(os.getenv("VALIDATION_JOB_TIMEOUT_SECONDS", str(600)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_state_lock = threading.Lock()
+# Jobs this process has handed to its pool, by job id, until they finish
+_futures: Dict[str, Optional[Future]] = {}
+
+
+def _job_dir(job_id: str) -> Path:
+    return JOBS_DIR / job_id
+
+
+@contextmanager
+def _locked_state(job_dir: Path):
+    """Hold the job's ``job.lock`` so one read-modify-write of job.json runs at a time."""
+    with _state_lock, open(job_dir / "job.lock", "a") as lock:
+        if fcntl is not None:
+            # Released when the file is closed
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _write_state(job_dir: Path, **changes: Any) -> Dict[str, Any]:
+    """
+    Merge ``changes`` into job.json; returns the state now on disk.
+
+    Workers, status checks and pool callbacks all write here. Once a job is
+    done or failed its status is final, so a late stale check or crash report
+    cannot overwrite the outcome.
+    """
+    with _locked_state(job_dir):
+        state = _read_state(job_dir) or {}
+        if "status" in changes and state.get("status") in FINISHED_STATES:
+            return state
+        state.update(changes)
+        fd, tmp = tempfile.mkstemp(prefix="job.", suffix=".tmp", dir=job_dir)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f, default=str)
+            os.replace(tmp, job_dir / "job.json")
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return state
+
+
+def _read_state(job_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(job_dir / "job.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _heartbeat(job_dir: Path, stop: threading.Event) -> None:
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        (job_dir / "heartbeat").touch()
+
+
+def _last_alive(job_dir: Path) -> float:
+    """Latest of the job's last state change and its worker's last heartbeat."""
+    times = [(job_dir / "job.json").stat().st_mtime]
+    if (job_dir / "heartbeat").exists():
+        times.append((job_dir / "heartbeat").stat().st_mtime)
+    return max(times)
+
+
+def _run_job(job_dir: str, filename: str, options: Dict[str, Any]) -> None:
+    """Worker entry point: validate the saved upload and record the outcome in job.json."""
+    job_dir = Path(job_dir)
+    if _write_state(job_dir, status=JOB_RUNNING, started_at=datetime.utcnow().isoformat())["status"] != JOB_RUNNING:
+        # Already given up on (e.g. failed as stale while queued)
+        return
+    # Beats for as long as this worker lives, however long the validation takes
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_dir, stop), daemon=True).start()
+    try:
+        summary = validate_file(job_dir / filename, job_dir, **options)
+        _write_state(job_dir, status=JOB_DONE, finished_at=datetime.utcnow().isoformat(), rows=summary.get("rows"))
+    except Exception as e:
+        _write_state(job_dir, status=JOB_FAILED, finished_at=datetime.utcnow().isoformat(), error=f"{type(e).__name__}: {e}")
+    finally:
+        stop.set()
+
+
+def _owner_alive(pid: Optional[int]) -> bool:
+    """Whether the API process that queued a job (and owns its pool) still runs."""
+    if pid is None:
+        return False
+    if os.name == "nt":
+        # os.kill would terminate the process there; rely on the timeout instead
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _fail_if_stale(job_dir: Path, state: Dict[str, Any], timeout_seconds: int) -> Optional[Dict[str, Any]]:
+    """
+    Mark an unfinished job that can no longer finish as failed; returns the new state, or None.
+
+    Jobs of this process are alive while their future is pending in its
+    pool (a dead worker fails them through ``_on_done``). Jobs of another
+    live process only time out when their worker stops beating, so a long
+    validation is never given up on; queued ones wait for their owner.
+    """
+    if state.get("status") in FINISHED_STATES:
+        return None
+    owner_pid = state.get("owner_pid")
+    if owner_pid == os.getpid():
+        # Also covers a previous server process that had the same pid
+        if job_dir.name in _futures:
+            return None
+        reason = "it is no longer in this server's worker pool"
+    elif not _owner_alive(owner_pid):
+        reason = "the server process that queued it has stopped"
+    elif state.get("status") == JOB_RUNNING and _last_alive(job_dir) < time.time() - timeout_seconds:
+        reason = f"no heartbeat from its worker for {timeout_seconds}s"
+    else:
+        return None
+    return _write_state(job_dir, status=JOB_FAILED, finished_at=datetime.utcnow().isoformat(), error=f"Interrupted: {reason}")
+
+
+def _pool() -> ProcessPoolExecutor:
+    """The worker pool, rebuilt if a worker died and broke the previous one."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None and getattr(_executor, "_broken", False):
+            # Jobs still in the broken pool have already failed through _on_done
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            # Spawned, not forked: this process already runs MongoClient and mock-log
+            # threads whose held locks a forked worker would inherit
+            _executor = ProcessPoolExecutor(max_workers=VALIDATION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _on_done(job_dir: Path, future) -> None:
+    _futures.pop(job_dir.name, None)
+    # A worker that died (e.g. killed for memory) never wrote its own outcome
+    error = future.exception()
+    if error is not None:
+        _write_state(job_dir, status=JOB_FAILED, finished_at=datetime.utcnow().isoformat(), error=f"{type(error).__name__}: {error}")
+
+
+def submit_job(filename: str, data, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Save an upload and queue it; returns the job state.
+
+    ``data`` is a file-like object (e.g. Flask's FileStorage) copied to disk
+    in chunks. ``options`` are keyword arguments for ``validate_file``.
+    """
+    prune_jobs()
+    job_id = uuid.uuid4().hex
+    job_dir = _job_dir(job_id)
+    job_dir.mkdir(parents=True)
+    # Only the base name is kept, so uploads cannot escape the job directory
+    filename = os.path.basename(filename.replace("\\", "/")) or "upload.csv"
+    with open(job_dir / filename, "wb") as f:
+        shutil.copyfileobj(data, f, 1024 * 1024)
+    state = _write_state(
+        job_dir, job_id=job_id, status=JOB_QUEUED, file=filename, options=options,
+        owner_pid=os.getpid(), created_at=datetime.utcnow().isoformat(),
+    )
+    # Registered before submitting, so a status poll never finds it missing from the pool
+    _futures[job_id] = None
+    try:
+        try:
+            future = _pool().submit(_run_job, str(job_dir), filename, options)
+        except BrokenProcessPool:
+            # A worker died since the last check; _pool() now hands out a new pool
+            future = _pool().submit(_run_job, str(job_dir), filename, options)
+    except Exception:
+        _futures.pop(job_id, None)
+        raise
+    _futures[job_id] = future
+    future.add_done_callback(lambda f: _on_done(job_dir, f))
+    return state
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Current state of a job, or None if it does not exist."""
+    if not job_id.isalnum():
+        return None
+    state = _read_state(_job_dir(job_id))
+    if state:
+        state = _fail_if_stale(_job_dir(job_id), state, JOB_TIMEOUT_SECONDS) or state
+    return state
+
+
+def job_summary(job_id: str) -> Optional[Dict[str, Any]]:
+    """Counts, rule hits and per-day series of a finished job."""
+    state = get_job(job_id)
+    if not state or state.get("status") != JOB_DONE:
+        return None
+    with open(_job_dir(job_id) / f"{state['file']}.summary.json") as f:
+        return json.load(f)
+
+
+def job_issues_path(job_id: str) -> Optional[Path]:
+    """CSV of the rows that are not valid, for a finished job."""
+    state = get_job(job_id)
+    if not state or state.get("status") != JOB_DONE:
+        return None
+    return _job_dir(job_id) / f"{state['file']}.issues.csv"
+
+
+def prune_jobs(ttl_seconds: int = JOB_TTL_SECONDS, timeout_seconds: int = JOB_TIMEOUT_SECONDS) -> int:
+    """
+    Delete finished jobs older than ``ttl_seconds``; returns how many were removed.
+
+    Queued or running jobs that can no longer finish (see ``_fail_if_stale``)
+    are first marked failed, so they expire like any other finished job
+    instead of staying unfinished forever.
+    """
+    if not JOBS_DIR.is_dir():
+        return 0
+    removed = 0
+    cutoff = time.time() - ttl_seconds
+    for job_dir in JOBS_DIR.iterdir():
+        state = _read_state(job_dir)
+        if state:
+            state = _fail_if_stale(job_dir, state, timeout_seconds) or state
+        if state and state.get("status") in FINISHED_STATES and (job_dir / "job.json").stat().st_mtime < cutoff:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            removed += 1
+    return removed
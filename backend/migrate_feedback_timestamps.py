@@ -0,0 +1,109 @@
+"""
+One-time migration: store every feedback timestamp as a native datetime.
+
+Older feedback documents hold the timestamp as a formatted string
+("2024-01-01 12:00:00.000000"), an ISO string or an RFC 2822 date
+("Tue, 21 Oct 2025 19:14:33 GMT"). GET /api/feedback no longer parses
+these on read, so convert them once:
+
+    python -m backend.migrate_feedback_timestamps [--dry-run]
+
+Works against MongoDB or, when it is unreachable, the file-backed mock
+store. Timestamps that cannot be parsed are reported and left untouched.
+The exit status is non-zero if any remain.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+
+# Allow running as a script as well as ``python -m backend.migrate_feedback_timestamps``
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.db import get_feedback_collection, init_db
+
+
+# Layouts seen in stored feedback, tried in order after ISO 8601
+LEGACY_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S")
+BATCH_SIZE = 1000
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Naive-UTC datetime for a stored timestamp, or None if it cannot be read."""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str):
+        parsed = None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            pass
+        for fmt in LEGACY_FORMATS:
+            if parsed is not None:
+                break
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+        if parsed is None:
+            try:
+                parsed = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+    else:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def migrate(collection, dry_run: bool = False, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """Convert non-date timestamps in ``collection``; returns counts and the ids left unparsed."""
+    summary: Dict[str, Any] = {"scanned": 0, "converted": 0, "unparsed": []}
+    pending = []
+
+    def _flush():
+        if pending and not dry_run:
+            collection.bulk_write(pending, ordered=False)
+        pending.clear()
+
+    cursor = collection.find(
+        {"timestamp": {"$exists": True, "$not": {"$type": ["date", "null"]}}},
+        {"_id": 1, "timestamp": 1},
+    )
+    for doc in cursor:
+        summary["scanned"] += 1
+        parsed = parse_timestamp(doc["timestamp"])
+        if parsed is None:
+            summary["unparsed"].append(str(doc["_id"]))
+            continue
+        pending.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"timestamp": parsed}}))
+        summary["converted"] += 1
+        if len(pending) >= batch_size:
+            _flush()
+    _flush()
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert legacy feedback timestamps to native datetimes.")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Updates per bulk write")
+    args = parser.parse_args(argv)
+
+    connected = init_db()
+    summary = migrate(get_feedback_collection(), dry_run=args.dry_run, batch_size=args.batch_size)
+    target = "MongoDB" if connected else "mock store"
+    verb = "Would convert" if args.dry_run else "Converted"
+    print(f"{verb} {summary['converted']} of {summary['scanned']} legacy timestamp(s) in the {target}")
+    for doc_id in summary["unparsed"]:
+        print(f"❌ Unparseable timestamp left unchanged: {doc_id}")
+    return 1 if summary["unparsed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
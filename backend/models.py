@@ -86,14 +86,13 @@ class UserSession:
         self.end_time = datetime.utcnow()
     
     def to_dict(self) -> dict:
-        """Convert session to dictionary for MongoDB storage"""
+        """Convert session to its summary document (actions are stored in session_actions buckets)"""
         return {
             "session_id": self.session_id,
             "start_time": self.start_time,
             "end_time": self.end_time,
             "user_agent": self.user_agent,
             "ip_address": self.ip_address,
-            "actions": [action.to_dict() for action in self.actions],
             "duration_minutes": self.duration_minutes,
             "action_count": len(self.actions)
         }
@@ -109,7 +108,7 @@ class UserSession:
             ip_address=data.get("ip_address")
         )
         
-        # Reconstruct actions
+        # Reconstruct actions (embedded only in documents written before bucketing)
         for action_data in data.get("actions", []):
             action = SessionAction(
                 action=action_data["action"],
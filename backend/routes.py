@@ -1,9 +1,37 @@
-from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request
-from pymongo.errors import PyMongoError
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from flask import Blueprint, Response, jsonify, request, send_file, stream_with_context
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+from werkzeug.exceptions import RequestEntityTooLarge
 
-from backend.db import get_feedback_collection, get_session_collection
-from backend.models import Feedback, UserSession
+from backend.db import (
+    get_collection,
+    get_config,
+    get_feedback_collection,
+    get_session_actions_collection,
+    get_session_collection,
+)
+from backend.jobs import (
+    FINISHED_STATES,
+    JOB_DONE,
+    SUPPORTED_SUFFIXES,
+    get_job,
+    job_issues_path,
+    job_summary,
+    submit_job,
+)
+from backend.models import Feedback, SessionAction, UserSession
+from quality_core.batch import DUPLICATE_MODES
+from quality_core.validation import parse_identity_pairs
 
 api_bp = Blueprint("api", __name__)
 
@@ -13,6 +41,232 @@ def example():
     return jsonify({"message": "Hello from the API!"})
 
 
+QUALITY_STATUSES = ("valid", "warning", "error")
+# Upper bound on days per POST /quality (ten years of daily rollups)
+MAX_QUALITY_DAYS = 3660
+
+
+def _quality_range():
+    """Inclusive YYYY-MM-DD ``start``/``end`` query range, defaulting to the last 30 days."""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        start = datetime.strptime(request.args["start"], "%Y-%m-%d") if request.args.get("start") else today - timedelta(days=29)
+        end = datetime.strptime(request.args["end"], "%Y-%m-%d") if request.args.get("end") else today
+    except ValueError:
+        raise ValueError("start and end must be YYYY-MM-DD dates")
+    if start > end:
+        raise ValueError("start must not be after end")
+    return start, end
+
+
+def _quality_match(start, end):
+    """Rollup filter for ``[start, end]`` plus the optional ``dataset`` and ``rules`` query parameters."""
+    match = {"date": {"$gte": start, "$lt": end + timedelta(days=1)}}
+    for field in ("dataset", "rules"):
+        if request.args.get(field) is not None:
+            match[field] = request.args[field]
+    return match
+
+
+def _latest_variant(docs):
+    """
+    One rollup per (dataset, day): the most recently stored rule variant
+
+    The same file validated under other rule settings is stored as another
+    variant of the same rows; summing them all would count those rows twice.
+    """
+    latest = {}
+    for doc in docs:
+        key = (doc.get("dataset"), doc["date"])
+        if key not in latest or (doc.get("updated_at") or datetime.min) > (latest[key].get("updated_at") or datetime.min):
+            latest[key] = doc
+    return latest.values()
+
+
+@api_bp.route("/quality", methods=["GET"])
+def get_quality():
+    """
+    Daily valid/warning/error counts from the quality_stats rollups
+
+    Optional ``dataset`` and ``rules`` narrow the rollups; days of several
+    datasets are summed, using the latest rule variant of each dataset.
+    """
+    try:
+        try:
+            start, end = _quality_range()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        query = _quality_match(start, end)
+        dataset = request.args.get("dataset")
+
+        # Index range scan on (date, dataset, rules)
+        collection = get_collection()
+        fields = {"_id": 0, "date": 1, "dataset": 1, "updated_at": 1, **{status: 1 for status in QUALITY_STATUSES}}
+        days = {}
+        for doc in _latest_variant(collection.find(query, fields)):
+            day = doc["date"]
+            if isinstance(day, str):
+                day = datetime.fromisoformat(day)
+            key = day.strftime("%Y-%m-%d")
+            totals = days.setdefault(key, {"date": key, "valid": 0, "warning": 0, "error": 0})
+            for status in QUALITY_STATUSES:
+                totals[status] += int(doc.get(status, 0) or 0)
+
+        return jsonify({
+            "data": [days[key] for key in sorted(days)],
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+            "dataset": dataset
+        }), 200
+
+    except PyMongoError as e:
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+def _period_totals(counts):
+    totals = {status: int(counts.get(status) or 0) for status in QUALITY_STATUSES}
+    totals["total"] = sum(totals.values())
+    totals["dq_score"] = round(totals["valid"] / totals["total"] * 100, 2) if totals["total"] else None
+    return totals
+
+
+@api_bp.route("/quality/compare", methods=["GET"])
+def compare_quality():
+    """
+    Totals for a date range and for the equally long period right before it
+
+    Same ``start``/``end``/``dataset``/``rules`` parameters as GET /quality.
+    One aggregation over the (date, dataset, rules) index covers both
+    windows: it keeps the latest rule variant per (dataset, day), then
+    labels each rollup current or previous by its date.
+    """
+    try:
+        try:
+            start, end = _quality_range()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        days = (end - start).days + 1
+        previous_start = start - timedelta(days=days)
+        
+        match = _quality_match(previous_start, end)
+        dataset = request.args.get("dataset")
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"updated_at": -1}},
+            {"$group": {
+                "_id": {"dataset": "$dataset", "date": "$date"},
+                "date": {"$first": "$date"},
+                **{status: {"$first": f"${status}"} for status in QUALITY_STATUSES},
+            }},
+            {"$group": {
+                "_id": {"$cond": [{"$gte": ["$date", start]}, "current", "previous"]},
+                **{status: {"$sum": f"${status}"} for status in QUALITY_STATUSES},
+            }},
+        ]
+        periods = {doc["_id"]: doc for doc in get_collection().aggregate(pipeline)}
+        
+        return jsonify({
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+            "previous_start": previous_start.strftime("%Y-%m-%d"),
+            "previous_end": (start - timedelta(days=1)).strftime("%Y-%m-%d"),
+            "dataset": dataset,
+            "current": _period_totals(periods.get("current", {})),
+            "previous": _period_totals(periods.get("previous", {})),
+        }), 200
+        
+    except PyMongoError as e:
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@api_bp.route("/quality", methods=["POST"])
+def store_quality():
+    """
+    Store one upload's daily valid/warning/error counts as quality_stats rollups
+
+    Body: {"dataset": "orders.csv", "rules": "<rule settings>", "fingerprint":
+    "<content hash>", "daily": [{"date": "YYYY-MM-DD", "valid": 10, "warning": 2,
+    "error": 1}, ...]}; ``rules`` is optional. Every (date, dataset, rules)
+    rollup is upserted in one bulk write. An upload whose fingerprint is
+    already stored for each of its days is not written again. Days already
+    stored from a different upload are kept and listed under ``skipped``,
+    unless the body sets ``"replace": true``.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        dataset = data.get("dataset")
+        rules = data.get("rules", "")
+        fingerprint = data.get("fingerprint")
+        daily = data.get("daily")
+        if not isinstance(dataset, str) or not dataset.strip():
+            return jsonify({"error": "dataset is required"}), 400
+        if not isinstance(rules, str):
+            return jsonify({"error": "rules must be a string"}), 400
+        if not isinstance(fingerprint, str) or not fingerprint:
+            return jsonify({"error": "fingerprint is required"}), 400
+        if not isinstance(daily, list) or not daily:
+            return jsonify({"error": "daily must be a non-empty list"}), 400
+        if len(daily) > MAX_QUALITY_DAYS:
+            return jsonify({"error": f"At most {MAX_QUALITY_DAYS} days per request"}), 400
+        
+        days = {}
+        for item in daily:
+            try:
+                day = datetime.strptime(item["date"][:10], "%Y-%m-%d")
+                counts = {status: int(item.get(status) or 0) for status in QUALITY_STATUSES}
+            except (KeyError, TypeError, ValueError, AttributeError):
+                return jsonify({"error": "Each day needs a YYYY-MM-DD date and integer counts"}), 400
+            if day in days:
+                return jsonify({"error": f"Duplicate date {item['date'][:10]}"}), 400
+            if min(counts.values()) < 0:
+                return jsonify({"error": "Counts must not be negative"}), 400
+            days[day] = counts
+        
+        dataset = dataset.strip()
+        result = {"dataset": dataset, "rules": rules, "fingerprint": fingerprint, "days": len(days)}
+        collection = get_collection()
+        if collection.count_documents({"fingerprint": fingerprint, "dataset": dataset, "rules": rules, "date": {"$in": list(days)}}) == len(days):
+            return jsonify({"message": "Upload already stored", **result, "stored": 0}), 200
+        
+        skipped = []
+        if data.get("replace") is not True:
+            held = collection.find(
+                {"dataset": dataset, "rules": rules, "date": {"$in": list(days)}, "fingerprint": {"$ne": fingerprint}},
+                {"_id": 0, "date": 1},
+            )
+            skipped = sorted(doc["date"] for doc in held)
+            for day in skipped:
+                del days[day]
+        result["skipped"] = [day.strftime("%Y-%m-%d") for day in skipped]
+        if not days:
+            return jsonify({"message": "Days already stored from another upload", **result, "stored": 0}), 200
+        
+        now = datetime.utcnow()
+        collection.bulk_write([
+            UpdateOne(
+                {"date": day, "dataset": dataset, "rules": rules},
+                {"$set": {**counts, "fingerprint": fingerprint, "updated_at": now}},
+                upsert=True,
+            )
+            for day, counts in sorted(days.items())
+        ], ordered=False)
+        return jsonify({"message": "Quality stats stored", **result, "stored": len(days)}), 201
+        
+    except PyMongoError as e:
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+# Timestamp layout GET /feedback returns (what the dashboard's table expects)
+FEEDBACK_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
 @api_bp.route("/feedback", methods=["POST"])
 def submit_feedback():
     """Submit user feedback"""
@@ -34,12 +288,11 @@ def submit_feedback():
         if not text:
             return jsonify({"error": "Feedback text cannot be empty"}), 400
         
-        # Create feedback object with timestamp formatted to match frontend expectations
-        timestamp_str = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+        # Stored as a native datetime (indexed); GET /feedback formats it for the frontend
         feedback = Feedback(
             rating=rating,
             text=text,
-            timestamp=timestamp_str,  # store as formatted string
+            timestamp=datetime.utcnow(),
             user_id=data.get('user_id'),
             session_id=data.get('session_id')
         )
@@ -59,60 +312,128 @@ def submit_feedback():
         return jsonify({"error": "An unexpected error occurred"}), 500
 
 
+# Feedback order and the keyset it pages by (backed by the timestamp_id index)
+FEEDBACK_SORT = [("timestamp", -1), ("_id", -1)]
+FEEDBACK_COUNT_MODES = ("estimated", "exact", "none")
+# Exact feedback counts are reused for this long
+FEEDBACK_COUNT_TTL_SECONDS = 60
+_feedback_count_cache = {"value": None, "expires": 0.0}
+_feedback_count_lock = threading.Lock()
+
+
+def _feedback_cursor_token(doc):
+    """Opaque ``after`` value for the page that follows ``doc``."""
+    return f"{doc['timestamp'].isoformat()},{doc['_id']}"
+
+
+def _parse_feedback_cursor(token):
+    """``<iso timestamp>,<_id>`` -> keyset filter for documents strictly after it."""
+    timestamp_str, _, doc_id = token.partition(",")
+    timestamp = datetime.fromisoformat(timestamp_str)
+    if not doc_id:
+        raise ValueError("after must be <timestamp>,<_id>")
+    doc_id = ObjectId(doc_id) if ObjectId.is_valid(doc_id) else doc_id
+    return {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "_id": {"$lt": doc_id}},
+    ]}
+
+
+LEGACY_TIMESTAMP_MESSAGE = (
+    "Some feedback timestamps are still strings; run python -m backend.migrate_feedback_timestamps. "
+    "Until then use page-based paging (next_page)."
+)
+
+
+def _has_legacy_timestamps(collection):
+    # Type-bracketed bounds on the timestamp index, so this never scans the collection.
+    # String timestamps sort after every date, so the keyset filter can never reach them
+    return collection.find_one({"timestamp": {"$type": "string"}}, {"_id": 1}) is not None
+
+
+def _feedback_total(collection, mode):
+    if mode == "estimated":
+        # Collection metadata; does not scan
+        return collection.estimated_document_count()
+    with _feedback_count_lock:
+        if _feedback_count_cache["value"] is None or time.monotonic() >= _feedback_count_cache["expires"]:
+            _feedback_count_cache["value"] = collection.count_documents({})
+            _feedback_count_cache["expires"] = time.monotonic() + FEEDBACK_COUNT_TTL_SECONDS
+        return _feedback_count_cache["value"]
+
+
 @api_bp.route("/feedback", methods=["GET"])
 def get_feedback():
-    """Get all feedback (admin endpoint)"""
+    """
+    Get feedback, newest first (admin endpoint)
+
+    Pages by keyset: pass the previous response's ``next_after`` as
+    ``after`` to continue, so deep pages cost the same as the first.
+    ``count`` is ``estimated`` (default, from collection metadata),
+    ``exact`` (cached for a minute) or ``none``. ``page`` still works for
+    older clients but skips through the index. While string timestamps from
+    before the migration remain, responses carry ``legacy_timestamps`` and
+    ``next_page`` instead of ``next_after``, and ``after`` is refused with 409.
+    """
     try:
         collection = get_feedback_collection()
         
         # Get query parameters for pagination
-        page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 50))
-        skip = (page - 1) * limit
+        if limit < 1:
+            return jsonify({"error": "limit must be positive"}), 400
+        count_mode = request.args.get('count', 'estimated')
+        if count_mode not in FEEDBACK_COUNT_MODES:
+            return jsonify({"error": f"count must be one of {', '.join(FEEDBACK_COUNT_MODES)}"}), 400
+        
+        query = {}
+        skip = 0
+        page = None
+        if request.args.get('after'):
+            try:
+                query = _parse_feedback_cursor(request.args['after'])
+            except ValueError:
+                return jsonify({"error": "after must be <ISO timestamp>,<_id> from next_after"}), 400
+            if _has_legacy_timestamps(collection):
+                return jsonify({"error": LEGACY_TIMESTAMP_MESSAGE, "legacy_timestamps": True}), 409
+        elif request.args.get('page'):
+            page = int(request.args['page'])
+            skip = (page - 1) * limit
+        
+        # Index scan on (timestamp, _id), newest first
+        feedback_cursor = collection.find(query).sort(FEEDBACK_SORT).skip(skip).limit(limit)
         
-        # Get total count
-        total_count = collection.count_documents({})
-        
-        # Get feedback with pagination, sorted by timestamp (newest first)
-        feedback_cursor = collection.find({}).sort("timestamp", -1).skip(skip).limit(limit)
-        
-        def _to_fmt(val):
-            # Convert datetime or known string formats to '%Y-%m-%d %H:%M:%S.%f'
-            if isinstance(val, datetime):
-                return val.strftime("%Y-%m-%d %H:%M:%S.%f")
-            if isinstance(val, str):
-                # Try RFC 2822/HTTP-date (e.g., Tue, 21 Oct 2025 19:14:33 GMT)
-                try:
-                    from email.utils import parsedate_to_datetime
-                    dt = parsedate_to_datetime(val)
-                    if isinstance(dt, datetime):
-                        return dt.strftime("%Y-%m-%d %H:%M:%S.%f")
-                except Exception:
-                    pass
-                # Try common Python datetime string 'YYYY-mm-dd HH:MM:SS[.ffffff]'
-                for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
-                    try:
-                        dt = datetime.strptime(val, fmt)
-                        return dt.strftime("%Y-%m-%d %H:%M:%S.%f")
-                    except Exception:
-                        continue
-                return val
-            return val
-
         feedback_list = []
+        last = None
         for doc in feedback_cursor:
+            last = {"timestamp": doc.get('timestamp'), "_id": doc['_id']}
             doc['_id'] = str(doc['_id'])  # Convert ObjectId to string
-            if 'timestamp' in doc:
-                doc['timestamp'] = _to_fmt(doc['timestamp'])
+            # Datetimes since the timestamp migration; see backend/migrate_feedback_timestamps.py
+            if isinstance(doc.get('timestamp'), datetime):
+                doc['timestamp'] = doc['timestamp'].strftime(FEEDBACK_TIMESTAMP_FORMAT)
             feedback_list.append(doc)
         
-        return jsonify({
+        response = {
             "feedback": feedback_list,
-            "total_count": total_count,
-            "page": page,
             "limit": limit,
-            "total_pages": (total_count + limit - 1) // limit
-        }), 200
+            "next_after": None
+        }
+        if len(feedback_list) == limit:
+            if not query and _has_legacy_timestamps(collection):
+                # Keyset paging would silently stop before the string timestamps
+                response["legacy_timestamps"] = True
+                response["warning"] = LEGACY_TIMESTAMP_MESSAGE
+                response["next_page"] = (page or 1) + 1
+            elif isinstance(last["timestamp"], datetime):
+                response["next_after"] = _feedback_cursor_token(last)
+        if page is not None:
+            response["page"] = page
+        if count_mode != "none":
+            total_count = _feedback_total(collection, count_mode)
+            response["total_count"] = total_count
+            response["total_pages"] = (total_count + limit - 1) // limit
+        
+        return jsonify(response), 200
         
     except PyMongoError as e:
         return jsonify({"error": "Database error occurred"}), 500
@@ -157,6 +478,79 @@ def start_session():
         return jsonify({"error": "An unexpected error occurred"}), 500
 
 
+# Upper bound on actions accepted by one POST /session/actions
+MAX_BATCH_ACTIONS = 1000
+
+
+def _append_actions(actions_by_session):
+    """
+    Record actions, given as {session_id: [action dict, ...]} in order.
+
+    Each session's counters are bumped with one find_one_and_update, which
+    both checks that the session exists and reserves a contiguous range of
+    action numbers; the actions then go to their buckets in one bulk write.
+    If bucket writes fail, the counts of the actions they carried are taken
+    back off the sessions before the error is raised. Returns the session
+    ids that were not found.
+    """
+    now = datetime.utcnow()
+    bucket_size = get_config().actions_per_bucket
+    sessions = get_session_collection()
+    writes = []
+    # (session_id, number of actions) for each entry of ``writes``
+    write_counts = []
+    unknown = []
+    for session_id, actions in actions_by_session.items():
+        session_doc = sessions.find_one_and_update(
+            {"session_id": session_id},
+            {"$inc": {"action_count": len(actions)}, "$set": {"last_action_time": now}},
+            projection={"_id": 0, "action_count": 1, "start_time": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not session_doc:
+            unknown.append(session_id)
+            continue
+        # Numbers first..first+len-1 are ours; each bucket holds bucket_size of them
+        first = session_doc["action_count"] - len(actions)
+        buckets = {}
+        for number, action in enumerate(actions, start=first):
+            buckets.setdefault(number // bucket_size, []).append(action)
+        for seq, bucket_actions in buckets.items():
+            writes.append(UpdateOne(
+                {"session_id": session_id, "seq": seq},
+                {
+                    "$push": {"actions": {"$each": bucket_actions}},
+                    "$inc": {"count": len(bucket_actions)},
+                    "$setOnInsert": {"session_start": session_doc.get("start_time")}
+                },
+                upsert=True
+            ))
+            write_counts.append((session_id, len(bucket_actions)))
+    if writes:
+        try:
+            get_session_actions_collection().bulk_write(writes, ordered=False)
+        except BulkWriteError as e:
+            _release_action_counts(write_counts[err["index"]] for err in e.details.get("writeErrors", []))
+            raise
+        except PyMongoError:
+            # Nothing reports which writes landed; treat the batch as not written
+            _release_action_counts(write_counts)
+            raise
+    return unknown
+
+
+def _release_action_counts(failed):
+    """Take the actions of failed bucket writes, as (session_id, count) pairs, back off action_count."""
+    released = {}
+    for session_id, count in failed:
+        released[session_id] = released.get(session_id, 0) + count
+    if released:
+        get_session_collection().bulk_write([
+            UpdateOne({"session_id": session_id}, {"$inc": {"action_count": -count}})
+            for session_id, count in released.items()
+        ], ordered=False)
+
+
 @api_bp.route("/session/action", methods=["POST"])
 def track_action():
     """Track a user action within a session"""
@@ -171,29 +565,10 @@ def track_action():
         action = data.get('action')
         metadata = data.get('metadata', {})
         
-        # Find the session
-        collection = get_session_collection()
-        session_doc = collection.find_one({"session_id": session_id})
-        
-        if not session_doc:
+        new_action = SessionAction(action=action, timestamp=datetime.utcnow(), metadata=metadata).to_dict()
+        if _append_actions({session_id: [new_action]}):
             return jsonify({"error": "Session not found"}), 404
         
-        # Add action to session
-        new_action = {
-            "action": action,
-            "timestamp": datetime.utcnow(),
-            "metadata": metadata
-        }
-        
-        # Update session with new action
-        collection.update_one(
-            {"session_id": session_id},
-            {
-                "$push": {"actions": new_action},
-                "$inc": {"action_count": 1}
-            }
-        )
-        
         return jsonify({
             "message": "Action tracked successfully",
             "session_id": session_id,
@@ -207,6 +582,62 @@ def track_action():
         return jsonify({"error": "An unexpected error occurred"}), 500
 
 
+@api_bp.route("/session/actions", methods=["POST"])
+def track_actions():
+    """
+    Track a batch of actions for one or more sessions
+
+    Body: {"actions": [{"session_id", "action", "metadata"?, "timestamp"?}, ...]},
+    with an optional top-level "session_id" as the default. Clients can
+    buffer actions and flush them here; "timestamp" (ISO 8601) records
+    when the action happened rather than when it was flushed. The batch is
+    validated as a whole before anything is written.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('actions')
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "actions must be a non-empty list"}), 400
+        if len(items) > MAX_BATCH_ACTIONS:
+            return jsonify({"error": f"At most {MAX_BATCH_ACTIONS} actions per request"}), 400
+        
+        now = datetime.utcnow()
+        actions_by_session = {}
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                return jsonify({"error": f"actions[{i}] must be an object"}), 400
+            session_id = item.get('session_id') or data.get('session_id')
+            if not session_id or not item.get('action'):
+                return jsonify({"error": f"actions[{i}]: session_id and action are required"}), 400
+            timestamp = now
+            if item.get('timestamp'):
+                try:
+                    timestamp = datetime.fromisoformat(str(item['timestamp']))
+                except ValueError:
+                    return jsonify({"error": f"actions[{i}]: timestamp must be ISO 8601"}), 400
+                if timestamp.tzinfo is not None:
+                    # Stored like the server's own utcnow() timestamps: naive UTC
+                    timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            action = SessionAction(action=item['action'], timestamp=timestamp, metadata=item.get('metadata'))
+            actions_by_session.setdefault(session_id, []).append(action.to_dict())
+        
+        unknown = _append_actions(actions_by_session)
+        if len(unknown) == len(actions_by_session):
+            return jsonify({"error": "Session not found", "unknown_sessions": unknown}), 404
+        
+        return jsonify({
+            "message": "Actions tracked successfully",
+            "accepted": sum(len(actions) for session_id, actions in actions_by_session.items() if session_id not in unknown),
+            "rejected": sum(len(actions_by_session[session_id]) for session_id in unknown),
+            "unknown_sessions": unknown
+        }), 200
+        
+    except PyMongoError as e:
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
 @api_bp.route("/session/end", methods=["POST"])
 def end_session():
     """End a user session"""
@@ -219,38 +650,27 @@ def end_session():
         
         session_id = data.get('session_id')
         
-        # Find and update the session
-        collection = get_session_collection()
+        # One atomic pipeline update: close the session and compute its duration
+        # from the stored start_time on the server, returning the result
         end_time = datetime.utcnow()
-        
-        result = collection.update_one(
+        session_doc = get_session_collection().find_one_and_update(
             {"session_id": session_id, "end_time": None},
-            {
-                "$set": {
-                    "end_time": end_time
-                }
-            }
+            [{"$set": {
+                "end_time": end_time,
+                "duration_minutes": {"$round": [{"$divide": [{"$subtract": [end_time, "$start_time"]}, 60000]}, 2]}
+            }}],
+            projection={"_id": 0, "duration_minutes": 1},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if session_doc is None:
             return jsonify({"error": "Active session not found"}), 404
         
-        # Calculate duration
-        session_doc = collection.find_one({"session_id": session_id})
-        if session_doc:
-            start_time = session_doc["start_time"]
-            duration = (end_time - start_time).total_seconds() / 60
-            
-            # Update with duration
-            collection.update_one(
-                {"session_id": session_id},
-                {"$set": {"duration_minutes": round(duration, 2)}}
-            )
-        
         return jsonify({
             "message": "Session ended successfully",
             "session_id": session_id,
-            "end_time": end_time.isoformat()
+            "end_time": end_time.isoformat(),
+            "duration_minutes": session_doc.get("duration_minutes")
         }), 200
         
     except PyMongoError as e:
@@ -259,59 +679,338 @@ def end_session():
         return jsonify({"error": "An unexpected error occurred"}), 500
 
 
+ANALYTICS_BREAKDOWNS = ("day", "action", "percentiles")
+DURATION_PERCENTILES = (0.5, 0.95)
+
+
+def _is_set(field):
+    """Aggregation expression: ``field`` is present and not null."""
+    return {"$gt": [f"${field}", None]}
+
+
+def _duration_percentiles(collection, match, timed_sessions):
+    """p50/p95 of duration_minutes over ``match``, computed by the server."""
+    timed = {**match, "duration_minutes": {"$ne": None}}
+    try:
+        rows = list(collection.aggregate([
+            {"$match": timed},
+            {"$group": {"_id": None, "p": {"$percentile": {
+                "input": "$duration_minutes", "p": list(DURATION_PERCENTILES), "method": "approximate"
+            }}}},
+        ]))
+        values = rows[0]["p"] if rows else [None] * len(DURATION_PERCENTILES)
+    except OperationFailure:
+        # Servers before MongoDB 7.0 lack $percentile: fetch the nearest-rank value per percentile
+        values = []
+        for p in DURATION_PERCENTILES:
+            rank = max(0, math.ceil(p * timed_sessions) - 1)
+            rows = list(collection.aggregate([
+                {"$match": timed},
+                {"$sort": {"duration_minutes": 1}},
+                {"$skip": rank},
+                {"$limit": 1},
+                {"$project": {"_id": 0, "duration_minutes": 1}},
+            ])) if timed_sessions else []
+            values.append(rows[0]["duration_minutes"] if rows else None)
+    return {f"p{round(p * 100)}": (round(v, 2) if v is not None else None) for p, v in zip(DURATION_PERCENTILES, values)}
+
+
 @api_bp.route("/analytics", methods=["GET"])
 def get_analytics():
-    """Get user analytics and session statistics (admin endpoint)"""
+    """
+    Get user analytics and session statistics (admin endpoint)
+
+    Totals come from one $match + $group on the server. ``breakdown`` adds
+    any of: day (per-day sessions), action (counts per action type),
+    percentiles (p50/p95 duration), e.g. ``?breakdown=day,percentiles``.
+    """
     try:
         collection = get_session_collection()
         
         # Get query parameters
         days = int(request.args.get('days', 7))  # Default to last 7 days
+        breakdowns = {b.strip() for b in request.args.get('breakdown', '').split(',') if b.strip()}
+        unknown = breakdowns - set(ANALYTICS_BREAKDOWNS)
+        if unknown:
+            return jsonify({"error": f"Unknown breakdown: {', '.join(sorted(unknown))}. Use {', '.join(ANALYTICS_BREAKDOWNS)}"}), 400
         
         # Calculate date range
         end_date = datetime.utcnow()
-        start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Simple date calculation for recent days
         start_date = end_date - timedelta(days=days)
-        
-        # Get basic session statistics
-        total_sessions = collection.count_documents({
-            "start_time": {"$gte": start_date, "$lte": end_date}
-        })
-        
-        completed_sessions = collection.count_documents({
-            "start_time": {"$gte": start_date, "$lte": end_date},
-            "end_time": {"$ne": None}
-        })
-        
-        # Get sessions with duration for average calculation
-        sessions_with_duration = list(collection.find({
-            "start_time": {"$gte": start_date, "$lte": end_date},
-            "duration_minutes": {"$ne": None}
-        }, {"duration_minutes": 1, "action_count": 1}))
-        
-        avg_duration = 0
-        avg_actions = 0
-        total_actions = 0
-        
-        if sessions_with_duration:
-            avg_duration = sum(s.get("duration_minutes", 0) for s in sessions_with_duration) / len(sessions_with_duration)
-            avg_actions = sum(s.get("action_count", 0) for s in sessions_with_duration) / len(sessions_with_duration)
-            total_actions = sum(s.get("action_count", 0) for s in sessions_with_duration)
+        match = {"start_time": {"$gte": start_date, "$lte": end_date}}
+        
+        # Counts and sums in a single pass over the window (start_time index);
+        # averages cover sessions that have a duration, as before
+        totals = next(collection.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": None,
+                "total_sessions": {"$sum": 1},
+                "completed_sessions": {"$sum": {"$cond": [_is_set("end_time"), 1, 0]}},
+                "timed_sessions": {"$sum": {"$cond": [_is_set("duration_minutes"), 1, 0]}},
+                "duration_sum": {"$sum": {"$cond": [_is_set("duration_minutes"), "$duration_minutes", 0]}},
+                "action_sum": {"$sum": {"$cond": [_is_set("duration_minutes"), {"$ifNull": ["$action_count", 0]}, 0]}},
+            }},
+        ]), None) or {}
+        
+        timed_sessions = totals.get("timed_sessions", 0)
+        avg_duration = totals.get("duration_sum", 0) / timed_sessions if timed_sessions else 0
+        avg_actions = totals.get("action_sum", 0) / timed_sessions if timed_sessions else 0
+        total_actions = totals.get("action_sum", 0) if timed_sessions else 0
         
         response = {
             "period_days": days,
-            "total_sessions": total_sessions,
-            "completed_sessions": completed_sessions,
+            "total_sessions": totals.get("total_sessions", 0),
+            "completed_sessions": totals.get("completed_sessions", 0),
             "avg_duration_minutes": round(avg_duration, 2),
             "total_actions": total_actions,
             "avg_actions_per_session": round(avg_actions, 2)
         }
         
+        if "day" in breakdowns:
+            rows = collection.aggregate([
+                {"$match": match},
+                {"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$start_time"}},
+                    "sessions": {"$sum": 1},
+                    "completed_sessions": {"$sum": {"$cond": [_is_set("end_time"), 1, 0]}},
+                    "avg_duration_minutes": {"$avg": "$duration_minutes"},
+                    "actions": {"$sum": {"$ifNull": ["$action_count", 0]}},
+                }},
+                {"$sort": {"_id": 1}},
+            ])
+            response["by_day"] = [
+                {
+                    "date": row["_id"],
+                    "sessions": row["sessions"],
+                    "completed_sessions": row["completed_sessions"],
+                    "avg_duration_minutes": round(row["avg_duration_minutes"], 2) if row.get("avg_duration_minutes") is not None else None,
+                    "actions": row["actions"],
+                }
+                for row in rows
+            ]
+        
+        if "action" in breakdowns:
+            # Buckets carry their session's start_time, so this covers the same sessions
+            by_action = {}
+            group = [{"$unwind": "$actions"}, {"$group": {"_id": "$actions.action", "count": {"$sum": 1}}}]
+            bucketed = get_session_actions_collection().aggregate([{"$match": {"session_start": match["start_time"]}}] + group)
+            # Sessions written before bucketing still embed their actions
+            embedded = collection.aggregate([{"$match": {**match, "actions": {"$exists": True}}}] + group)
+            for row in itertools.chain(bucketed, embedded):
+                by_action[row["_id"]] = by_action.get(row["_id"], 0) + row["count"]
+            response["by_action"] = [
+                {"action": action, "count": count}
+                for action, count in sorted(by_action.items(), key=lambda item: (-item[1], str(item[0])))
+            ]
+        
+        if "percentiles" in breakdowns:
+            response["duration_percentiles"] = _duration_percentiles(collection, match, timed_sessions)
+        
         return jsonify(response), 200
         
     except PyMongoError as e:
         return jsonify({"error": "Database error occurred"}), 500
     except Exception as e:
         return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+# Columns (and their order) for CSV exports; NDJSON carries the same fields
+EXPORT_COLUMNS = {
+    "feedback": ["timestamp", "rating", "text", "session_id", "user_id", "_id"],
+    "sessions": ["session_id", "start_time", "end_time", "duration_minutes", "action_count", "user_agent", "ip_address", "_id"],
+}
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows fetched per cursor batch and written per streamed chunk
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _export_chunks(docs, columns, fmt):
+    """Serialize ``docs`` in chunks of EXPORT_BATCH_SIZE rows, holding one chunk at a time."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+    while True:
+        batch = list(itertools.islice(docs, EXPORT_BATCH_SIZE))
+        if not batch:
+            break
+        if fmt == "csv":
+            for doc in batch:
+                writer.writerow(["" if doc.get(c) is None else _export_value(doc.get(c)) for c in columns])
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        else:
+            chunk = "".join(json.dumps({c: _export_value(doc.get(c)) for c in columns if c in doc}, ensure_ascii=False) + "\n" for doc in batch)
+        yield chunk
+    if fmt == "csv" and buffer.getvalue():
+        # Header only, for an empty export
+        yield buffer.getvalue()
+
+
+def _export_response(name, cursor, fmt):
+    """Chunked response streaming ``cursor``; the first batch is fetched up front so query errors still get a JSON 500."""
+    docs = iter(cursor)
+    first = next(docs, None)
+    docs = itertools.chain([first] if first is not None else [], docs)
+    filename = f"{name}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(
+        stream_with_context(_export_chunks(docs, EXPORT_COLUMNS[name], fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _export_format():
+    fmt = request.args.get("format", "ndjson").lower()
+    return fmt if fmt in EXPORT_FORMATS else None
+
+
+@api_bp.route("/export/feedback", methods=["GET"])
+def export_feedback():
+    """Stream all feedback, newest first, as NDJSON (default) or CSV (``?format=csv``)"""
+    try:
+        fmt = _export_format()
+        if fmt is None:
+            return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+        projection = {c: 1 for c in EXPORT_COLUMNS["feedback"]}
+        cursor = get_feedback_collection().find({}, projection).sort(FEEDBACK_SORT).batch_size(EXPORT_BATCH_SIZE)
+        return _export_response("feedback", cursor, fmt)
+        
+    except PyMongoError as e:
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@api_bp.route("/export/sessions", methods=["GET"])
+def export_sessions():
+    """
+    Stream sessions, oldest first, as NDJSON (default) or CSV
+
+    Optional ``start``/``end`` (YYYY-MM-DD, inclusive) limit by start_time.
+    Session actions are not included (see session_actions).
+    """
+    try:
+        fmt = _export_format()
+        if fmt is None:
+            return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+        query = {}
+        try:
+            if request.args.get("start"):
+                query.setdefault("start_time", {})["$gte"] = datetime.strptime(request.args["start"], "%Y-%m-%d")
+            if request.args.get("end"):
+                query.setdefault("start_time", {})["$lt"] = datetime.strptime(request.args["end"], "%Y-%m-%d") + timedelta(days=1)
+        except ValueError:
+            return jsonify({"error": "start and end must be YYYY-MM-DD dates"}), 400
+        projection = {c: 1 for c in EXPORT_COLUMNS["sessions"]}
+        cursor = get_session_collection().find(query, projection).sort("start_time", 1).batch_size(EXPORT_BATCH_SIZE)
+        return _export_response("sessions", cursor, fmt)
+        
+    except PyMongoError as e:
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+def _job_links(job_id):
+    return {
+        "status_url": f"/api/validate/{job_id}",
+        "result_url": f"/api/validate/{job_id}/result",
+        "issues_url": f"/api/validate/{job_id}/issues",
+    }
+
+
+@api_bp.route("/validate", methods=["POST"])
+def submit_validation():
+    """
+    Queue a file for validation on the server's worker pool
+
+    Multipart form: ``file`` (CSV/TXT/XLSX) plus optional ``duplicate_mode``
+    (id|all), ``id_column``, ``identity_pairs`` ("a:b,a:c"), ``sep`` and
+    ``stream`` (true for chunked validation of large CSVs). Returns 202 with
+    the job id; poll the status URL, then fetch the result.
+    """
+    try:
+        upload = request.files.get("file")
+        if upload is None or not upload.filename:
+            return jsonify({"error": "file is required"}), 400
+        if os.path.splitext(upload.filename)[1].lower() not in SUPPORTED_SUFFIXES:
+            return jsonify({"error": f"Unsupported file type; use {', '.join(sorted(SUPPORTED_SUFFIXES))}"}), 400
+        
+        duplicate_mode = request.form.get("duplicate_mode", "id")
+        if duplicate_mode not in DUPLICATE_MODES:
+            return jsonify({"error": f"duplicate_mode must be one of {', '.join(sorted(DUPLICATE_MODES))}"}), 400
+        try:
+            identity_pairs = parse_identity_pairs(request.form.get("identity_pairs", ""))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        options = {
+            "duplicate_mode": DUPLICATE_MODES[duplicate_mode],
+            "id_column": request.form.get("id_column") or None,
+            "identity_pairs": identity_pairs,
+            "sep": request.form.get("sep") or None,
+            "stream": request.form.get("stream", "").lower() in ("1", "true", "yes"),
+        }
+        job = submit_job(upload.filename, upload.stream, options)
+        return jsonify({"job_id": job["job_id"], "status": job["status"], **_job_links(job["job_id"])}), 202
+        
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@api_bp.route("/validate/<job_id>", methods=["GET"])
+def validation_status(job_id):
+    """Status of a validation job: queued, running, done or failed"""
+    try:
+        job = get_job(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify({**job, **_job_links(job_id)}), 200
+        
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@api_bp.route("/validate/<job_id>/result", methods=["GET"])
+def validation_result(job_id):
+    """Counts, rule hits and per-day series of a finished job (409 until it finishes)"""
+    try:
+        job = get_job(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        if job["status"] not in FINISHED_STATES:
+            return jsonify({"error": f"Job is {job['status']}", "status": job["status"]}), 409
+        if job["status"] != JOB_DONE:
+            return jsonify({"error": job.get("error", "Validation failed"), "status": job["status"]}), 422
+        summary = job_summary(job_id)
+        summary.pop("issues_file", None)  # server path; use issues_url
+        return jsonify({"job_id": job_id, "status": job["status"], **summary, **_job_links(job_id)}), 200
+        
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@api_bp.route("/validate/<job_id>/issues", methods=["GET"])
+def validation_issues(job_id):
+    """Rows that are not valid, as CSV, streamed from the job's issues file"""
+    try:
+        path = job_issues_path(job_id)
+        if path is None or not path.exists():
+            return jsonify({"error": "No issues file for this job (unknown or not finished)"}), 404
+        return send_file(path, mimetype="text/csv", as_attachment=True, download_name=f"{job_id}.issues.csv")
+        
+    except Exception as e:
+        return jsonify({"error": "An unexpected error occurred"}), 500
@@ -0,0 +1,45 @@
+"""
+Shared pytest fixtures: a file-backed mock store and validation job directory per test
+"""
+import dataclasses
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+import backend.db as db
+import backend.jobs as jobs
+from backend.app import create_app
+from backend.config import load_config
+
+
+def _unreachable_mongo(*args, **kwargs):
+    raise ServerSelectionTimeoutError("MongoDB is not used in tests")
+
+
+@pytest.fixture
+def mock_store(monkeypatch, tmp_path):
+    """
+    Point the mock store and the validation jobs at ``tmp_path``.
+
+    The module globals are restored afterwards, so no later test runs
+    against this test's (deleted) directory.
+    """
+    monkeypatch.setattr(db, "_use_mock", True)
+    # init_db(force=True) retries MongoDB; keep these tests on the mock store
+    monkeypatch.setattr(db, "_client", None)
+    monkeypatch.setattr(db, "MongoClient", _unreachable_mongo)
+    monkeypatch.setattr(db, "_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(db, "_collections", {})
+    monkeypatch.setattr(db, "_config", None)
+    monkeypatch.setattr(jobs, "JOBS_DIR", tmp_path / "jobs")
+    yield tmp_path
+    db._close_mock_logs()
+
+
+@pytest.fixture
+def mock_client(mock_store):
+    """Factory for a Flask test client on ``mock_store``, with optional AppConfig overrides."""
+    def _client(**config):
+        db.init_db(dataclasses.replace(load_config(), **config) if config else None, force=True)
+        return create_app().test_client()
+    return _client
@@ -0,0 +1,128 @@
+"""
+HTTP plumbing shared by the Streamlit frontends.
+
+``make_session`` builds one pooled ``requests.Session`` so API calls reuse
+keep-alive connections to the backend. ``HealthMonitor`` probes ``/health``
+on a daemon thread and caches the outcome, so a page rerun reads the last
+status instead of blocking on a probe (or on a timeout when the backend is
+down).
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Seconds between background probes of each watched backend
+HEALTH_INTERVAL_SECONDS = float(os.getenv("HEALTH_CHECK_INTERVAL", "15"))
+HEALTH_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+# Connections kept open per backend host
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+# URLs nobody asked about for this long stop being probed (e.g. half-typed URLs)
+WATCH_IDLE_SECONDS = 300.0
+
+
+def make_session(pool_size: int = API_POOL_SIZE) -> requests.Session:
+    """Session with a connection pool of ``pool_size`` per host for http and https."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@dataclass(frozen=True)
+class HealthStatus:
+    """Outcome of the last probe of one backend; ``ok`` is None while unknown or stale."""
+    url: str
+    ok: Optional[bool] = None
+    checked_at: Optional[float] = None
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class HealthMonitor:
+    """
+    Probe ``<base_url>/health`` in the background and cache the result.
+
+    ``watch`` registers a URL and returns its cached status without doing
+    any I/O; a new URL is probed right away, then every ``interval``
+    seconds. Statuses older than ``ttl`` (default three intervals) are
+    reported as unknown rather than trusted.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        interval: float = HEALTH_INTERVAL_SECONDS,
+        timeout: float = HEALTH_TIMEOUT_SECONDS,
+        ttl: Optional[float] = None,
+    ):
+        self.session = session or make_session()
+        self.interval = interval
+        self.timeout = timeout
+        self.ttl = ttl if ttl is not None else 3 * interval
+        self._statuses: Dict[str, HealthStatus] = {}
+        self._watched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, base_url: str) -> HealthStatus:
+        """Cached status of ``base_url``, which is probed in the background from now on."""
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            is_new = base_url not in self._watched
+            self._watched[base_url] = time.time()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+                self._thread.start()
+        if is_new:
+            self._wake.set()
+        return self.status(base_url)
+
+    def status(self, base_url: str) -> HealthStatus:
+        """Last probe result for ``base_url``; unknown if never probed or older than the TTL."""
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            status = self._statuses.get(base_url)
+        if status is None:
+            return HealthStatus(base_url)
+        if time.time() - status.checked_at > self.ttl:
+            return HealthStatus(base_url, None, status.checked_at, error="stale")
+        return status
+
+    def probe(self, base_url: str) -> HealthStatus:
+        """Probe ``base_url`` now (blocking, at most ``timeout`` seconds) and cache the result."""
+        base_url = base_url.rstrip("/")
+        started = time.time()
+        try:
+            resp = self.session.get(f"{base_url}/health", timeout=self.timeout)
+            status = HealthStatus(base_url, resp.ok, time.time(), round((time.time() - started) * 1000, 1),
+                                  None if resp.ok else f"HTTP {resp.status_code}")
+        except requests.RequestException as e:
+            status = HealthStatus(base_url, False, time.time(), error=type(e).__name__)
+        with self._lock:
+            self._statuses[base_url] = status
+        return status
+
+    def _due(self) -> list:
+        now = time.time()
+        with self._lock:
+            for url in [u for u, seen in self._watched.items() if now - seen > WATCH_IDLE_SECONDS]:
+                del self._watched[url]
+                self._statuses.pop(url, None)
+            return [u for u in self._watched
+                    if u not in self._statuses or now - self._statuses[u].checked_at >= self.interval]
+
+    def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            for url in self._due():
+                self.probe(url)
+            # Woken early when a new URL is watched
+            self._wake.wait(self.interval)
@@ -1,9 +1,10 @@
 import os
-import csv
+import sys
 import time
 import math
 import io
 import json
+import hashlib
 import numpy as np
 import requests
 import pandas as pd
@@ -11,6 +12,16 @@ import matplotlib.pyplot as plt
 import streamlit as st
 from datetime import datetime, timedelta
 import streamlit.components.v1 as components
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontend.api_client import HealthMonitor, make_session
+from quality_core.date_detection import FORMAT_INFER, describe_date_column, detect_date_column, parse_dates as parse_date_column
+from quality_core.ingest import IngestResult, read_csv_fast, sniff_delimiter
+from quality_core.streaming import stream_validate
+from quality_core.validation import ROW_ISSUE_DUPLICATE, DuplicateIndex, aggregate_daily, classify_rows, default_id_column, parse_identity_pairs, rows_frame
 
 try:
 	import plotly.express as px  # optional
@@ -608,6 +619,112 @@ st.markdown(
 	unsafe_allow_html=True,
 )
 
+# -------------------------
+# Upload helpers (memoized per upload)
+# -------------------------
+# Bounded LRU cache of per-upload validation results (shared across sessions)
+VALIDATION_CACHE_ENTRIES = int(os.getenv("VALIDATION_CACHE_ENTRIES", "4"))
+# Column pairs checked for identity conflicts, e.g. "user_id:card_id,user_id:device_id"
+IDENTITY_PAIRS = tuple(parse_identity_pairs(os.getenv("IDENTITY_PAIRS", "")))
+# Feedback rows fetched per "Load Feedback Data" / "Load more" click
+FEEDBACK_PAGE_SIZE = 200
+# Backend URL as the user's browser reaches it; exports link there instead of passing through this app
+PUBLIC_BACKEND_URL = os.getenv("PUBLIC_BACKEND_URL", "").rstrip("/")
+# Largest export proxied through this app when PUBLIC_BACKEND_URL is not set
+EXPORT_PROXY_MAX_BYTES = int(os.getenv("EXPORT_PROXY_MAX_MB", "50")) * 1024 * 1024
+
+@st.cache_resource(show_spinner=False)
+def api_session() -> requests.Session:
+	"""One pooled session per process, so API calls reuse keep-alive connections."""
+	return make_session()
+
+@st.cache_resource(show_spinner=False)
+def health_monitor() -> HealthMonitor:
+	"""Background /health prober shared by every browser session."""
+	return HealthMonitor(api_session())
+
+@st.cache_resource(show_spinner=False)
+def background_executor() -> ThreadPoolExecutor:
+	"""Threads for fire-and-forget API writes, so a slow backend never delays a rerun."""
+	return ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboard-bg")
+
+def upload_digest(uploaded) -> str:
+	"""sha256 of an uploaded file's bytes, hashed once per uploaded file rather than on every rerun."""
+	file_key = (uploaded.name, getattr(uploaded, "file_id", None))
+	cached = st.session_state.get("upload_digest")
+	if cached is None or cached[0] != file_key:
+		cached = (file_key, hashlib.sha256(uploaded.getvalue()).hexdigest())
+		st.session_state.upload_digest = cached
+	return cached[1]
+
+@st.cache_resource(show_spinner=False, max_entries=VALIDATION_CACHE_ENTRIES)
+def read_upload_csv(digest: str, sep: str, engine: str, parse_dates: tuple, _data_bytes: bytes) -> IngestResult:
+	"""Parsed CSV/TXT upload, keyed by content hash and read options (shared: never mutate the frame)."""
+	return read_csv_fast(_data_bytes, sep=sep, engine=engine, parse_dates=list(parse_dates))
+
+@st.cache_resource(show_spinner=False, max_entries=VALIDATION_CACHE_ENTRIES)
+def read_upload_excel(digest: str, sheet, parse_dates: tuple, _data_bytes: bytes):
+	"""Sheet names and, once a sheet is chosen, the parsed sheet (shared: never mutate the frame)."""
+	xl = pd.ExcelFile(io.BytesIO(_data_bytes))
+	if sheet is None:
+		return xl.sheet_names
+	return pd.read_excel(xl, sheet_name=sheet, parse_dates=list(parse_dates) or None)
+
+def upload_fingerprint(df: pd.DataFrame) -> str:
+	"""Content hash for the active upload (hash of the uploaded bytes when known)."""
+	upload_hash = st.session_state.get("upload_hash")
+	if upload_hash:
+		return upload_hash
+	row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+	return hashlib.sha256(row_hashes.tobytes() + repr(list(df.columns)).encode("utf-8")).hexdigest()
+
+@st.cache_resource(show_spinner=False, max_entries=VALIDATION_CACHE_ENTRIES)
+def upload_dates(upload_key: str, date_col, _upload_df: pd.DataFrame) -> dict:
+	"""Date column, parse format and min/max dates for one upload.
+
+	With ``date_col=None`` the column is auto-detected; otherwise only the
+	format of the chosen column is detected. Either way the result is
+	memoized per upload so reruns never re-parse the column.
+	"""
+	if date_col is not None and date_col in _upload_df.columns:
+		detection = describe_date_column(_upload_df[date_col])
+		column = date_col
+	else:
+		detection = detect_date_column(_upload_df)
+		column = detection.column if detection is not None else None
+	date_format = detection.format if detection is not None else FORMAT_INFER
+	min_date = max_date = None
+	if column is not None:
+		series = parse_date_column(_upload_df[column], date_format).dropna()
+		if not series.empty:
+			min_date = series.min().date()
+			max_date = series.max().date()
+	return {"column": column, "format": date_format, "min_date": min_date, "max_date": max_date}
+
+@st.cache_resource(show_spinner=False, max_entries=VALIDATION_CACHE_ENTRIES)
+def upload_duplicates(upload_key: str, id_column_name, _upload_df: pd.DataFrame) -> DuplicateIndex:
+	"""Row and ID fingerprints for one upload; answers duplicate lookups for any row subset."""
+	return DuplicateIndex(_upload_df, id_column_name)
+
+@st.fragment(run_every=2)
+def poll_upload_job(api_url: str) -> None:
+	"""Poll the server-side validation job; the full script reruns once it finishes."""
+	job = st.session_state.get("upload_job")
+	if not job or "result" in job:
+		return
+	try:
+		status = api_session().get(f"{api_url}{job['status_url']}", timeout=5).json().get("status")
+	except Exception:
+		st.warning("Could not reach the API server; retrying...")
+		return
+	if status in ("done", "failed"):
+		try:
+			job["result"] = api_session().get(f"{api_url}{job['result_url']}", timeout=10).json()
+		except Exception:
+			return
+		st.rerun()
+	st.info(f"Validation job {job['job_id'][:8]} is {status or 'unknown'}...")
+
 # -------------------------
 # Sidebar controls
 # -------------------------
@@ -616,23 +733,22 @@ st.sidebar.title("Controls")
 default_api = os.getenv("BACKEND_URL", "http://127.0.0.1:5001")
 api_base_url = st.sidebar.text_input("API Base URL", value=default_api).rstrip("/")
 
+# Cached status from the background monitor; reruns never wait on a probe
 try:
-    health_url = f"{api_base_url}/health"
-    ok = False
-    try:
-        r = requests.get(health_url, timeout=2)
-        ok = r.ok
-    except Exception:
-        ok = False
-    if not ok:
-        fallback = "http://127.0.0.1:5001"
-        try:
-            r2 = requests.get(f"{fallback}/health", timeout=2)
-            if r2.ok:
-                api_base_url = fallback
-                st.session_state["api_base_url"] = fallback
-        except Exception:
-            pass
+    health = health_monitor().watch(api_base_url)
+    fallback = "http://127.0.0.1:5001"
+    if health.ok is False and api_base_url != fallback:
+        fallback_health = health_monitor().watch(fallback)
+        if fallback_health.ok:
+            api_base_url = fallback
+            st.session_state["api_base_url"] = fallback
+            health = fallback_health
+    if health.ok:
+        st.sidebar.caption(f"🟢 Backend online ({health.latency_ms:.0f} ms)")
+    elif health.ok is False:
+        st.sidebar.caption(f"🔴 Backend unreachable ({health.error})")
+    else:
+        st.sidebar.caption("⚪ Checking backend...")
 except Exception:
     pass
 
@@ -656,66 +772,19 @@ data_max_date = None
 
 if uploaded_df is not None:
     try:
-        # If no date column has been chosen yet, attempt strict auto-detection now
+        upload_key = upload_fingerprint(uploaded_df)
+        # If no date column has been chosen yet, use the shared auto-detection
         if not uploaded_date_col or uploaded_date_col not in uploaded_df.columns:
-            best_col = None
-            best_score = (-1, -1, -1)  # (valid_ratio, unique_days, span_days)
-            for c in uploaded_df.columns:
-                # Skip obvious non-date columns (ids, indices, keys, numeric small ints)
-                name = str(c).lower()
-                if any(token in name for token in ["id", "index", "idx", "key", "pk", "number", "num", "#"]):
-                    continue
-                ser = uploaded_df[c]
-                # Skip numeric columns that are not plausible unix timestamps
-                if pd.api.types.is_numeric_dtype(ser):
-                    non_null = ser.dropna()
-                    if non_null.empty:
-                        continue
-                    sample = non_null.iloc[0]
-                    if sample < 1_000_000_000 or sample > 9_999_999_999:
-                        continue
-                # Try several strict formats first
-                parsed = None
-                for fmt in ('%Y-%m-%d','%m/%d/%Y','%d/%m/%Y','%Y/%m/%d','%m-%d-%Y','%d-%m-%Y','%Y%m%d','%m/%d/%y','%d/%m/%y'):
-                    try:
-                        tmp = pd.to_datetime(ser, format=fmt, errors='coerce')
-                        if tmp.notna().mean() >= 0.8:
-                            parsed = tmp
-                            break
-                    except Exception:
-                        continue
-                # Fallback to pandas parser with strict validation
-                if parsed is None:
-                    tmp = pd.to_datetime(ser, errors='coerce')
-                    if tmp.notna().mean() >= 0.8:
-                        parsed = tmp
-                if parsed is None or parsed.isna().all():
-                    continue
-                valid = parsed.dropna()
-                if valid.empty:
-                    continue
-                min_year = valid.min().year
-                max_year = valid.max().year
-                curr_year = datetime.utcnow().year
-                if not (1900 <= min_year <= curr_year + 1 and 1900 <= max_year <= curr_year + 1):
-                    continue
-                valid_ratio = float(valid.size) / float(len(parsed))
-                unique_days = valid.dt.normalize().nunique()
-                span_days = int((valid.max() - valid.min()).days) if valid.size > 1 else 0
-                score = (valid_ratio, unique_days, span_days)
-                if score > best_score:
-                    best_score = score
-                    best_col = c
-            if best_col:
-                uploaded_date_col = best_col
-                st.session_state.upload_date_col = best_col
-
-        # If we now have a valid date column, compute bounds from it
+            detected_col = upload_dates(upload_key, None, uploaded_df)["column"]
+            if detected_col is not None:
+                uploaded_date_col = detected_col
+                st.session_state.upload_date_col = detected_col
+
+        # If we now have a valid date column, take its bounds from the memoized parse
         if uploaded_date_col and uploaded_date_col in uploaded_df.columns:
-            series = pd.to_datetime(uploaded_df[uploaded_date_col], errors='coerce').dropna()
-            if not series.empty:
-                data_min_date = series.min().date()
-                data_max_date = series.max().date()
+            date_info = upload_dates(upload_key, uploaded_date_col, uploaded_df)
+            data_min_date = date_info["min_date"]
+            data_max_date = date_info["max_date"]
     except Exception:
         pass
 
@@ -811,6 +880,9 @@ _uploaded_cols = []
 try:
 	if st.session_state.get("upload_df") is not None:
 		_uploaded_cols = [str(c) for c in st.session_state["upload_df"].columns]
+	elif st.session_state.get("upload_stream_columns"):
+		# Streaming mode only reads the header up front
+		_uploaded_cols = list(st.session_state["upload_stream_columns"])
 except Exception:
 	_uploaded_cols = []
 column_filter = st.sidebar.multiselect(
@@ -829,8 +901,7 @@ id_column_name = None
 if duplicate_mode == "By ID Column":
 	if _uploaded_cols:
 		# Auto-detect ID column
-		id_candidates = [c for c in _uploaded_cols if 'id' in str(c).lower()]
-		id_column_name = id_candidates[0] if id_candidates else _uploaded_cols[0]
+		id_column_name = default_id_column(_uploaded_cols)
 	else:
 		id_column_name = None
 
@@ -870,12 +941,55 @@ def _mock_data(start_date: datetime, end_date: datetime) -> pd.DataFrame:
 	})
 	return df
 
+def _fetch_export(api_url: str, path: str):
+	"""An API export proxied through this app; None if it exceeds EXPORT_PROXY_MAX_BYTES.
+
+	``api_url`` is the backend as this server sees it (often 127.0.0.1), which
+	the user's browser usually cannot reach, so links straight to it break.
+	Streamlit keeps download data in memory, hence the cap; an oversized export
+	is dropped whole rather than cut short.
+	"""
+	data = bytearray()
+	with api_session().get(f"{api_url}{path}", stream=True, timeout=(5, 120)) as resp:
+		resp.raise_for_status()
+		for chunk in resp.iter_content(chunk_size=1024 * 1024):
+			data += chunk
+			if len(data) > EXPORT_PROXY_MAX_BYTES:
+				return None
+	return bytes(data)
+
+def api_download_button(label: str, api_url: str, path: str, file_name: str, mime: str) -> None:
+	"""Download button for a streamed API export.
+
+	With PUBLIC_BACKEND_URL set the browser fetches the export from the backend
+	directly, so this process never holds it. Otherwise a first click fetches
+	it through this app and offers the complete file, or shows an error if it
+	is over EXPORT_PROXY_MAX_MB.
+	"""
+	if PUBLIC_BACKEND_URL:
+		st.link_button(label, f"{PUBLIC_BACKEND_URL}{path}")
+		return
+	if st.button(label, key=f"export_{path}"):
+		try:
+			data = _fetch_export(api_url, path)
+		except Exception as ex:
+			st.error(f"Could not fetch {file_name}: {type(ex).__name__}")
+			return
+		if data is None:
+			st.error(
+				f"{file_name} is larger than {EXPORT_PROXY_MAX_BYTES // (1024 * 1024)} MB, the limit for downloads through "
+				"the dashboard. Set PUBLIC_BACKEND_URL to download it from the API directly."
+			)
+			return
+		# Held only for this run; the file stays downloadable until the next rerun
+		st.download_button(f"Save {file_name}", data, file_name=file_name, mime=mime, on_click="ignore", key=f"save_{path}")
+
 @st.cache_data(show_spinner=False, ttl=300, max_entries=10)
 def fetch_quality_data(api_url: str, start_dt: datetime, end_dt: datetime) -> pd.DataFrame:
 	params = {"start": start_dt.strftime("%Y-%m-%d"), "end": end_dt.strftime("%Y-%m-%d")}
 	url = f"{api_url}/api/quality"
 	try:
-		resp = requests.get(url, params=params, timeout=8)
+		resp = api_session().get(url, params=params, timeout=8)
 		resp.raise_for_status()
 		payload = resp.json()
 		items = payload.get("data", [])
@@ -887,6 +1001,109 @@ def fetch_quality_data(api_url: str, start_dt: datetime, end_dt: datetime) -> pd
 	except Exception:
 		return _mock_data(start_dt, end_dt)
 
+@st.cache_data(show_spinner=False, ttl=300, max_entries=20)
+def _fetch_period_comparison(api_url: str, start_dt: datetime, end_dt: datetime, dataset, rules) -> dict:
+	params = {"start": start_dt.strftime("%Y-%m-%d"), "end": end_dt.strftime("%Y-%m-%d"), "dataset": dataset, "rules": rules}
+	resp = api_session().get(f"{api_url}/api/quality/compare", params=params, timeout=5)
+	resp.raise_for_status()
+	payload = resp.json()
+	if not (payload.get("current") or {}).get("total") and not (payload.get("previous") or {}).get("total"):
+		# Raised rather than returned, so "nothing stored yet" is not cached
+		raise LookupError("no stored rollups for either period")
+	return payload
+
+def fetch_period_comparison(api_url: str, start_dt: datetime, end_dt: datetime, dataset=None, rules=None):
+	"""Stored ``current``/``previous`` totals from /api/quality/compare (None if nothing is stored).
+
+	Without ``dataset`` the totals cover every stored dataset, like GET /api/quality.
+	"""
+	try:
+		return _fetch_period_comparison(api_url, start_dt, end_dt, dataset, rules)
+	except Exception:
+		return None
+
+def fetch_previous_period(api_url: str, start_dt: datetime, end_dt: datetime, dataset: str, rules: str):
+	"""Stored totals for the equally long period before ``start_dt`` (None if unavailable)."""
+	comparison = fetch_period_comparison(api_url, start_dt, end_dt, dataset, rules)
+	previous = (comparison or {}).get("previous") or {}
+	return previous if previous.get("total") else None
+
+def rollup_rules(duplicate_mode: str, id_column_name, date_col) -> str:
+	"""The rule settings an upload's counts depend on, stored next to its dataset name.
+
+	Each setting keeps its own series for the file; the backend sums only the
+	latest one per day when datasets are combined.
+	"""
+	rules = [f"duplicates by {id_column_name}" if duplicate_mode == "By ID Column" and id_column_name else "duplicates by all columns"]
+	if IDENTITY_PAIRS:
+		rules.append("pairs " + ",".join(f"{left}:{right}" for left, right in IDENTITY_PAIRS))
+	if date_col:
+		rules.append(f"dated by {date_col}")
+	return "; ".join(rules)
+
+def _post_rollup(api_url: str, body: dict):
+	"""POST one rollup; returns None once stored, else what went wrong."""
+	try:
+		resp = api_session().post(f"{api_url}/api/quality", json=body, timeout=5)
+	except Exception as ex:
+		return f"{type(ex).__name__}"
+	if not resp.ok:
+		return f"HTTP {resp.status_code}"
+	if resp.status_code == 201:
+		fetch_quality_data.clear()
+		_fetch_period_comparison.clear()
+	return None
+
+def persist_upload_rollup(api_url: str, dataset: str, rules: str, fingerprint: str, daily: pd.DataFrame):
+	"""Send an upload's daily counts to quality_stats until stored, once per dataset, rules and file.
+
+	The POST runs on ``background_executor`` so the rerun does not wait for
+	it; a failed POST is retried on the next rerun. Returns the error of the
+	last attempt while it failed, else None. The latest upload of a dataset
+	replaces the days an earlier file stored under the same rules, so a
+	corrected re-upload rewrites its history.
+	"""
+	posts = st.session_state.setdefault("rollup_posts", {})
+	key = (dataset, rules, fingerprint)
+	previous = posts.get(key)
+	if previous is not None and previous.done() and previous.result() is None:
+		stored = st.session_state.setdefault("rollup_stored", set())
+		if key not in stored:
+			# A comparison fetched while the POST was in flight may predate it
+			stored.add(key)
+			_fetch_period_comparison.clear()
+	if daily is None or daily.empty or (previous is not None and (not previous.done() or previous.result() is None)):
+		return None
+	records = [
+		{"date": day.strftime("%Y-%m-%d"), "valid": int(valid), "warning": int(warning), "error": int(error)}
+		for day, valid, warning, error in daily[["date", "valid", "warning", "error"]].itertuples(index=False)
+	]
+	body = {"dataset": dataset, "rules": rules, "fingerprint": fingerprint, "daily": records, "replace": True}
+	posts[key] = background_executor().submit(_post_rollup, api_url, body)
+	return previous.result() if previous is not None else None
+
+@st.cache_resource(show_spinner=False, max_entries=VALIDATION_CACHE_ENTRIES)
+def validate_upload(upload_key: str, id_column_name, duplicate_mode: str, column_filter: tuple, date_col, date_format, _upload_df: pd.DataFrame) -> dict:
+	"""Full-dataset validation for one upload, keyed by content hash and rule parameters.
+
+	The returned objects are shared between reruns and sessions: slice them,
+	never mutate them in place.
+	"""
+	quality_cols = [c for c in column_filter if c in _upload_df.columns] or list(_upload_df.columns)
+	duplicates = upload_duplicates(upload_key, id_column_name, _upload_df)
+	classified = classify_rows(
+		_upload_df, id_column_name, duplicate_mode, quality_cols, duplicates=duplicates, identity_pairs=IDENTITY_PAIRS
+	)
+	if date_col and date_col in _upload_df.columns:
+		# Normalized row dates (NaT for rows without a valid date)
+		row_dates = parse_date_column(_upload_df[date_col], date_format).dt.normalize()
+		dated = row_dates.notna().to_numpy()
+		daily = aggregate_daily(classified.status[dated], row_dates[dated])
+	else:
+		row_dates = None
+		daily = None
+	return {"classified": classified, "duplicates": duplicates, "row_dates": row_dates, "daily": daily}
+
 # -------------------------
 # Utility functions
 # -------------------------
@@ -951,617 +1168,83 @@ else:
 	with st.spinner("Loading default data..."):
 		df = fetch_quality_data(api_base_url, start_dt, end_dt)
 if use_uploaded:
-	df_up = st.session_state.get("upload_df").copy()
+	df_up = st.session_state.get("upload_df")
 	date_col = st.session_state.get("upload_date_col")
-	# If no date column selected, try to auto-detect a likely date column
+	upload_key = upload_fingerprint(df_up)
+	# If no date column selected, use the shared (memoized) auto-detection
 	if not date_col:
-		try:
-			candidates = []
-			for c in df_up.columns:
-				# Skip columns that are likely IDs or numeric indices
-				col_name_lower = str(c).lower()
-				if any(skip_word in col_name_lower for skip_word in ['id', 'index', 'idx', 'key', 'pk', 'number', 'num', '#']):
-					continue
-				
-				ser = df_up[c]
-				
-				# Skip if column is purely numeric (likely not dates)
-				if pd.api.types.is_numeric_dtype(ser):
-					# Check if it could be timestamps (large numbers)
-					if ser.notna().any():
-						sample_val = ser.dropna().iloc[0] if len(ser.dropna()) > 0 else 0
-						# Skip if values are too small (likely IDs) or too large (likely not dates)
-						if sample_val < 1000000000 or sample_val > 9999999999:  # Not Unix timestamp range
-							continue
-				
-				# Try robust date parsing with multiple strategies
-				parsed = None
-				successful_format = None
-				
-				# Strategy 1: Try specific date formats first
-				date_formats = [
-					'%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', 
-					'%m-%d-%Y', '%d-%m-%Y', '%Y%m%d', '%m/%d/%y', '%d/%m/%y',
-					'%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S'
-				]
-				
-				for fmt in date_formats:
-					try:
-						test_parsed = pd.to_datetime(ser, format=fmt, errors="coerce")
-						valid_count = test_parsed.notna().sum()
-						
-						if valid_count > len(ser) * 0.6:  # At least 60% valid (more lenient)
-							# Validate year range
-							valid_dates = test_parsed.dropna()
-							if len(valid_dates) > 0:
-								min_year = valid_dates.min().year
-								max_year = valid_dates.max().year
-								current_year = datetime.now().year
-								
-								# More lenient year validation
-								if 1900 <= min_year <= current_year + 2 and 1900 <= max_year <= current_year + 2:
-									parsed = test_parsed
-									successful_format = fmt
-									break
-					except:
-						continue
-				
-				# Strategy 2: If specific formats failed, try auto-detection
-				if parsed is None or parsed.isna().all():
-					try:
-						test_parsed = pd.to_datetime(ser, errors="coerce")
-						valid_dates = test_parsed.dropna()
-						if len(valid_dates) > len(ser) * 0.6:  # More lenient threshold
-							min_year = valid_dates.min().year
-							max_year = valid_dates.max().year
-							current_year = datetime.now().year
-							
-							# More lenient validation for auto-detection
-							if 1900 <= min_year <= current_year + 2 and 1900 <= max_year <= current_year + 2:
-								parsed = test_parsed
-								successful_format = "auto"
-					except:
-						pass
-				
-				# Strategy 3: Try infer_datetime_format for edge cases
-				if parsed is None or parsed.isna().all():
-					try:
-						test_parsed = pd.to_datetime(ser, infer_datetime_format=True, errors="coerce")
-						valid_dates = test_parsed.dropna()
-						if len(valid_dates) > len(ser) * 0.6:
-							min_year = valid_dates.min().year
-							max_year = valid_dates.max().year
-							current_year = datetime.now().year
-							
-							if 1900 <= min_year <= current_year + 2 and 1900 <= max_year <= current_year + 2:
-								parsed = test_parsed
-								successful_format = "infer"
-					except:
-						pass
-				
-				if parsed is not None and not parsed.isna().all():
-					valid_ratio = float(parsed.notna().mean()) if len(parsed) else 0.0
-					unique_days = parsed.dt.normalize().nunique() if parsed.notna().any() else 0
-					
-					# More lenient criteria for date column detection
-					if valid_ratio >= 0.6 and unique_days >= 1:  # 60% valid, at least 1 unique day
-						# Calculate date range span for scoring
-						if parsed.notna().any():
-							date_span_days = (parsed.max() - parsed.min()).days if parsed.notna().sum() > 1 else 0
-							candidates.append((c, valid_ratio, unique_days, date_span_days))
-			
-			if candidates:
-				# Sort by valid_ratio first, then unique_days, then date_span
-				candidates.sort(key=lambda x: (x[1], x[2], x[3]), reverse=True)
-				date_col = candidates[0][0]
-				# persist detection
-				st.session_state.upload_date_col = date_col
-				
-				# Silently detect date range without showing confusing message
-		except Exception:
-			pass
+		date_col = upload_dates(upload_key, None, df_up)["column"]
+		if date_col is not None:
+			st.session_state.upload_date_col = date_col
+	date_format = upload_dates(upload_key, date_col, df_up)["format"] if date_col else None
 
 	# Per-column row filters removed per request; keep a passthrough structure to avoid breakage
 	per_col_filters = {}
 	st.session_state.per_col_filters = per_col_filters
-	filtered_df = df_up.copy()
 
 	# Column filter defines which columns participate in missing (warnings)
-	quality_cols = [c for c in (column_filter or []) if c in filtered_df.columns]
+	quality_cols = [c for c in (column_filter or []) if c in df_up.columns]
 	if not quality_cols:
-		quality_cols = list(filtered_df.columns)
+		quality_cols = list(df_up.columns)
 
-
-	# -------------------------
-# Advanced Data Quality Validation
-# -------------------------
-def validate_data_quality(df, id_column_name=None):
-	"""
-	Advanced data quality validation with specific rules:
-	- Missing critical fields (user ID, card ID, transaction amount, timestamp)
-	- Invalid formats (negative amount, invalid date, malformed ID)
-	- Conflicting identity mappings
-	"""
-	validation_results = {
-		'missing_critical': [],
-		'invalid_formats': [],
-		'identity_conflicts': [],
-		'valid_rows': []
-	}
-	
-	if df.empty:
-		return validation_results
-	
-	# 1. Check for missing critical fields
-	critical_fields = []
-	if id_column_name and id_column_name in df.columns:
-		critical_fields.append(id_column_name)
-	
-	# Auto-detect amount fields
-	amount_fields = [col for col in df.columns if any(keyword in str(col).lower() 
-					for keyword in ['amount', 'value', 'price', 'cost', 'total'])]
-	
-	# Auto-detect timestamp fields
-	timestamp_fields = [col for col in df.columns if any(keyword in str(col).lower() 
-					  for keyword in ['date', 'time', 'created', 'timestamp', 'updated'])]
-	
-	critical_fields.extend(amount_fields[:1])  # Take first amount field
-	critical_fields.extend(timestamp_fields[:1])  # Take first timestamp field
-	
-	# Check missing critical fields
-	for field in critical_fields:
-		if field in df.columns:
-			missing_mask = df[field].isna()
-			missing_indices = df[missing_mask].index.tolist()
-			if missing_indices:
-				validation_results['missing_critical'].extend([
-					{'row': idx, 'field': field, 'issue': f'Missing critical field: {field}'}
-					for idx in missing_indices
-				])
-	
-	# 2. Check for invalid formats
-	for field in amount_fields:
-		if field in df.columns:
-			# Check for negative amounts
-			try:
-				numeric_series = pd.to_numeric(df[field], errors='coerce')
-				negative_mask = numeric_series < 0
-				negative_indices = df[negative_mask].index.tolist()
-				if negative_indices:
-					validation_results['invalid_formats'].extend([
-						{'row': idx, 'field': field, 'issue': f'Negative amount: {numeric_series.iloc[i]}'}
-						for i, idx in enumerate(negative_indices)
-					])
-			except:
-				pass
-	
-	# Check for invalid dates
-	for field in timestamp_fields:
-		if field in df.columns:
-			try:
-				date_series = pd.to_datetime(df[field], errors='coerce')
-				invalid_date_mask = date_series.isna() & df[field].notna()
-				invalid_date_indices = df[invalid_date_mask].index.tolist()
-				if invalid_date_indices:
-					validation_results['invalid_formats'].extend([
-						{'row': idx, 'field': field, 'issue': f'Invalid date format: {df[field].iloc[i]}'}
-						for i, idx in enumerate(invalid_date_indices)
-					])
-			except:
-				pass
-	
-	# 3. Check for identity conflicts (if ID column exists)
-	if id_column_name and id_column_name in df.columns:
-		# Check for single user ID linked to multiple card IDs
-		if 'user_id' in df.columns and 'card_id' in df.columns:
-			user_to_cards = df.groupby('user_id')['card_id'].nunique()
-			conflict_users = user_to_cards[user_to_cards > 1].index.tolist()
-			
-			for user_id in conflict_users:
-				conflicted_rows = df[df['user_id'] == user_id].index.tolist()
-				validation_results['identity_conflicts'].extend([
-					{'row': idx, 'field': 'user_id', 'issue': f'User ID {user_id} linked to multiple card IDs'}
-					for idx in conflicted_rows
-				])
-		
-		# Check for single card ID linked to multiple user IDs
-		if 'card_id' in df.columns and 'user_id' in df.columns:
-			card_to_users = df.groupby('card_id')['user_id'].nunique()
-			conflict_cards = card_to_users[card_to_users > 1].index.tolist()
-			
-			for card_id in conflict_cards:
-				conflicted_rows = df[df['card_id'] == card_id].index.tolist()
-				validation_results['identity_conflicts'].extend([
-					{'row': idx, 'field': 'card_id', 'issue': f'Card ID {card_id} linked to multiple user IDs'}
-					for idx in conflicted_rows
-				])
-	
-	# 4. Identify valid rows (no issues)
-	all_issue_indices = set()
-	for issue_list in [validation_results['missing_critical'], validation_results['invalid_formats'], validation_results['identity_conflicts']]:
-		all_issue_indices.update([issue['row'] for issue in issue_list])
-	
-	valid_indices = [idx for idx in df.index if idx not in all_issue_indices]
-	validation_results['valid_rows'] = valid_indices
-	
-	return validation_results
-
-# Apply advanced data quality validation
-	validation_results = validate_data_quality(filtered_df, id_column_name)
-	
-	# Base masks
-	error_mask = pd.Series(False, index=filtered_df.index)
-	warning_mask = pd.Series(False, index=filtered_df.index)
-	
-	# 1) Mark critical missing fields and invalid formats as errors
-	for issue in validation_results['missing_critical']:
-		error_mask.iloc[issue['row']] = True
-	
-	for issue in validation_results['invalid_formats']:
-		error_mask.iloc[issue['row']] = True
-	
-	# 2) Mark identity conflicts as errors and create a separate mask for slicing
-	identity_conflict_mask_full = pd.Series(False, index=filtered_df.index)
-	for issue in validation_results['identity_conflicts']:
-		error_mask.iloc[issue['row']] = True
-		identity_conflict_mask_full.iloc[issue['row']] = True
-	
-	# 3) Warnings: missing in non‑critical quality_cols only
-	if quality_cols:
-		non_critical_quality_cols = [col for col in quality_cols if col not in 
-								  [id_column_name] + [col for col in filtered_df.columns 
-								   if any(keyword in str(col).lower() 
-									  for keyword in ['amount', 'date', 'time'])]]
-		if non_critical_quality_cols:
-			missing_mask = filtered_df[non_critical_quality_cols].isna().any(axis=1)
-		else:
-			missing_mask = pd.Series(False, index=filtered_df.index)
-	else:
-		missing_mask = pd.Series(False, index=filtered_df.index)
-	
-	warning_mask = missing_mask & (~error_mask)
-	
-	# 4) Duplicate handling
-	# Global rule: hard errors from validation_results above already applied.
-	# Here we only add duplicate-driven errors/warnings per mode.
-	dup_all_mask = filtered_df.duplicated(keep=False)
-	if duplicate_mode == "By ID Column" and id_column_name and id_column_name in filtered_df.columns:
-		# Repeated IDs are allowed. Only:
-		# - Same ID + identical row  -> Error
-		# - Same ID + differing row  -> Warning (if not already error)
-		dup_id_mask = filtered_df.duplicated(subset=[id_column_name], keep=False)
-		
-		# True duplicates: same ID and all columns identical
-		strong_dup_mask = dup_id_mask & dup_all_mask
-		error_mask = error_mask | strong_dup_mask
-		
-		# Weaker duplicates: same ID but some columns differ
-		weak_dup_mask = dup_id_mask & (~dup_all_mask) & (~error_mask)
-		warning_mask = warning_mask | weak_dup_mask
-		
-		dup_indicator = dup_id_mask
-	else:
-		# By all columns mode: any fully identical row is an error
-		error_mask = error_mask | dup_all_mask
-		dup_indicator = dup_all_mask
-	
-	# Valid rows: no errors or warnings
-	valid_mask = ~(error_mask | warning_mask)
-
-	if date_col and date_col in filtered_df.columns:
-		# Ensure datetime with robust parsing
-		if not pd.api.types.is_datetime64_any_dtype(filtered_df[date_col]):
-			# Try multiple parsing strategies
-			try:
-				# First try pandas auto-parsing
-				filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], errors="coerce")
-			except:
-				# If that fails, try manual parsing with common formats
-				try:
-					filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], format='%Y-%m-%d', errors="coerce")
-				except:
-					try:
-						filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], format='%m/%d/%Y', errors="coerce")
-					except:
-						# Last resort: infer datetime
-						filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], infer_datetime_format=True, errors="coerce")
-		
-		# Drop rows without a valid date
-		original_count = len(filtered_df)
-		filtered_df = filtered_df.dropna(subset=[date_col])
-		if filtered_df.empty:
+	# Validate the full upload once (cached by content hash); the date-range
+	# view only slices the per-row status codes and the daily series
+	validated = validate_upload(
+		upload_key, id_column_name, duplicate_mode, tuple(quality_cols), date_col, date_format, df_up
+	)
+	classified = validated["classified"]
+	upload_dataset = st.session_state.get("upload_name") or "upload"
+	upload_rules = rollup_rules(duplicate_mode, id_column_name, date_col)
+	if not column_filter and validated["daily"] is not None and st.session_state.get("upload_content_hash"):
+		# Whole-file counts (no column filter) feed the stored history for this dataset
+		rollup_error = persist_upload_rollup(api_base_url, upload_dataset, upload_rules, st.session_state.upload_content_hash, validated["daily"])
+		if rollup_error:
+			st.sidebar.caption(f"⚠️ Could not store this upload's daily counts ({rollup_error}); retrying on the next refresh.")
+
+	if validated["row_dates"] is not None:
+		row_dates = validated["row_dates"]
+		dated_mask = row_dates.notna().to_numpy()
+		if not dated_mask.any():
 			st.warning("No rows with valid dates found in the uploaded file.")
 			st.stop()
-		
+
 		# Apply date range filter only if apply_date_filter is True
 		if apply_date_filter:
-			# Apply date range filter with proper normalization
 			start_norm = pd.to_datetime(start_dt).normalize()
 			end_norm = pd.to_datetime(end_dt).normalize()
-			
-			# Convert date column to normalized dates for comparison
-			data_dates = pd.to_datetime(filtered_df[date_col]).dt.normalize()
-			
-			# More robust date filtering - include all dates within the range
-			date_filtered_df = filtered_df[
-				(data_dates >= start_norm) & (data_dates <= end_norm)
-			]
-			
-			if date_filtered_df.empty:
+			view_mask = dated_mask & ((row_dates >= start_norm) & (row_dates <= end_norm)).to_numpy()
+			if not view_mask.any():
+				_avail = f"{data_min_date:%Y-%m-%d} to {data_max_date:%Y-%m-%d}" if data_min_date and data_max_date else "unknown"
 				st.error(f"""
 				**No data points in the selected date range:**
 				- **Requested range**: {start_dt.strftime('%Y-%m-%d')} to {end_dt.strftime('%Y-%m-%d')}
-				- **Available data range**: {data_min_date.strftime('%Y-%m-%d')} to {data_max_date.strftime('%Y-%m-%d')}
-				- **Total rows in CSV**: {len(filtered_df):,}
+				- **Available data range**: {_avail}
+				- **Total rows in CSV**: {int(dated_mask.sum()):,}
 				- **Date column used**: {date_col}
 				
 				**Suggestion**: Try selecting "Custom" and choose dates within your data range.
 				""")
 				st.stop()
+			daily_full = validated["daily"]
+			df = daily_full[(daily_full["date"] >= start_norm) & (daily_full["date"] <= end_norm)].reset_index(drop=True)
 		else:
-			# No date filtering - use all data
-			date_filtered_df = filtered_df
-		
-		
-		# Recalculate masks for date-filtered data using the same rules
-		validation_results_filtered = validate_data_quality(date_filtered_df, id_column_name)
-		
-		# DEBUG: Check if we have data
-		print(f"\n=== BEFORE MASK CREATION ===")
-		print(f"date_filtered_df shape: {date_filtered_df.shape}")
-		print(f"date_filtered_df index: {date_filtered_df.index.tolist()[:10]}")  # First 10
-		print(f"validation_results_filtered keys: {validation_results_filtered.keys()}")
-		print(f"missing_critical count: {len(validation_results_filtered['missing_critical'])}")
-		print(f"invalid_formats count: {len(validation_results_filtered['invalid_formats'])}")
-		print(f"identity_conflicts count: {len(validation_results_filtered['identity_conflicts'])}")
-		
-		# Step 1: Initialize fresh masks for this view
-		error_mask_filtered = pd.Series(False, index=date_filtered_df.index)
-		warning_mask_filtered = pd.Series(False, index=date_filtered_df.index)
-		
-		# Step 2: Apply hard error rules (recomputed on date_filtered_df only)
-		for issue in validation_results_filtered['missing_critical']:
-			if issue['row'] in error_mask_filtered.index:
-				error_mask_filtered.loc[issue['row']] = True
-		for issue in validation_results_filtered['invalid_formats']:
-			if issue['row'] in error_mask_filtered.index:
-				error_mask_filtered.loc[issue['row']] = True
-		
-		# Step 3: Apply identity conflicts by slicing the precomputed full-dataset mask
-		id_conf_slice = (
-			identity_conflict_mask_full
-			.reindex(date_filtered_df.index)
-			.fillna(False)
-			.astype(bool)
-		)
-		error_mask_filtered = error_mask_filtered | id_conf_slice
-		
-		# Warnings from non-critical missing fields (only if not already error)
-		if quality_cols:
-			non_critical_quality_cols_f = [col for col in quality_cols if col not in 
-										   [id_column_name] + [col for col in date_filtered_df.columns 
-											if any(keyword in str(col).lower() 
-												for keyword in ['amount', 'date', 'time'])]]
-			if non_critical_quality_cols_f:
-				missing_mask_filtered = date_filtered_df[non_critical_quality_cols_f].isna().any(axis=1)
-			else:
-				missing_mask_filtered = pd.Series(False, index=date_filtered_df.index)
-		else:
-			missing_mask_filtered = pd.Series(False, index=date_filtered_df.index)
-		
-		warning_mask_filtered = missing_mask_filtered & (~error_mask_filtered)
-		
-		# Duplicate handling for the selected date range (same rules as global)
-		dup_all_mask_f = date_filtered_df.duplicated(keep=False)
-		if duplicate_mode == "By ID Column" and id_column_name and id_column_name in date_filtered_df.columns:
-			dup_id_mask_f = date_filtered_df.duplicated(subset=[id_column_name], keep=False)
-			
-			# True duplicates for this ID: identical rows
-			strong_dup_mask_f = dup_id_mask_f & dup_all_mask_f
-			error_mask_filtered = error_mask_filtered | strong_dup_mask_f
-			
-			# Weaker duplicates: same ID, different payload
-			weak_dup_mask_f = dup_id_mask_f & (~dup_all_mask_f) & (~error_mask_filtered)
-			warning_mask_filtered = warning_mask_filtered | weak_dup_mask_f
-			
-			dup_indicator_filtered = dup_id_mask_f
-		else:
-			# By all columns mode: fully identical rows -> errors
-			error_mask_filtered = error_mask_filtered | dup_all_mask_f
-			dup_indicator_filtered = dup_all_mask_f
-		
-		valid_mask_filtered = ~(warning_mask_filtered | error_mask_filtered)
-		
-		# DEBUG: Print actual counts before aggregation
-		print(f"\n=== DATE-FILTERED VIEW DEBUG ===")
-		print(f"Total rows in date_filtered_df: {len(date_filtered_df)}")
-		print(f"Error mask sum: {error_mask_filtered.sum()}")
-		print(f"Warning mask sum: {warning_mask_filtered.sum()}")
-		print(f"Valid mask sum: {valid_mask_filtered.sum()}")
-		print(f"Total classified: {error_mask_filtered.sum() + warning_mask_filtered.sum() + valid_mask_filtered.sum()}")
-		
-		# Aggregate by day
-		agg = pd.DataFrame({
-			"date": pd.to_datetime(date_filtered_df[date_col]).dt.normalize(),
-			"valid": valid_mask_filtered.astype(int),
-			"warning": warning_mask_filtered.astype(int),
-			"error": error_mask_filtered.astype(int),
-		})
-		df = agg.groupby("date", as_index=False).sum().sort_values("date")
+			# No date filtering - use all dated rows
+			view_mask = dated_mask
+			df = validated["daily"]
 	else:
 		# Single snapshot (no date column)
-		valid_count = int(valid_mask.sum())
-		warning_count = int(warning_mask.sum())
-		error_count = int(error_mask.sum())
-		_snapshot_date = pd.to_datetime(datetime.utcnow().date())
-		df = pd.DataFrame([{ "date": _snapshot_date, "valid": valid_count, "warning": warning_count, "error": error_count }])
-
-	# Rebuild rows_df for Details based on date-filtered data if available
-	if date_col and date_col in filtered_df.columns and 'date_filtered_df' in locals():
-		# Use the date-filtered data for consistency with overview
-		rows_df = date_filtered_df.copy()
-		rows_df["status"] = np.where(error_mask_filtered, "error", np.where(warning_mask_filtered, "warning", "valid"))
-		rows_df["record_id"] = np.arange(1, len(rows_df) + 1)
-		# Identify first missing column per row within quality_cols (vectorized)
-		if quality_cols:
-			miss_mask = date_filtered_df[quality_cols].isna()
-			first_missing_series = pd.Series(index=date_filtered_df.index, dtype=object)
-			any_missing = miss_mask.any(axis=1)
-			if any_missing.any():
-				first_missing_series.loc[any_missing] = miss_mask.loc[any_missing].idxmax(axis=1)
-		else:
-			first_missing_series = pd.Series(index=date_filtered_df.index, dtype=object)
-		rows_df["column"] = first_missing_series
-		# Issue type: duplicates vs missing vs ok (for metrics)
-		rows_df["issue"] = np.where(dup_indicator_filtered, "duplicate", np.where(warning_mask_filtered, "missing", "ok"))
-		rows_df["date"] = pd.to_datetime(date_filtered_df[date_col]).dt.normalize()
-	else:
-		# Fallback to original logic for non-date or single snapshot data
-		rows_df = filtered_df.copy()
-		rows_df["status"] = np.where(error_mask, "error", np.where(warning_mask, "warning", "valid"))
-		rows_df["record_id"] = np.arange(1, len(rows_df) + 1)
-		# Identify first missing column per row within quality_cols (vectorized)
-		if quality_cols:
-			miss_mask = filtered_df[quality_cols].isna()
-			first_missing_series = pd.Series(index=filtered_df.index, dtype=object)
-			any_missing = miss_mask.any(axis=1)
-			if any_missing.any():
-				first_missing_series.loc[any_missing] = miss_mask.loc[any_missing].idxmax(axis=1)
-		else:
-			first_missing_series = pd.Series(index=filtered_df.index, dtype=object)
-		rows_df["column"] = first_missing_series
-		# Issue type on full dataset (used for duplicate / missing KPI)
-		if duplicate_mode == "By ID Column" and id_column_name and id_column_name in filtered_df.columns:
-			dup_indicator_full = filtered_df.duplicated(subset=[id_column_name], keep=False)
-		else:
-			dup_indicator_full = filtered_df.duplicated(keep=False)
-		rows_df["issue"] = np.where(dup_indicator_full, "duplicate", np.where(warning_mask, "missing", "ok"))
-		rows_df["date"] = df["date"].iloc[-1] if len(df)>0 else pd.to_datetime(datetime.utcnow().date())
+		view_mask = np.ones(len(df_up), dtype=bool)
+		df = pd.DataFrame([{"date": pd.to_datetime(datetime.utcnow().date()), **classified.counts()}])
+
+	# Drill-down rows are built per view rather than cached next to the upload
+	rows_df = rows_frame(df_up, classified, view_mask)
+	rows_df["date"] = row_dates[view_mask] if validated["row_dates"] is not None else pd.to_datetime(datetime.utcnow().date())
 	if "value" not in rows_df.columns:
 		rows_df["value"] = ""
-	# Build filtered_by context column
-	ctx_parts = []
-	
-	# Add duplicate filtering info
 	if duplicate_mode == "By ID Column" and id_column_name:
-		ctx_parts.append(f"duplicates_by: '{id_column_name}' (same {id_column_name} values)")
+		rows_df["filtered_by"] = f"duplicates_by: '{id_column_name}' (same {id_column_name} values)"
 	else:
-		ctx_parts.append("duplicates_by: all_columns (identical rows)")
-	
-	# Add other filters
-	pcf = st.session_state.get('per_col_filters', {})
-	for c, cfg in pcf.items():
-		kind = cfg[0]
-		if kind == 'range':
-			ctx_parts.append(f"{c}: {cfg[1]:g}-{cfg[2]:g}")
-		elif kind == 'daterange':
-			ctx_parts.append(f"{c}: {cfg[1].date()}→{cfg[2].date()}")
-		elif kind == 'contains':
-			ctx_parts.append(f"{c}: contains '{cfg[1]}'")
-	
-	rows_df["filtered_by"] = ",  ".join(ctx_parts) if ctx_parts else "filtered_by: none"
-	
-# If an upload is active but the Overview summary frame `df` wasn't rebuilt
-# (e.g., due to edge-case flow/indentation), recompute it from the uploaded rows
-# so KPIs don't show all zeros.
-if use_uploaded and (df is None or df.empty or not all(c in df.columns for c in ["valid", "warning", "error"])):
-	try:
-		_tmp = st.session_state.get("upload_df")
-		if _tmp is not None and len(_tmp) > 0:
-			work_df = _tmp.copy()
-			date_col = st.session_state.get("upload_date_col")
-			# If we have a date column, filter by selected date preset/range
-			if date_col and date_col in work_df.columns:
-				work_df[date_col] = pd.to_datetime(work_df[date_col], errors="coerce")
-				work_df = work_df.dropna(subset=[date_col])
-				if apply_date_filter:
-					start_norm = pd.to_datetime(start_dt).normalize()
-					end_norm = pd.to_datetime(end_dt).normalize()
-					dates_norm = pd.to_datetime(work_df[date_col]).dt.normalize()
-					date_filtered_df = work_df[(dates_norm >= start_norm) & (dates_norm <= end_norm)]
-				else:
-					date_filtered_df = work_df
-			
-			# Re-run validation on the filtered rows and aggregate
-			vr = validate_data_quality(date_filtered_df, id_column_name)
-			# Step 1: Initialize fresh masks
-			err = pd.Series(False, index=date_filtered_df.index)
-			warn = pd.Series(False, index=date_filtered_df.index)
-			
-			# Step 2: Apply hard errors (recomputed on date_filtered_df)
-			for issue in vr["missing_critical"]:
-				if issue["row"] in err.index:
-					err.loc[issue["row"]] = True
-			for issue in vr["invalid_formats"]:
-				if issue["row"] in err.index:
-					err.loc[issue["row"]] = True
-			
-			# Step 3: Slice identity conflicts from full-dataset mask
-			if 'identity_conflict_mask_full' in locals():
-				id_conf_slice_fallback = (
-					identity_conflict_mask_full
-					.reindex(date_filtered_df.index)
-					.fillna(False)
-					.astype(bool)
-				)
-				err = err | id_conf_slice_fallback
-			
-			# Warnings: Missing (non-critical) fields only if not already error
-			if "quality_cols" in locals() and quality_cols:
-				non_critical = [col for col in quality_cols if col in date_filtered_df.columns and col not in
-							   [id_column_name] + [col for col in date_filtered_df.columns
-								if any(k in str(col).lower() for k in ["amount", "date", "time"])]]
-				miss = date_filtered_df[non_critical].isna().any(axis=1) if non_critical else pd.Series(False, index=date_filtered_df.index)
-			else:
-				miss = pd.Series(False, index=date_filtered_df.index)
-			warn = miss & (~err)
-			
-			# Duplicate rules (same semantics as main pipeline)
-			dup_all = date_filtered_df.duplicated(keep=False)
-			if duplicate_mode == "By ID Column" and id_column_name and id_column_name in date_filtered_df.columns:
-				dup_id = date_filtered_df.duplicated(subset=[id_column_name], keep=False)
-				# True duplicates: same ID + identical full row
-				err = err | (dup_id & dup_all)
-				# Weaker duplicates: same ID, different payload
-				warn = warn | (dup_id & (~dup_all) & (~err))
-				dup_indicator_filtered = dup_id
-			else:
-				# All-columns mode: fully identical rows -> errors
-				err = err | dup_all
-				dup_indicator_filtered = dup_all
-			
-			valid = ~(err | warn)
-			
-			# Build time series df
-			if date_col and date_col in date_filtered_df.columns:
-				agg = pd.DataFrame(
-					{
-						"date": pd.to_datetime(date_filtered_df[date_col]).dt.normalize(),
-						"valid": valid.astype(int),
-						"warning": warn.astype(int),
-						"error": err.astype(int),
-					}
-				)
-				df = agg.groupby("date", as_index=False).sum().sort_values("date")
-			else:
-				_snapshot_date = pd.to_datetime(datetime.utcnow().date())
-				df = pd.DataFrame(
-					[
-						{
-							"date": _snapshot_date,
-							"valid": int(valid.sum()),
-							"warning": int(warn.sum()),
-							"error": int(err.sum()),
-						}
-					]
-				)
-			
-			# Ensure rows_df exists for downstream metrics
-			rows_df = date_filtered_df.copy()
-			rows_df["status"] = np.where(err, "error", np.where(warn, "warning", "valid"))
-			rows_df["issue"] = np.where(dup_indicator_filtered, "duplicate", np.where(warn, "missing", "ok"))
-	except Exception:
-		pass
+		rows_df["filtered_by"] = "duplicates_by: all_columns (identical rows)"
 
 # Derived columns
 df = df.copy()
@@ -1604,11 +1287,12 @@ overall_error_on_scale = overall_error_rate / 5
 # Debug display to show current values (period-wide)
 if use_uploaded and 'upload_df' in st.session_state and st.session_state.upload_df is not None:
     # Calculate actual duplicate count based on selected mode
-    if duplicate_mode == "By ID Column" and id_column_name and id_column_name in st.session_state.upload_df.columns:
-        actual_dup_count = int(st.session_state.upload_df.duplicated(subset=[id_column_name], keep=False).sum())
+    dup_index = upload_duplicates(upload_fingerprint(st.session_state.upload_df), id_column_name, st.session_state.upload_df)
+    if duplicate_mode == "By ID Column" and dup_index.has_id:
+        actual_dup_count = int(dup_index.duplicated(by_id=True).sum())
         dup_info = f"Duplicates in '{id_column_name}': {actual_dup_count}"
     else:
-        actual_dup_count = int(st.session_state.upload_df.duplicated(keep=False).sum())
+        actual_dup_count = int(dup_index.duplicated().sum())
         dup_info = f"Duplicates (all columns): {actual_dup_count}"
     
     st.sidebar.markdown(f"""  
@@ -1680,11 +1364,19 @@ if tab_upload is not None:
 		st.markdown("<div class='section-title'>Upload a file for quality checks</div>", unsafe_allow_html=True)
 		uploaded = st.file_uploader("Choose CSV, Excel (xlsx), or TXT", type=["csv", "xlsx", "xls", "txt"], accept_multiple_files=False)
 		
+		if uploaded is None:
+			st.session_state.pop("upload_stream", None)
+			st.session_state.pop("upload_stream_columns", None)
+			st.session_state.pop("upload_job", None)
+			st.session_state.pop("upload_digest", None)
 		# Check if file was removed (uploaded is None but we had data before)
 		if uploaded is None and st.session_state.get("upload_df") is not None:
 			# Clear all upload-related session state when file is removed
 			st.session_state.pop("upload_df", None)
 			st.session_state.pop("upload_date_col", None)
+			st.session_state.pop("upload_hash", None)
+			st.session_state.pop("upload_content_hash", None)
+			st.session_state.pop("upload_name", None)
 			st.session_state.pop("per_col_filters", None)
 			# Force a rerun to update the UI immediately
 			st.rerun()
@@ -1694,6 +1386,9 @@ if tab_upload is not None:
 			# Advanced options in collapsible section
 			with st.expander("Advanced Options", expanded=False):
 				delim = st.selectbox("Delimiter (CSV/TXT)", ["Auto", ",", ";", "\t", "|"])
+				csv_engine = st.selectbox("CSV engine", ["Auto", "pyarrow", "c", "python"], help="Auto uses pyarrow when installed, otherwise the C parser")
+				stream_mode = st.checkbox("Streaming validation (large files)", value=False, help="Validate CSV/TXT files in chunks without loading them; results are shown on this tab only")
+				server_mode = st.checkbox("Validate on API server", value=False, help="Queue the file on the backend's worker pool and poll for the result; results are shown on this tab only")
 				date_cols_hint = st.text_input("Date columns (optional, comma-separated)", value="")
 				max_rows_preview = st.slider("Preview rows", 10, 200, 100, 10)
 		with col_up_left:
@@ -1701,36 +1396,143 @@ if tab_upload is not None:
 				name = uploaded.name.lower()
 				read_ok = True
 				df_up = None
+				ingest = None
+				stream_summary = None
+				server_job = None
 				try:
-					if name.endswith((".xlsx", ".xls")):
+					if server_mode:
+						# The backend validates the file; this session only submits it and polls
+						data_bytes = uploaded.getvalue()
+						if not data_bytes:
+							raise ValueError("File is empty.")
+						sep = None if delim == "Auto" else ("\t" if delim == "\t" else delim)
+						if not name.endswith((".xlsx", ".xls")):
+							job_cols = [str(c) for c in pd.read_csv(io.BytesIO(data_bytes), sep=sep or sniff_delimiter(data_bytes), nrows=0).columns]
+							if st.session_state.get("upload_stream_columns") != job_cols:
+								# Let the sidebar offer this file's columns (ID column) first
+								st.session_state.upload_stream_columns = job_cols
+								st.rerun()
+						job_key = [upload_digest(uploaded), sep, id_column_name, duplicate_mode, stream_mode]
+						server_job = st.session_state.get("upload_job")
+						if not server_job or server_job["key"] != job_key:
+							form = {
+								"duplicate_mode": "id" if duplicate_mode == "By ID Column" else "all",
+								"id_column": id_column_name or "",
+								"identity_pairs": ",".join(f"{left}:{right}" for left, right in IDENTITY_PAIRS),
+								"sep": sep or "",
+								"stream": "true" if stream_mode else "false",
+							}
+							resp = api_session().post(f"{api_base_url}/api/validate", files={"file": (uploaded.name, data_bytes)}, data=form, timeout=30)
+							if resp.status_code != 202:
+								raise ValueError(resp.json().get("error", f"HTTP {resp.status_code}"))
+							server_job = {"key": job_key, **resp.json()}
+							st.session_state.upload_job = server_job
+					elif name.endswith((".xlsx", ".xls")):
 						try:
-							xl = pd.ExcelFile(uploaded)
-							sheet = st.selectbox("Sheet", xl.sheet_names)
+							digest = upload_digest(uploaded)
+							sheet = st.selectbox("Sheet", read_upload_excel(digest, None, (), uploaded.getvalue()))
 							parse_dates = [c.strip() for c in date_cols_hint.split(",") if c.strip()]
-							df_up = pd.read_excel(xl, sheet_name=sheet, parse_dates=parse_dates or None)
+							df_up = read_upload_excel(digest, sheet, tuple(parse_dates), uploaded.getvalue())
 						except Exception as ex_xl:
 							st.warning("Install openpyxl to read Excel files: pip install openpyxl")
 							read_ok = False
 					else:
-						# Robust CSV reader: read from buffer, sniff delimiter when Auto, tolerate bad lines
+						# Fast CSV reader: read from buffer, sniff delimiter when Auto, count skipped bad lines
 						data_bytes = uploaded.getvalue()
 						if not data_bytes or len(data_bytes) == 0:
 							raise ValueError("File is empty.")
 						if delim == "Auto":
-							sample = data_bytes[:8192].decode("utf-8", errors="ignore")
-							try:
-								sniff = csv.Sniffer().sniff(sample)
-								sep = sniff.delimiter or ","
-							except Exception:
-								sep = ","
+							sep = sniff_delimiter(data_bytes)
 						else:
 							sep = "\t" if delim == "\t" else delim
 						parse_dates = [c.strip() for c in date_cols_hint.split(",") if c.strip()]
-						df_up = pd.read_csv(io.BytesIO(data_bytes), sep=sep, engine="python", parse_dates=parse_dates or None, on_bad_lines="skip")
+						if stream_mode:
+							# Chunked two-pass validation; the file is never materialized as a DataFrame
+							stream_cols = [str(c) for c in pd.read_csv(io.BytesIO(data_bytes), sep=sep, nrows=0).columns]
+							if st.session_state.get("upload_stream_columns") != stream_cols:
+								# Let the sidebar offer this file's columns (ID column, filters) first
+								st.session_state.upload_stream_columns = stream_cols
+								st.rerun()
+							stream_key = (upload_digest(uploaded), sep, id_column_name, duplicate_mode, tuple(column_filter or []))
+							cached_stream = st.session_state.get("upload_stream")
+							if not cached_stream or cached_stream[0] != stream_key:
+								with st.spinner("Validating in chunks..."):
+									cached_stream = (stream_key, stream_validate(uploaded, id_column_name, duplicate_mode, list(column_filter or []) or None, sep=sep, identity_pairs=IDENTITY_PAIRS))
+								st.session_state.upload_stream = cached_stream
+							stream_summary = cached_stream[1]
+						else:
+							st.session_state.pop("upload_stream_columns", None)
+							st.session_state.pop("upload_job", None)
+							ingest = read_upload_csv(upload_digest(uploaded), sep, csv_engine.lower(), tuple(parse_dates), data_bytes)
+							df_up = ingest.frame
 				except Exception as ex:
 					read_ok = False
 					st.error(f"Could not read file: {ex}")
 
+				if read_ok and server_job is not None:
+					if st.session_state.get("upload_df") is not None:
+						for _key in ("upload_df", "upload_date_col", "upload_hash", "upload_content_hash", "upload_name", "per_col_filters"):
+							st.session_state.pop(_key, None)
+						st.rerun()
+					job_result = server_job.get("result")
+					if job_result is None:
+						poll_upload_job(api_base_url)
+					elif job_result.get("status") != "done":
+						st.error(f"Server-side validation failed: {job_result.get('error', 'unknown error')}")
+					else:
+						if job_result.get("skipped_lines"):
+							st.warning(f"Skipped {job_result['skipped_lines']:,} malformed line(s) while reading the file.")
+						c1, c2, c3, c4 = st.columns(4)
+						with c1:
+							st.metric("Rows", f"{job_result['rows']:,}")
+						with c2:
+							st.metric("Valid", f"{job_result['counts']['valid']:,}")
+						with c3:
+							st.metric("Warnings", f"{job_result['counts']['warning']:,}")
+						with c4:
+							st.metric("Errors", f"{job_result['counts']['error']:,}")
+						hits = job_result["rule_hits"]
+						st.caption(
+							f"Validated on the API server in {job_result.get('seconds', 0):.1f}s. Rows hit by rule: missing critical {hits['missing_critical']:,}, "
+							f"invalid format {hits['invalid_formats']:,}, identity conflict {hits['identity_conflicts']:,}."
+						)
+						if job_result.get("daily"):
+							st.markdown(f"<div class='section-title'>Daily status ({job_result['date_column']})</div>", unsafe_allow_html=True)
+							st.line_chart(pd.DataFrame(job_result["daily"]).set_index("date")[["valid", "warning", "error"]])
+						api_download_button(
+							"Download rows with issues (CSV)", api_base_url, job_result["issues_url"],
+							file_name=f"{job_result['job_id']}.issues.csv", mime="text/csv",
+						)
+
+				if read_ok and stream_summary is not None:
+					# A previously loaded in-memory upload would otherwise keep driving the other tabs
+					if st.session_state.get("upload_df") is not None:
+						for _key in ("upload_df", "upload_date_col", "upload_hash", "upload_content_hash", "upload_name", "per_col_filters"):
+							st.session_state.pop(_key, None)
+						st.rerun()
+					if stream_summary.skipped_lines:
+						st.warning(f"Skipped {stream_summary.skipped_lines:,} malformed line(s) while reading the file.")
+					c1, c2, c3, c4 = st.columns(4)
+					with c1:
+						st.metric("Rows", f"{stream_summary.rows:,}")
+					with c2:
+						st.metric("Valid", f"{stream_summary.counts['valid']:,}")
+					with c3:
+						st.metric("Warnings", f"{stream_summary.counts['warning']:,}")
+					with c4:
+						st.metric("Errors", f"{stream_summary.counts['error']:,}")
+					hits = stream_summary.rule_hits
+					st.caption(
+						f"Validated in {stream_summary.chunks} chunk(s). Rows hit by rule: missing critical {hits['missing_critical']:,}, "
+						f"invalid format {hits['invalid_formats']:,}, identity conflict {hits['identity_conflicts']:,}."
+					)
+					if stream_summary.daily is not None:
+						st.markdown(f"<div class='section-title'>Daily status ({stream_summary.date_col})</div>", unsafe_allow_html=True)
+						st.line_chart(stream_summary.daily.set_index("date")[["valid", "warning", "error"]])
+					if stream_summary.sample is not None:
+						st.markdown("<div class='section-title'>Sample of rows with issues</div>", unsafe_allow_html=True)
+						st.dataframe(stream_summary.sample.head(max_rows_preview), use_container_width=True, hide_index=True)
+
 				if read_ok and df_up is not None:
 					# Let user pick a date column (optional) - hidden in advanced options
 					with st.expander("Advanced Options", expanded=False):
@@ -1738,10 +1540,24 @@ if tab_upload is not None:
 						date_col = st.selectbox("Date column (optional)", options=["<None>"] + candidate_dates, index=0)
 						if date_col != "<None>" and not pd.api.types.is_datetime64_any_dtype(df_up[date_col]):
 							with st.spinner("Parsing dates..."):
-								df_up[date_col] = pd.to_datetime(df_up[date_col], errors="coerce")
-					st.session_state.upload_df = df_up.copy()
+								df_up = df_up.assign(**{date_col: pd.to_datetime(df_up[date_col], errors="coerce")})
+					# The parsed frame is shared through the read cache, so the session keeps a reference, not a copy
+					st.session_state.upload_df = df_up
+					st.session_state.upload_name = uploaded.name
+					# Derived from the one hash of the file bytes: the validation cache key covers the read options,
+					# the rollup key only the data (and the sheet for workbooks)
+					_digest = upload_digest(uploaded)
+					_read_opts = (sheet if name.endswith((".xlsx", ".xls")) else sep, date_cols_hint, date_col, csv_engine)
+					st.session_state.upload_hash = hashlib.sha256(f"{_digest}{_read_opts!r}".encode("utf-8")).hexdigest()
+					_sheet = repr(sheet) if name.endswith((".xlsx", ".xls")) else ""
+					st.session_state.upload_content_hash = hashlib.sha256(f"{_digest}{_sheet}".encode("utf-8")).hexdigest() if _sheet else _digest
 					st.session_state.upload_date_col = None if date_col == "<None>" else date_col
 
+					if ingest is not None and ingest.skipped_lines:
+						st.warning(f"Skipped {ingest.skipped_lines:,} malformed line(s) while reading the file.")
+					if ingest is not None and ingest.fallback_blocks:
+						st.caption(f"Parsed with {ingest.engine}; {ingest.fallback_blocks} block(s) needed the python parser.")
+
 					st.markdown("<div class='section-title'>Preview</div>", unsafe_allow_html=True)
 					st.dataframe(df_up.head(min(max_rows_preview, 50)), use_container_width=True)
 
@@ -1750,15 +1566,13 @@ if tab_upload is not None:
 					# Limit calculations for very large files
 					calc_df = df_up.head(10000) if n_rows > 10000 else df_up
 					missing_total = int(calc_df.isna().sum().sum())
-					# Calculate duplicate count based on selected mode
-					if duplicate_mode == "By ID Column" and id_column_name and id_column_name in calc_df.columns:
-						dup_count = int(calc_df.duplicated(subset=[id_column_name]).sum())
-					else:
-						dup_count = int(calc_df.duplicated().sum())
+					# Duplicates come from the per-upload hash index, so they are exact for any size
+					dup_index = upload_duplicates(upload_fingerprint(df_up), id_column_name, df_up)
+					dup_by_id = duplicate_mode == "By ID Column" and dup_index.has_id
+					dup_count = dup_index.duplicate_count(by_id=dup_by_id)
 					if n_rows > 10000:
 						# Scale up the estimates
 						missing_total = int(missing_total * (n_rows / 10000))
-						dup_count = int(dup_count * (n_rows / 10000))
 					c1, c2, c3 = st.columns(3)
 					with c1:
 						st.metric("Rows", f"{n_rows:,}")
@@ -1799,10 +1613,7 @@ if tab_upload is not None:
 					if dup_count > 0:
 						st.markdown("<div class='section-title'>Duplicate rows</div>", unsafe_allow_html=True)
 						# Show ALL duplicate rows based on selected mode (not just samples)
-						if duplicate_mode == "By ID Column" and id_column_name and id_column_name in df_up.columns:
-							dups = df_up[df_up.duplicated(subset=[id_column_name], keep=False)]
-						else:
-							dups = df_up[df_up.duplicated(keep=False)]
+						dups = df_up[dup_index.duplicated(by_id=dup_by_id)]
 						
 						# Show all duplicates, but limit display to prevent UI issues
 						if len(dups) > 100:
@@ -1819,10 +1630,7 @@ if tab_upload is not None:
 					csv_prof = profile_df.to_csv(index=False).encode("utf-8")
 					# Generate CSV export based on selected duplicate detection mode
 					if dup_count > 0:
-						if duplicate_mode == "By ID Column" and id_column_name and id_column_name in df_up.columns:
-							csv_dups = (df_up[df_up.duplicated(subset=[id_column_name], keep=False)]).to_csv(index=False).encode("utf-8")
-						else:
-							csv_dups = (df_up[df_up.duplicated(keep=False)]).to_csv(index=False).encode("utf-8")
+						csv_dups = dups.to_csv(index=False).encode("utf-8")
 					else:
 						csv_dups = b""
 					b1, b2, b3 = st.columns(3)
@@ -1847,9 +1655,16 @@ if tab_upload is not None:
 									st.toast("Upload CSV file first", icon="⚠️")
 
 with tab_overview:
-	# KPI cards - show 0 when no file uploaded, real data when uploaded
-	if not use_uploaded:
-		# Default values when no CSV uploaded - all zeros
+	# KPI cards - stored rollups (or 0 if the API holds none) when no file is uploaded, real data when uploaded
+	stored_comparison = None if use_uploaded else fetch_period_comparison(api_base_url, start_dt, end_dt)
+	if not use_uploaded and stored_comparison is not None and stored_comparison["current"]["total"]:
+		# The rollups GET /api/quality served above, summed on the server
+		current = stored_comparison["current"]
+		valid_curr, warn_curr, err_curr = current["valid"], current["warning"], current["error"]
+		total_curr = current["total"]
+		dq_curr = current["dq_score"]
+	elif not use_uploaded:
+		# Default values when nothing is uploaded or stored - all zeros
 		valid_curr = 0
 		warn_curr = 0
 		err_curr = 0
@@ -1885,9 +1700,17 @@ with tab_overview:
 	else:  # Custom
 		delta_label = "vs prev period"
 
-	# For now, set previous period to None (no comparison data available)
-	# This could be enhanced to compare with previous periods if historical data is available
+	# Previous period of the same length from the stored rollups: of this dataset
+	# for an upload (whole-file counts, so only comparable when no column filter
+	# is applied), else of every dataset, like the cards themselves
 	valid_prev = None; warn_prev = None; err_prev = None; dq_prev = None
+	previous = None
+	if use_uploaded and not column_filter:
+		previous = fetch_previous_period(api_base_url, start_dt, end_dt, upload_dataset, upload_rules)
+	elif not use_uploaded and stored_comparison is not None and stored_comparison["previous"]["total"]:
+		previous = stored_comparison["previous"]
+	if previous is not None:
+		valid_prev, warn_prev, err_prev, dq_prev = previous["valid"], previous["warning"], previous["error"], previous["dq_score"]
 
 	valid_delta, valid_sign = compute_delta(valid_curr, valid_prev)
 	warn_delta, warn_sign = compute_delta(warn_curr, warn_prev)
@@ -2267,19 +2090,11 @@ with tab_details:
 			# Show only duplicate rows in Details tab
 			if 'upload_df' in st.session_state and not st.session_state['upload_df'].empty:
 				upload_df = st.session_state['upload_df']
-				
-				# Apply date filtering if available and if date filtering is enabled
-				date_col = st.session_state.get('upload_date_col')
-				if date_col and date_col in upload_df.columns and apply_date_filter:
-					col_dt = pd.to_datetime(upload_df[date_col], errors='coerce')
-					upload_df = upload_df[(col_dt >= start_dt) & (col_dt <= end_dt)]
-				
-				# Apply duplicate detection based on mode
+				# The Overview's full-dataset duplicate flags, limited to the rows in the date view
+				dup_mask = view_mask & (classified.issue == ROW_ISSUE_DUPLICATE)
 				if duplicate_mode == "By ID Column" and id_column_name and id_column_name in upload_df.columns:
-					dup_mask = upload_df.duplicated(subset=[id_column_name], keep=False)
 					mode_label = f"ID column: {id_column_name}"
 				else:
-					dup_mask = upload_df.duplicated(keep=False)
 					mode_label = "all columns"
 				
 				duplicates_df = upload_df[dup_mask]
@@ -2369,7 +2184,9 @@ with tab_details:
 					styled = styled.apply(lambda col: ["background-color: rgba(59,130,246,.22); font-weight:700;" if m else "" for m in mask], subset=[c])
 				elif kind == 'daterange':
 					start_d, end_d = cfg[1], cfg[2]
-					col_dt = pd.to_datetime(view_df[c], errors='coerce')
+					# Memoized per-column format, as for the Overview's date column
+					col_fmt = upload_dates(upload_key, c, df_up)["format"] if use_uploaded and c in df_up.columns else FORMAT_INFER
+					col_dt = parse_date_column(view_df[c], col_fmt)
 					mask = (col_dt >= start_d) & (col_dt <= end_d)
 					styled = styled.apply(lambda col: ["background-color: rgba(59,130,246,.22); font-weight:700;" if m else "" for m in mask], subset=[c])
 				elif kind == 'contains':
@@ -2441,6 +2258,14 @@ with tab_details:
 		st.metric("% Missing (rows shown)", f"{missing_pct:.1f}%")
 		st.metric("Duplicate rows", f"{duplicates_cnt}")
 		# removed compare vs last month metrics
+		# Readable issue list is built from the compact issue table only here
+		with st.expander("Validation issues", expanded=False):
+			try:
+				_issue_vr = classified.validation
+				st.caption(f"{int(view_mask[_issue_vr.issues['row'].to_numpy()].sum()):,} rule hits (showing up to 500)")
+				st.dataframe(_issue_vr.to_frame(df_up, limit=500, rows=view_mask), use_container_width=True, hide_index=True)
+			except Exception:
+				st.caption("No validation issues available.")
 
 with tab_settings:
 	st.caption("💡 Adjust controls in the sidebar. API base URL is editable there.")
@@ -2473,63 +2298,95 @@ with tab_settings:
 	if admin_password == "admin123":  # Change this to your preferred password
 		st.success("✅ Admin access granted")
 		
-		if load_btn:
+		def _fetch_feedback_page(next_params=None):
+			# Keyset pages: the API hands back next_after for the following page
+			# (or next_page while unmigrated string timestamps remain)
+			params = {"limit": FEEDBACK_PAGE_SIZE, **(next_params or {})}
+			response = api_session().get(f"{api_base_url}/api/feedback", params=params, timeout=10)
+			if response.status_code != 200:
+				st.error(f"Failed to load feedback: {response.status_code}")
+				return
+			feedback_data = response.json()
+			rows = st.session_state.feedback_rows if next_params else []
+			st.session_state.feedback_rows = rows + feedback_data.get('feedback', [])
+			if feedback_data.get('next_after'):
+				st.session_state.feedback_next = {"after": feedback_data['next_after']}
+			elif feedback_data.get('next_page'):
+				st.session_state.feedback_next = {"page": feedback_data['next_page']}
+			else:
+				st.session_state.feedback_next = None
+			st.session_state.feedback_total = feedback_data.get('total_count')
+			if feedback_data.get('warning'):
+				st.warning(feedback_data['warning'])
+
+		try:
+			import requests
+			if load_btn:
+				_fetch_feedback_page()
+			elif st.session_state.get("feedback_load_more"):
+				_fetch_feedback_page(st.session_state.get("feedback_next"))
+		except requests.exceptions.RequestException as e:
+			st.error(f"Error connecting to API: {str(e)}")
+		except Exception as e:
+			st.error(f"Error loading feedback: {str(e)}")
+
+		if "feedback_rows" in st.session_state:
 			try:
-				import requests
-				feedback_url = f"{api_base_url}/api/feedback"
-				response = requests.get(feedback_url, timeout=10)
+				feedback_list = st.session_state.feedback_rows
 				
-				if response.status_code == 200:
-					feedback_data = response.json()
-					feedback_list = feedback_data.get('feedback', [])
-					
-					if feedback_list:
+				if feedback_list:
+					feedback_total = st.session_state.get("feedback_total")
+					if feedback_total and feedback_total > len(feedback_list):
+						st.success(f"Showing {len(feedback_list)} of about {feedback_total:,} feedback entries")
+					else:
 						st.success(f"Found {len(feedback_list)} feedback entries")
-						
-						# Convert to DataFrame for better display
-						feedback_df = pd.DataFrame(feedback_list)
-						
-						# Parse timestamp robustly (mixed formats) and avoid exceptions
-						if 'timestamp' in feedback_df.columns:
-							feedback_df['timestamp'] = pd.to_datetime(
-								feedback_df['timestamp'], infer_datetime_format=True, errors='coerce'
-							)
-						
-						# Reorder columns for better display
-						column_order = ['timestamp', 'rating', 'text', 'session_id', 'user_id', '_id']
-						available_columns = [col for col in column_order if col in feedback_df.columns]
-						feedback_df = feedback_df[available_columns]
-						
-						st.dataframe(feedback_df, use_container_width=True, hide_index=True)
-						
-						# Show summary statistics
-						st.markdown("### Feedback Summary")
-						col1, col2, col3 = st.columns(3)
-						with col1:
-							avg_rating = feedback_df['rating'].mean()
-							st.metric("Average Rating", f"{avg_rating:.1f}/5")
-						with col2:
-							total_feedback = len(feedback_df)
-							st.metric("Total Feedback", total_feedback)
-						with col3:
-							rating_counts = feedback_df['rating'].value_counts().sort_index(ascending=False)
-							most_common_rating = rating_counts.index[0] if not rating_counts.empty else "N/A"
-							st.metric("Most Common Rating", f"{most_common_rating} stars")
-						
-						# Download feedback as CSV
-						csv_data = feedback_df.to_csv(index=False).encode('utf-8')
-						st.download_button(
-							"📥 Download Feedback CSV",
-							data=csv_data,
-							file_name=f"feedback_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-							mime="text/csv"
+					
+					# Convert to DataFrame for better display
+					feedback_df = pd.DataFrame(feedback_list)
+					
+					# Parse timestamp robustly (mixed formats) and avoid exceptions
+					if 'timestamp' in feedback_df.columns:
+						feedback_df['timestamp'] = pd.to_datetime(
+							feedback_df['timestamp'], infer_datetime_format=True, errors='coerce'
+						)
+					
+					# Reorder columns for better display
+					column_order = ['timestamp', 'rating', 'text', 'session_id', 'user_id', '_id']
+					available_columns = [col for col in column_order if col in feedback_df.columns]
+					feedback_df = feedback_df[available_columns]
+					
+					st.dataframe(feedback_df, use_container_width=True, hide_index=True)
+					if st.session_state.get("feedback_next"):
+						st.button("Load more", key="feedback_load_more")
+					
+					# Show summary statistics
+					st.markdown("### Feedback Summary")
+					col1, col2, col3 = st.columns(3)
+					with col1:
+						avg_rating = feedback_df['rating'].mean()
+						st.metric("Average Rating", f"{avg_rating:.1f}/5")
+					with col2:
+						total_feedback = st.session_state.get("feedback_total") or len(feedback_df)
+						st.metric("Total Feedback", total_feedback)
+					with col3:
+						rating_counts = feedback_df['rating'].value_counts().sort_index(ascending=False)
+						most_common_rating = rating_counts.index[0] if not rating_counts.empty else "N/A"
+						st.metric("Most Common Rating", f"{most_common_rating} stars")
+					
+					# Full exports are fetched from the API only when a button is clicked
+					col1, col2 = st.columns(2)
+					with col1:
+						api_download_button(
+							"📥 Download Feedback CSV", api_base_url, "/api/export/feedback?format=csv",
+							file_name="feedback.csv", mime="text/csv",
+						)
+					with col2:
+						api_download_button(
+							"📥 Download Sessions CSV", api_base_url, "/api/export/sessions?format=csv",
+							file_name="sessions.csv", mime="text/csv",
 						)
-					else:
-						st.info("No feedback entries found.")
 				else:
-					st.error(f"Failed to load feedback: {response.status_code}")
-			except requests.exceptions.RequestException as e:
-				st.error(f"Error connecting to API: {str(e)}")
+					st.info("No feedback entries found.")
 			except Exception as e:
 				st.error(f"Error loading feedback: {str(e)}")
 	elif admin_password:
@@ -2556,7 +2413,7 @@ with tab_settings:
 						"text": feedback_text.strip(),
 						"session_id": f"user_session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 					}
-					response = requests.post(f"{api_base_url}/api/feedback", json=feedback_data, timeout=5)
+					response = api_session().post(f"{api_base_url}/api/feedback", json=feedback_data, timeout=5)
 					if response.status_code == 201:
 						st.success("✅ Thank you for your feedback! We appreciate your input.")
 					else:
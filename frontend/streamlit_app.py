@@ -1,32 +1,49 @@
 import streamlit as st
 import requests
 import os
+import sys
 import pandas as pd
 
+# Add the parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontend.api_client import HealthMonitor, make_session
+
 # ✅ Backend URL (use secrets in Streamlit Cloud for flexibility)
 API_BASE = os.getenv("BACKEND_URL", "https://distinguished-imagination-production.up.railway.app")
 
+@st.cache_resource(show_spinner=False)
+def api_session() -> requests.Session:
+    """One pooled session per process, so API calls reuse keep-alive connections."""
+    return make_session()
+
+
+@st.cache_resource(show_spinner=False)
+def health_monitor() -> HealthMonitor:
+    """Background /health prober shared by every browser session."""
+    return HealthMonitor(api_session())
+
+
 st.set_page_config(page_title="Data Quality Dashboard", layout="wide")
 st.title("📊 Data Quality Dashboard - Frontend")
 st.write("This is the Streamlit frontend connected to your Flask backend.")
 
 # 🔍 Backend Health
 st.subheader("🔍 Backend Health Check")
-try:
-    res = requests.get(f"{API_BASE}/health", timeout=5)
-    if res.status_code == 200:
-        st.success(f"✅ Backend is online! Response: {res.json()}")
-    else:
-        st.error(f"❌ Backend returned an error: {res.status_code}")
-except Exception as e:
-    st.error(f"Failed to connect to backend: {e}")
+health = health_monitor().watch(API_BASE)
+if health.ok:
+    st.success(f"✅ Backend is online! ({health.latency_ms:.0f} ms)")
+elif health.ok is False:
+    st.error(f"❌ Backend is unreachable: {health.error}")
+else:
+    st.info("Checking backend health...")
 
 st.divider()
 
 # 📡 Example API Call
 st.subheader("📡 Example API Call")
 try:
-    res = requests.get(f"{API_BASE}/api/")  # Your example route
+    res = api_session().get(f"{API_BASE}/api/", timeout=5)  # Your example route
     if res.status_code == 200:
         st.success("✅ Data received successfully!")
         st.json(res.json())
@@ -40,7 +57,7 @@ st.divider()
 # 📈 Analytics Section
 st.subheader("📊 Analytics (last 7 days)")
 try:
-    res = requests.get(f"{API_BASE}/api/analytics", timeout=5)
+    res = api_session().get(f"{API_BASE}/api/analytics", timeout=5)
     if res.status_code == 200:
         data = res.json()
         col1, col2, col3 = st.columns(3)
@@ -60,7 +77,7 @@ st.divider()
 # 📝 Feedback Table
 st.subheader("📝 User Feedback")
 try:
-    res = requests.get(f"{API_BASE}/api/feedback?limit=20", timeout=5)
+    res = api_session().get(f"{API_BASE}/api/feedback?limit=20", timeout=5)
     if res.status_code == 200:
         feedback_data = res.json()
         feedback_list = feedback_data.get("feedback", [])
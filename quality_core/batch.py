@@ -0,0 +1,272 @@
+"""
+Headless batch validation.
+
+Runs the dashboard's validation over every CSV/TXT/XLSX file in a directory,
+one file per worker process, and writes per-file results plus an overall
+summary. Usage:
+
+    python -m quality_core.batch data/incoming --out reports/2024-01-01
+
+For each input ``<name>`` the output directory receives ``<name>.summary.json``
+(counts, rule hits, per-day counts) and ``<name>.issues.csv`` (rows that are
+not valid, in the dashboard's drill-down layout). ``summary.json`` collects
+all files. The exit status is non-zero if any file failed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Allow running as a script as well as ``python -m quality_core.batch``
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quality_core.date_detection import detect_date_column, parse_dates
+from quality_core.ingest import ENGINE_AUTO, ENGINES, read_csv_fast, sniff_delimiter
+from quality_core.streaming import stream_validate
+from quality_core.validation import (
+    DUPLICATE_BY_ALL,
+    DUPLICATE_BY_ID,
+    STATUS_VALID,
+    aggregate_daily,
+    classify_rows,
+    default_id_column,
+    parse_identity_pairs,
+    rows_frame,
+)
+
+
+CSV_SUFFIXES = {".csv", ".txt"}
+EXCEL_SUFFIXES = {".xlsx", ".xls"}
+DUPLICATE_MODES = {"id": DUPLICATE_BY_ID, "all": DUPLICATE_BY_ALL}
+
+
+def find_input_files(directory: Path, recursive: bool = False) -> List[Path]:
+    """Supported files under ``directory``, largest first so long jobs start early."""
+    pattern = "**/*" if recursive else "*"
+    files = [p for p in directory.glob(pattern) if p.is_file() and p.suffix.lower() in CSV_SUFFIXES | EXCEL_SUFFIXES]
+    return sorted(files, key=lambda p: p.stat().st_size, reverse=True)
+
+
+def _daily_records(daily: Optional[pd.DataFrame]) -> List[Dict[str, Any]]:
+    if daily is None or daily.empty:
+        return []
+    out = daily.copy()
+    out["date"] = out["date"].dt.strftime("%Y-%m-%d")
+    return out.to_dict("records")
+
+
+def read_file(path: Path, sep: Optional[str] = None, engine: str = ENGINE_AUTO):
+    """
+    Read a file the way the upload tab does; returns (frame, skipped bad lines).
+
+    Column types are inferred, as in the dashboard's default (in-memory) mode.
+    """
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        return pd.read_excel(path), 0
+    data = path.read_bytes()
+    if not data:
+        raise ValueError("File is empty.")
+    ingest = read_csv_fast(data, sep=sep or sniff_delimiter(data), engine=engine)
+    return ingest.frame, ingest.skipped_lines
+
+
+def validate_file(
+    path,
+    out_dir,
+    duplicate_mode: str = DUPLICATE_BY_ID,
+    id_column: Optional[str] = None,
+    identity_pairs=None,
+    sep: Optional[str] = None,
+    engine: str = ENGINE_AUTO,
+    stream: bool = False,
+    output_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Validate one file and write ``<name>.summary.json`` / ``<name>.issues.csv``.
+
+    Uses the same reader, ID column choice, date detection and rules as the
+    dashboard (with no column filter), so the counts match what it shows for
+    the whole file. ``stream`` validates CSV/TXT files in chunks instead of
+    loading them; like the dashboard's large-file mode it compares values as
+    text, so ``"007"`` and ``"7"`` differ there. ``record_id`` in the issues
+    file is the row's position in the file. ``output_name`` (default: the
+    file name) may contain subdirectories of ``out_dir``.
+    """
+    path, out_dir = Path(path), Path(out_dir)
+    started = time.time()
+    summary: Dict[str, Any] = {"file": str(path), "duplicate_mode": duplicate_mode}
+    output = out_dir / (output_name or path.name)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    issues_path = output.with_name(f"{output.name}.issues.csv")
+
+    if stream and path.suffix.lower() in CSV_SUFFIXES:
+        if sep is None:
+            with open(path, "rb") as fh:
+                sep = sniff_delimiter(fh.read(8192))
+        columns = list(pd.read_csv(path, sep=sep, nrows=0).columns)
+        if duplicate_mode == DUPLICATE_BY_ID and id_column is None:
+            id_column = default_id_column(columns)
+        written = []
+
+        def _write_issues(rows: pd.DataFrame) -> None:
+            # Appended chunk by chunk so issue rows never accumulate in memory
+            rows.to_csv(issues_path, mode="a" if written else "w", header=not written, index=False)
+            written.append(len(rows))
+
+        result = stream_validate(
+            str(path), id_column if duplicate_mode == DUPLICATE_BY_ID else None, duplicate_mode,
+            sep=sep, sample_rows=0, identity_pairs=identity_pairs, issue_sink=_write_issues,
+        )
+        summary.update({
+            "rows": result.rows,
+            "columns": len(columns),
+            "skipped_lines": result.skipped_lines,
+            "id_column": id_column if duplicate_mode == DUPLICATE_BY_ID else None,
+            "date_column": result.date_col,
+            "counts": result.counts,
+            "rule_hits": result.rule_hits,
+            "daily": _daily_records(result.daily),
+        })
+        if not written:
+            pd.DataFrame(columns=columns + ["status", "record_id", "column", "issue"]).to_csv(issues_path, index=False)
+    else:
+        df, skipped = read_file(path, sep, engine)
+        if duplicate_mode == DUPLICATE_BY_ID and id_column is None:
+            id_column = default_id_column(df.columns)
+        id_used = id_column if duplicate_mode == DUPLICATE_BY_ID else None
+        classified = classify_rows(df, id_used, duplicate_mode, identity_pairs=identity_pairs)
+        validation = classified.validation
+
+        detection = detect_date_column(df)
+        daily = None
+        if detection is not None:
+            row_dates = parse_dates(df[detection.column], detection.format).dt.normalize()
+            dated = row_dates.notna().to_numpy()
+            daily = aggregate_daily(classified.status[dated], row_dates[dated])
+
+        summary.update({
+            "rows": int(len(df)),
+            "columns": int(df.shape[1]),
+            "skipped_lines": skipped,
+            "id_column": id_used,
+            "date_column": detection.column if detection is not None else None,
+            "counts": classified.counts(),
+            "rule_hits": {
+                "missing_critical": int(validation.missing_critical.sum()),
+                "invalid_formats": int(validation.invalid_formats.sum()),
+                "identity_conflicts": int(validation.identity_conflicts.sum()),
+            },
+            "daily": _daily_records(daily),
+        })
+        rows_frame(df, classified, classified.status != STATUS_VALID).to_csv(issues_path, index=False)
+
+    summary["issues_file"] = str(issues_path)
+    summary["seconds"] = round(time.time() - started, 3)
+    with open(output.with_name(f"{output.name}.summary.json"), "w") as f:
+        json.dump(summary, f, indent=2, default=str)
+    return summary
+
+
+def _validate_safely(path, out_dir, **options) -> Dict[str, Any]:
+    try:
+        return validate_file(path, out_dir, **options)
+    except Exception as e:
+        return {"file": str(path), "error": f"{type(e).__name__}: {e}"}
+
+
+def _output_names(files, base_dir: Optional[Path]) -> List[str]:
+    # Mirror each file's path below base_dir, so same-named files in different
+    # subdirectories never share (or race on) output files
+    files = [Path(p) for p in files]
+    if base_dir is None:
+        base_dir = Path(os.path.commonpath([str(p.parent) for p in files])) if files else Path(".")
+    return [p.relative_to(base_dir).as_posix() for p in files]
+
+
+def run_batch(files, out_dir, workers: Optional[int] = None, base_dir=None, **options) -> Dict[str, Any]:
+    """
+    Validate ``files`` across a process pool and write ``summary.json``.
+
+    Per-file outputs mirror each file's path relative to ``base_dir``
+    (default: the deepest directory containing all of them).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    names = _output_names(files, Path(base_dir) if base_dir is not None else None)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    started = time.time()
+    results = []
+    if workers == 1:
+        results = [_validate_safely(path, out_dir, output_name=name, **options) for path, name in zip(files, names)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_validate_safely, path, out_dir, output_name=name, **options) for path, name in zip(files, names)]
+            for future in as_completed(futures):
+                results.append(future.result())
+    results.sort(key=lambda r: r["file"])
+
+    totals = {"valid": 0, "warning": 0, "error": 0}
+    for result in results:
+        for status, count in result.get("counts", {}).items():
+            totals[status] += count
+    overall = {
+        "files": len(results),
+        "failed": sum(1 for r in results if "error" in r),
+        "workers": workers,
+        "seconds": round(time.time() - started, 3),
+        "totals": totals,
+        "results": results,
+    }
+    with open(out_dir / "summary.json", "w") as f:
+        json.dump(overall, f, indent=2, default=str)
+    return overall
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Validate a directory of CSV/XLSX files with the dashboard rules.")
+    parser.add_argument("input_dir", type=Path, help="Directory containing .csv/.txt/.xlsx/.xls files")
+    parser.add_argument("--out", type=Path, required=True, help="Directory for per-file results and summary.json")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--duplicate-mode", choices=sorted(DUPLICATE_MODES), default="id", help="Duplicates by ID column or by all columns")
+    parser.add_argument("--id-column", default=None, help="ID column (default: same auto-detection as the dashboard)")
+    parser.add_argument("--identity-pairs", default=os.getenv("IDENTITY_PAIRS", ""), help="e.g. user_id:card_id,user_id:device_id")
+    parser.add_argument("--sep", default=None, help="CSV delimiter (default: sniffed per file)")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE_AUTO, help="CSV parser engine")
+    parser.add_argument("--stream", action="store_true", help="Validate CSV/TXT files in chunks instead of loading them")
+    parser.add_argument("--recursive", action="store_true", help="Include files in subdirectories")
+    args = parser.parse_args(argv)
+
+    if not args.input_dir.is_dir():
+        parser.error(f"not a directory: {args.input_dir}")
+    files = find_input_files(args.input_dir, args.recursive)
+    if not files:
+        print(f"No CSV/XLSX files found in {args.input_dir}")
+        return 1
+
+    overall = run_batch(
+        files, args.out, args.workers, base_dir=args.input_dir,
+        duplicate_mode=DUPLICATE_MODES[args.duplicate_mode],
+        id_column=args.id_column,
+        identity_pairs=parse_identity_pairs(args.identity_pairs),
+        sep=args.sep,
+        engine=args.engine,
+        stream=args.stream,
+    )
+    for result in overall["results"]:
+        if "error" in result:
+            print(f"❌ {result['file']}: {result['error']}")
+        else:
+            counts = result["counts"]
+            print(f"✅ {result['file']}: {result['rows']:,} rows, valid {counts['valid']:,}, warning {counts['warning']:,}, error {counts['error']:,}")
+    print(f"{overall['files']} file(s), {overall['failed']} failed, {overall['workers']} worker(s), {overall['seconds']}s -> {Path(args.out) / 'summary.json'}")
+    return 1 if overall["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
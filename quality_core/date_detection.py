@@ -0,0 +1,157 @@
+"""
+Date column auto-detection for uploaded datasets.
+
+Candidate formats are scored on a bounded random sample of each column; only
+the winning column/format pair is confirmed against the full column.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+
+
+DATE_FORMATS = [
+    '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d',
+    '%m-%d-%Y', '%d-%m-%Y', '%Y%m%d', '%m/%d/%y', '%d/%m/%y',
+    '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S',
+]
+
+# Pseudo-formats: already datetime dtype, numeric unix seconds, pandas inference
+FORMAT_NATIVE = "native"
+FORMAT_UNIX = "unix"
+FORMAT_INFER = "infer"
+
+# Column names containing these are treated as identifiers, never dates
+SKIP_NAME_TOKENS = ['id', 'index', 'idx', 'key', 'pk', 'number', 'num', '#']
+
+DEFAULT_SAMPLE_SIZE = 2000
+MIN_VALID_RATIO = 0.6
+
+
+@dataclass(frozen=True)
+class DateDetection:
+    """Chosen date column, how to parse it, and its score on the full column."""
+    column: Any
+    format: str
+    valid_ratio: float
+    unique_days: int
+    span_days: int
+
+
+def parse_dates(series: pd.Series, fmt: Optional[str]) -> pd.Series:
+    """Parse ``series`` with a format chosen by the detector (NaT when invalid)."""
+    if fmt == FORMAT_NATIVE or pd.api.types.is_datetime64_any_dtype(series):
+        return pd.to_datetime(series, errors="coerce")
+    if fmt == FORMAT_UNIX:
+        return pd.to_datetime(pd.to_numeric(series, errors="coerce"), unit="s", errors="coerce")
+    if fmt and fmt != FORMAT_INFER:
+        return pd.to_datetime(series, format=fmt, errors="coerce")
+    return pd.to_datetime(series, errors="coerce")
+
+
+def _plausible_years(valid: pd.Series) -> bool:
+    current_year = datetime.now().year
+    min_year, max_year = valid.min().year, valid.max().year
+    return 1900 <= min_year <= current_year + 2 and 1900 <= max_year <= current_year + 2
+
+
+def _score(parsed: pd.Series, min_valid_ratio: float) -> Optional[Tuple[float, int, int]]:
+    """(valid_ratio, unique_days, span_days) or None if the parse is not plausible."""
+    if len(parsed) == 0:
+        return None
+    valid = parsed.dropna()
+    valid_ratio = float(valid.size) / float(len(parsed))
+    if valid.empty or valid_ratio < min_valid_ratio or not _plausible_years(valid):
+        return None
+    unique_days = int(valid.dt.normalize().nunique())
+    span_days = int((valid.max() - valid.min()).days) if valid.size > 1 else 0
+    return (valid_ratio, unique_days, span_days)
+
+
+def _candidate_formats(series: pd.Series):
+    """Formats worth trying for ``series``, or an empty list for non-date columns."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return [FORMAT_NATIVE]
+    if pd.api.types.is_bool_dtype(series):
+        return []
+    if pd.api.types.is_numeric_dtype(series):
+        # Only plausible unix timestamps (seconds) qualify
+        non_null = series.dropna()
+        if non_null.empty:
+            return []
+        sample_val = non_null.iloc[0]
+        if sample_val < 1_000_000_000 or sample_val > 9_999_999_999:
+            return []
+        return [FORMAT_UNIX]
+    return DATE_FORMATS + [FORMAT_INFER]
+
+
+def best_format(series: pd.Series, min_valid_ratio: float = MIN_VALID_RATIO) -> Optional[Tuple[str, Tuple[float, int, int]]]:
+    """Highest scoring format for ``series`` (typically a sample) and its score."""
+    best = None
+    for fmt in _candidate_formats(series):
+        try:
+            score = _score(parse_dates(series, fmt), min_valid_ratio)
+        except Exception:
+            continue
+        # Earlier formats win ties, so explicit formats beat inference
+        if score is not None and (best is None or score[0] > best[1][0]):
+            best = (fmt, score)
+    return best
+
+
+def _sample(series: pd.Series, sample_size: int, seed: int) -> pd.Series:
+    if len(series) <= sample_size:
+        return series
+    return series.sample(n=sample_size, random_state=seed)
+
+
+def describe_date_column(
+    series: pd.Series,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    min_valid_ratio: float = MIN_VALID_RATIO,
+    seed: int = 0,
+) -> Optional[DateDetection]:
+    """Detect the format of a known date column, confirmed on the full column."""
+    found = best_format(_sample(series, sample_size, seed), min_valid_ratio)
+    if found is None:
+        return None
+    score = _score(parse_dates(series, found[0]), min_valid_ratio)
+    if score is None:
+        return None
+    return DateDetection(series.name, found[0], *score)
+
+
+def detect_date_column(
+    df: pd.DataFrame,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    min_valid_ratio: float = MIN_VALID_RATIO,
+    seed: int = 0,
+) -> Optional[DateDetection]:
+    """
+    Pick the most plausible date column of ``df``.
+
+    Columns are ranked by (valid_ratio, unique_days, span_days) measured on a
+    random sample of at most ``sample_size`` rows. Candidates are then
+    confirmed on the full column in rank order and the first that still
+    passes is returned.
+    """
+    ranked = []
+    for col in df.columns:
+        name = str(col).lower()
+        if any(token in name for token in SKIP_NAME_TOKENS):
+            continue
+        found = best_format(_sample(df[col], sample_size, seed), min_valid_ratio)
+        if found is not None:
+            ranked.append((found[1], found[0], col))
+
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    for _, fmt, col in ranked:
+        try:
+            score = _score(parse_dates(df[col], fmt), min_valid_ratio)
+        except Exception:
+            continue
+        if score is not None:
+            return DateDetection(col, fmt, *score)
+    return None
@@ -0,0 +1,241 @@
+"""
+Chunked validation for files too large to load at once.
+
+Pass 1 streams the file and keeps only compact cross-chunk state: 64-bit
+hashes of whole rows, of IDs and of the distinct identity pairs, plus a
+bounded row sample spread over the whole file for date detection. Pass 2
+streams it again, classifies each chunk with ``classify_rows`` against that
+state and merges per-day counts, so peak memory follows the chunk size
+rather than the file size.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from quality_core.date_detection import DEFAULT_SAMPLE_SIZE, FORMAT_INFER, describe_date_column, detect_date_column, parse_dates
+from quality_core.ingest import DEFAULT_CHUNK_ROWS, iter_csv_chunks
+from quality_core.validation import (
+    DUPLICATE_BY_ID,
+    IDENTITY_PAIRS,
+    STATUS_VALID,
+    aggregate_daily,
+    classify_rows,
+    rows_frame,
+)
+
+
+# Problem rows kept for the drill-down table
+DEFAULT_SAMPLE_ROWS = 500
+
+# Merge the per-chunk hash sets once this many have accumulated
+_MERGE_EVERY = 16
+
+# Rows kept, spread evenly over the file, to detect the date column and format
+DATE_SAMPLE_ROWS = 5 * DEFAULT_SAMPLE_SIZE
+
+
+class HashCounter:
+    """Tracks which 64-bit hashes occur more than once across chunks."""
+
+    def __init__(self):
+        self._parts: List[np.ndarray] = []
+        self._repeated: List[np.ndarray] = []
+
+    def add(self, hashes: np.ndarray) -> None:
+        uniq, counts = np.unique(hashes, return_counts=True)
+        self._parts.append(uniq)
+        self._repeated.append(uniq[counts > 1])
+        if len(self._parts) >= _MERGE_EVERY:
+            self._merge()
+
+    def _merge(self) -> None:
+        uniq, counts = np.unique(np.concatenate(self._parts), return_counts=True)
+        self._parts = [uniq]
+        self._repeated = [np.unique(np.concatenate(self._repeated + [uniq[counts > 1]]))]
+
+    def repeated(self) -> np.ndarray:
+        """Sorted hashes seen at least twice."""
+        if not self._parts:
+            return np.array([], dtype=np.uint64)
+        self._merge()
+        return self._repeated[0]
+
+
+class PairHashes:
+    """Distinct ``(a, b)`` value pairs as two columns of 64-bit hashes, merged across chunks."""
+
+    def __init__(self):
+        self._parts: List[np.ndarray] = []
+
+    def add(self, left: np.ndarray, right: np.ndarray) -> None:
+        self._parts.append(np.unique(np.column_stack([left, right]), axis=0))
+        if len(self._parts) >= _MERGE_EVERY:
+            self._merge()
+
+    def _merge(self) -> None:
+        self._parts = [np.unique(np.concatenate(self._parts), axis=0)]
+
+    def linked_to_many(self, side: int) -> np.ndarray:
+        """Sorted hashes on ``side`` (0 = a, 1 = b) paired with more than one distinct partner."""
+        if not self._parts:
+            return np.array([], dtype=np.uint64)
+        self._merge()
+        values, counts = np.unique(self._parts[0][:, side], return_counts=True)
+        return values[counts > 1]
+
+
+class SpreadSample:
+    """Up to about ``size`` rows taken at one even stride from every chunk seen."""
+
+    def __init__(self, size: int = DATE_SAMPLE_ROWS):
+        self.size = size
+        self.stride = 1
+        self._parts: List[pd.DataFrame] = []
+        self._rows = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        part = chunk.iloc[::self.stride]
+        self._parts.append(part)
+        self._rows += len(part)
+        while self._rows > self.size:
+            # Halve the density everywhere so early chunks are not over-represented
+            self.stride *= 2
+            self._parts = [p.iloc[::2] for p in self._parts]
+            self._rows = sum(len(p) for p in self._parts)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.concat(self._parts) if self._parts else pd.DataFrame()
+
+
+@dataclass
+class StreamSummary:
+    """Merged outcome of ``stream_validate``."""
+    rows: int = 0
+    chunks: int = 0
+    skipped_lines: int = 0
+    counts: Dict[str, int] = field(default_factory=lambda: {"valid": 0, "warning": 0, "error": 0})
+    rule_hits: Dict[str, int] = field(default_factory=lambda: {"missing_critical": 0, "invalid_formats": 0, "identity_conflicts": 0})
+    date_col: Any = None
+    daily: Optional[pd.DataFrame] = None
+    sample: Optional[pd.DataFrame] = None
+
+
+def _row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def stream_validate(
+    source,
+    id_column_name=None,
+    duplicate_mode: str = DUPLICATE_BY_ID,
+    quality_cols=None,
+    date_col=None,
+    sep: str = ",",
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    identity_pairs=None,
+    issue_sink: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> StreamSummary:
+    """
+    Validate a CSV (path, bytes or rewindable file object) chunk by chunk.
+
+    Gives the same statuses as ``classify_rows`` on the whole file, up to
+    64-bit hash collisions in duplicate and identity-conflict detection.
+    Values are compared as text. The date column (with ``date_col=None``)
+    and its format are detected on rows sampled across the whole file.
+    ``issue_sink``, if given, receives every chunk's non-valid rows
+    (``rows_frame`` layout) so callers can write them out as they go.
+    """
+    summary = StreamSummary()
+    date_format = FORMAT_INFER
+    use_id = duplicate_mode == DUPLICATE_BY_ID and bool(id_column_name)
+
+    # Pass 1: cross-chunk state
+    row_counter = HashCounter()
+    id_counter = HashCounter()
+    pairs: Dict[tuple, PairHashes] = {}
+    date_sample = SpreadSample()
+    for chunk, skipped in iter_csv_chunks(source, sep, chunk_rows):
+        summary.skipped_lines += skipped
+        if summary.chunks == 0:
+            use_id = use_id and id_column_name in chunk.columns
+        summary.chunks += 1
+        date_sample.add(chunk)
+        row_counter.add(_row_hashes(chunk))
+        if use_id:
+            id_counter.add(_row_hashes(chunk[[id_column_name]]))
+        for left, right in map(tuple, identity_pairs or IDENTITY_PAIRS):
+            if left in chunk.columns and right in chunk.columns:
+                # Like groupby().nunique(), rows missing either value link nothing
+                linked = chunk[[left, right]].dropna()
+                pairs.setdefault((left, right), PairHashes()).add(_row_hashes(linked[[left]]), _row_hashes(linked[[right]]))
+
+    repeated_rows = row_counter.repeated()
+    repeated_ids = id_counter.repeated() if use_id else None
+    # Hashes of the values linked to more than one partner, keyed like conflicting_identities
+    conflict_hashes = {}
+    for (left, right), linked in pairs.items():
+        conflict_hashes[(left, right)] = linked.linked_to_many(0)
+        conflict_hashes[(right, left)] = linked.linked_to_many(1)
+    sample = date_sample.frame()
+    if date_col is None:
+        detection = detect_date_column(sample)
+    else:
+        detection = describe_date_column(sample[date_col]) if date_col in sample.columns else None
+    if detection is not None:
+        date_col, date_format = detection.column, detection.format
+    del row_counter, id_counter, pairs, date_sample, sample
+
+    # Pass 2: classify each chunk against the file-wide state
+    daily_parts = []
+    samples = []
+    sampled = 0
+    for chunk, _ in iter_csv_chunks(source, sep, chunk_rows):
+        dup_all = np.isin(_row_hashes(chunk), repeated_rows)
+        dup_id = np.isin(_row_hashes(chunk[[id_column_name]]), repeated_ids) if use_id else None
+        conflicts = {}
+        for (name, other), hashes in conflict_hashes.items():
+            if not hashes.size:
+                # No conflicts in this direction; a missing key means none
+                continue
+            # Back from hashes to this chunk's actual conflicting values
+            values = chunk[name].to_numpy()[np.isin(_row_hashes(chunk[[name]]), hashes)]
+            conflicts[(name, other)] = pd.Index(pd.unique(values))
+        classified = classify_rows(
+            chunk, id_column_name, duplicate_mode, quality_cols, conflicts, (dup_all, dup_id), identity_pairs=identity_pairs
+        )
+
+        offset = summary.rows
+        summary.rows += len(chunk)
+        for status, count in classified.counts().items():
+            summary.counts[status] += count
+        validation = classified.validation
+        summary.rule_hits["missing_critical"] += int(validation.missing_critical.sum())
+        summary.rule_hits["invalid_formats"] += int(validation.invalid_formats.sum())
+        summary.rule_hits["identity_conflicts"] += int(validation.identity_conflicts.sum())
+
+        if date_col is not None and date_col in chunk.columns:
+            row_dates = parse_dates(chunk[date_col], date_format).dt.normalize()
+            dated = row_dates.notna().to_numpy()
+            if dated.any():
+                daily_parts.append(aggregate_daily(classified.status[dated], row_dates[dated]))
+
+        problems = classified.status != STATUS_VALID
+        if issue_sink is not None and problems.any():
+            issue_sink(rows_frame(chunk, classified, problems, offset))
+        if sampled < sample_rows:
+            positions = np.flatnonzero(problems)[:sample_rows - sampled]
+            if positions.size:
+                rows = np.zeros(len(chunk), dtype=bool)
+                rows[positions] = True
+                samples.append(rows_frame(chunk, classified, rows, offset))
+                sampled += positions.size
+
+    summary.date_col = date_col
+    if daily_parts:
+        summary.daily = pd.concat(daily_parts).groupby("date", as_index=False).sum().sort_values("date").reset_index(drop=True)
+    if samples:
+        summary.sample = pd.concat(samples)
+    return summary
@@ -0,0 +1,446 @@
+"""
+Row-level data quality rules used by the dashboard.
+
+Results are kept columnar: one boolean mask per rule plus a compact issue
+table of integer codes. The per-row dict form is only built on demand for
+display via ``ValidationResult.to_records`` / ``ValidationResult.to_frame``.
+
+``classify_rows`` runs every rule once over a whole dataset and returns
+per-row status codes; views such as a date range only slice those codes.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+AMOUNT_KEYWORDS = ['amount', 'value', 'price', 'cost', 'total']
+TIMESTAMP_KEYWORDS = ['date', 'time', 'created', 'timestamp', 'updated']
+
+# Issue codes stored in the compact issue table
+ISSUE_MISSING_CRITICAL = 1
+ISSUE_NEGATIVE_AMOUNT = 2
+ISSUE_INVALID_DATE = 3
+ISSUE_IDENTITY_CONFLICT = 4
+
+# Issue code -> legacy result category
+ISSUE_CATEGORIES = {
+    ISSUE_MISSING_CRITICAL: 'missing_critical',
+    ISSUE_NEGATIVE_AMOUNT: 'invalid_formats',
+    ISSUE_INVALID_DATE: 'invalid_formats',
+    ISSUE_IDENTITY_CONFLICT: 'identity_conflicts',
+}
+
+# Per-row status and issue codes produced by classify_rows
+STATUS_VALID = 0
+STATUS_WARNING = 1
+STATUS_ERROR = 2
+STATUS_LABELS = np.array(['valid', 'warning', 'error'], dtype=object)
+
+ROW_ISSUE_OK = 0
+ROW_ISSUE_MISSING = 1
+ROW_ISSUE_DUPLICATE = 2
+ROW_ISSUE_LABELS = np.array(['ok', 'missing', 'duplicate'], dtype=object)
+
+DUPLICATE_BY_ID = "By ID Column"
+DUPLICATE_BY_ALL = "By All Columns"
+
+# Columns matching these never raise missing-value warnings (they are critical)
+NON_CRITICAL_EXCLUDE_KEYWORDS = ['amount', 'date', 'time']
+
+# Column pairs expected to map one-to-one; each is checked in both directions
+IDENTITY_PAIRS = [('user_id', 'card_id')]
+
+
+def parse_identity_pairs(spec: str) -> List[Tuple[str, str]]:
+    """Parse ``"user_id:card_id,user_id:device_id"``; empty means ``IDENTITY_PAIRS``."""
+    pairs = []
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        left, sep, right = item.partition(':')
+        if not sep or not left.strip() or not right.strip():
+            raise ValueError(f"Invalid identity pair: {item!r} (expected 'a:b')")
+        pairs.append((left.strip(), right.strip()))
+    return pairs or list(IDENTITY_PAIRS)
+
+
+def _identity_directions(identity_pairs) -> List[Tuple[Any, Any]]:
+    directions = []
+    for left, right in identity_pairs or IDENTITY_PAIRS:
+        for direction in ((left, right), (right, left)):
+            if direction not in directions:
+                directions.append(direction)
+    return directions
+
+
+def conflicting_identities(pairs: pd.DataFrame, identity_pairs=None) -> Dict[Tuple[Any, Any], pd.Index]:
+    """Values of each identity field linked to more than one value of its partner.
+
+    Keyed by ``(field, other)``. ``pairs`` only needs the identity columns;
+    distinct pairs are enough, which lets chunked callers accumulate them
+    without keeping every row.
+    """
+    conflicts = {}
+    for field, other in _identity_directions(identity_pairs):
+        if field in pairs.columns and other in pairs.columns:
+            counts = pairs.groupby(field)[other].nunique()
+            conflicts[(field, other)] = counts.index[counts > 1]
+    return conflicts
+
+
+def default_id_column(columns):
+    """The dashboard's ID column choice: first column named like an ID, else the first column."""
+    columns = list(columns)
+    if not columns:
+        return None
+    id_candidates = [c for c in columns if 'id' in str(c).lower()]
+    return id_candidates[0] if id_candidates else columns[0]
+
+
+def find_amount_fields(columns) -> List[Any]:
+    """Columns that look like monetary amounts."""
+    return [col for col in columns if any(keyword in str(col).lower() for keyword in AMOUNT_KEYWORDS)]
+
+
+def find_timestamp_fields(columns) -> List[Any]:
+    """Columns that look like dates or timestamps."""
+    return [col for col in columns if any(keyword in str(col).lower() for keyword in TIMESTAMP_KEYWORDS)]
+
+
+@dataclass
+class ValidationResult:
+    """Columnar outcome of ``validate_data_quality``.
+
+    The masks are aligned to the validated frame's index. ``issues`` holds one
+    row per (row, field, rule) hit with ``row`` as a positional offset,
+    ``field`` as an offset into ``fields`` and ``issue`` as an ISSUE_* code;
+    identity conflicts also name the partner column in ``other`` (an offset
+    into ``fields``, -1 for the other rules).
+    """
+    index: pd.Index
+    fields: List[Any]
+    missing_critical: pd.Series
+    invalid_formats: pd.Series
+    identity_conflicts: pd.Series
+    issues: pd.DataFrame
+
+    @property
+    def error_mask(self) -> pd.Series:
+        """Rows hit by any hard-error rule."""
+        return self.missing_critical | self.invalid_formats | self.identity_conflicts
+
+    @property
+    def valid_rows(self) -> pd.Index:
+        """Index labels of rows without any issue."""
+        return self.index[~self.error_mask.to_numpy()]
+
+    def to_frame(self, df: pd.DataFrame, limit: Optional[int] = None, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Readable issue table (row label, field, message) for display.
+
+        ``rows`` optionally restricts the output to a positional boolean mask.
+        """
+        issues = self.issues
+        if rows is not None:
+            issues = issues[np.asarray(rows, dtype=bool)[issues['row'].to_numpy()]]
+        if limit is not None:
+            issues = issues.head(limit)
+        records = []
+        columns = (issues[name].to_numpy() for name in ('row', 'field', 'issue', 'other'))
+        for pos, field_code, code, other_code in zip(*columns):
+            field = self.fields[field_code]
+            value = df[field].iloc[pos]
+            if code == ISSUE_MISSING_CRITICAL:
+                message = f'Missing critical field: {field}'
+            elif code == ISSUE_NEGATIVE_AMOUNT:
+                message = f'Negative amount: {pd.to_numeric(value, errors="coerce")}'
+            elif code == ISSUE_INVALID_DATE:
+                message = f'Invalid date format: {value}'
+            else:
+                message = f'{field} {value} linked to multiple {self.fields[other_code]} values'
+            records.append({'row': self.index[pos], 'field': field, 'issue': message})
+        return pd.DataFrame(records, columns=['row', 'field', 'issue'])
+
+    def to_records(self, df: pd.DataFrame, limit: Optional[int] = None, rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Legacy ``{'row', 'field', 'issue'}`` dicts, built on demand."""
+        return self.to_frame(df, limit, rows).to_dict('records')
+
+
+def _empty_issues() -> pd.DataFrame:
+    return pd.DataFrame({
+        'row': np.array([], dtype=np.int64),
+        'field': np.array([], dtype=np.int16),
+        'issue': np.array([], dtype=np.int8),
+        'other': np.array([], dtype=np.int16),
+    })
+
+
+def validate_data_quality(df, id_column_name=None, conflicting_values=None, identity_pairs=None) -> ValidationResult:
+    """
+    Advanced data quality validation with specific rules:
+    - Missing critical fields (user ID, card ID, transaction amount, timestamp)
+    - Invalid formats (negative amount, invalid date, malformed ID)
+    - Conflicting identity mappings between ``identity_pairs`` columns
+      (default ``IDENTITY_PAIRS``)
+
+    ``conflicting_values`` optionally supplies the result of
+    ``conflicting_identities`` computed over a larger dataset than ``df``.
+    """
+    fields: List[Any] = []
+    parts = []
+
+    def _field_code(field):
+        if field not in fields:
+            fields.append(field)
+        return fields.index(field)
+
+    def _record(mask, field, code, other=None):
+        positions = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if positions.size:
+            parts.append((positions, _field_code(field), code, -1 if other is None else _field_code(other)))
+
+    no_rows = pd.Series(False, index=df.index)
+    missing_critical = no_rows.copy()
+    invalid_formats = no_rows.copy()
+    identity_conflicts = no_rows.copy()
+
+    if df.empty:
+        return ValidationResult(df.index, fields, missing_critical, invalid_formats, identity_conflicts, _empty_issues())
+
+    # 1. Check for missing critical fields
+    critical_fields = []
+    if id_column_name and id_column_name in df.columns:
+        critical_fields.append(id_column_name)
+
+    amount_fields = find_amount_fields(df.columns)
+    timestamp_fields = find_timestamp_fields(df.columns)
+
+    critical_fields.extend(amount_fields[:1])  # Take first amount field
+    critical_fields.extend(timestamp_fields[:1])  # Take first timestamp field
+
+    for field in critical_fields:
+        if field in df.columns:
+            mask = df[field].isna()
+            missing_critical |= mask
+            _record(mask, field, ISSUE_MISSING_CRITICAL)
+
+    # 2. Check for invalid formats
+    for field in amount_fields:
+        try:
+            mask = pd.to_numeric(df[field], errors='coerce') < 0
+        except Exception:
+            continue
+        invalid_formats |= mask
+        _record(mask, field, ISSUE_NEGATIVE_AMOUNT)
+
+    for field in timestamp_fields:
+        try:
+            mask = pd.to_datetime(df[field], errors='coerce').isna() & df[field].notna()
+        except Exception:
+            continue
+        invalid_formats |= mask
+        _record(mask, field, ISSUE_INVALID_DATE)
+
+    # 3. Check for identity conflicts (if ID column exists)
+    if id_column_name and id_column_name in df.columns:
+        # A value linked to multiple partner values, one groupby-transform per direction
+        for field, other in _identity_directions(identity_pairs):
+            if field not in df.columns or other not in df.columns:
+                continue
+            if conflicting_values is not None:
+                mask = df[field].isin(conflicting_values.get((field, other), []))
+            else:
+                mask = df.groupby(field, sort=False)[other].transform('nunique') > 1
+            identity_conflicts |= mask
+            _record(mask, field, ISSUE_IDENTITY_CONFLICT, other)
+
+    if parts:
+        issues = pd.DataFrame({
+            'row': np.concatenate([positions for positions, _, _, _ in parts]).astype(np.int64),
+            'field': np.concatenate([np.full(positions.size, code, dtype=np.int16) for positions, code, _, _ in parts]),
+            'issue': np.concatenate([np.full(positions.size, issue, dtype=np.int8) for positions, _, issue, _ in parts]),
+            'other': np.concatenate([np.full(positions.size, other, dtype=np.int16) for positions, _, _, other in parts]),
+        })
+    else:
+        issues = _empty_issues()
+
+    return ValidationResult(df.index, fields, missing_critical, invalid_formats, identity_conflicts, issues)
+
+
+def _group_codes(df: pd.DataFrame) -> np.ndarray:
+    """Dense group code per row; rows with the same 64-bit fingerprint share a code."""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return pd.factorize(hashes)[0]
+
+
+class DuplicateIndex:
+    """
+    Duplicate lookups for one dataset, hashed once.
+
+    Whole rows and the ID column are fingerprinted into 64-bit hashes and
+    factorized into group codes, so membership for any positional subset only
+    touches that subset. Equal fingerprints are treated as equal rows (64-bit
+    hash collisions are ignored).
+    """
+
+    def __init__(self, df: pd.DataFrame, id_column_name=None):
+        self.size = len(df)
+        self.row_groups = _group_codes(df) if self.size else np.zeros(0, dtype=np.intp)
+        self.id_groups = None
+        if id_column_name and id_column_name in df.columns:
+            self.id_groups = _group_codes(df[[id_column_name]]) if self.size else np.zeros(0, dtype=np.intp)
+        self._full = {}
+
+    @property
+    def has_id(self) -> bool:
+        return self.id_groups is not None
+
+    def duplicated(self, by_id: bool = False, rows=None, keep=False) -> np.ndarray:
+        """Like ``DataFrame.duplicated`` over the rows selected by ``rows``.
+
+        ``by_id`` compares the ID column only. ``rows`` is a positional
+        boolean mask or array of positions; the result is aligned to it.
+        """
+        groups = self.id_groups if by_id else self.row_groups
+        if groups is None:
+            raise ValueError("DuplicateIndex was built without an ID column")
+        if rows is None and keep is False:
+            # Full-dataset membership is reused by most callers
+            if by_id not in self._full:
+                self._full[by_id] = np.bincount(groups)[groups] > 1 if groups.size else np.zeros(0, dtype=bool)
+            return self._full[by_id]
+        subset = groups if rows is None else groups[rows]
+        return pd.Series(subset).duplicated(keep=keep).to_numpy()
+
+    def duplicate_count(self, by_id: bool = False, rows=None) -> int:
+        """Rows repeating an earlier row (``duplicated().sum()``)."""
+        return int(self.duplicated(by_id, rows, keep='first').sum())
+
+    def strong(self, rows=None) -> np.ndarray:
+        """Same ID and identical row."""
+        return self.duplicated(True, rows) & self.duplicated(False, rows)
+
+    def weak(self, rows=None) -> np.ndarray:
+        """Same ID, different payload."""
+        return self.duplicated(True, rows) & ~self.duplicated(False, rows)
+
+
+@dataclass
+class RowClassification:
+    """Per-row outcome of ``classify_rows``, positionally aligned to the frame."""
+    status: np.ndarray
+    issue: np.ndarray
+    first_missing: np.ndarray
+    validation: ValidationResult
+
+    def counts(self, rows: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """valid/warning/error totals, optionally for a positional boolean mask."""
+        status = self.status if rows is None else self.status[np.asarray(rows, dtype=bool)]
+        valid, warning, error = np.bincount(status, minlength=3)[:3]
+        return {"valid": int(valid), "warning": int(warning), "error": int(error)}
+
+
+def non_critical_columns(quality_cols, id_column_name=None) -> List[Any]:
+    """Quality columns whose missing values are warnings rather than errors."""
+    return [
+        col for col in quality_cols
+        if col != id_column_name and not any(keyword in str(col).lower() for keyword in NON_CRITICAL_EXCLUDE_KEYWORDS)
+    ]
+
+
+def classify_rows(
+    df,
+    id_column_name=None,
+    duplicate_mode=DUPLICATE_BY_ID,
+    quality_cols=None,
+    conflicting_values=None,
+    duplicate_masks=None,
+    duplicates: Optional[DuplicateIndex] = None,
+    identity_pairs=None,
+) -> RowClassification:
+    """
+    Run all rules once over ``df`` and assign each row a single status:
+    - Error: hard validation issue, or same ID + identical row (all-columns
+      duplicate in "By All Columns" mode)
+    - Warning: missing non-critical quality column, or same ID + differing row
+    - Valid: everything else
+
+    Chunked callers pass state gathered over the whole file:
+    ``conflicting_values`` (see ``conflicting_identities``) and
+    ``duplicate_masks`` as ``(dup_all, dup_id)`` boolean arrays aligned to
+    ``df``, where ``dup_id`` may be None outside "By ID Column" mode. A
+    ``DuplicateIndex`` built once per dataset can be passed as ``duplicates``
+    instead.
+    """
+    n = len(df)
+    validation = validate_data_quality(df, id_column_name, conflicting_values, identity_pairs)
+    error = validation.error_mask.to_numpy(dtype=bool, copy=True)
+
+    if quality_cols is None:
+        quality_cols = list(df.columns)
+    quality_cols = [c for c in quality_cols if c in df.columns]
+
+    non_critical = non_critical_columns(quality_cols, id_column_name)
+    if non_critical and n:
+        warning = df[non_critical].isna().to_numpy().any(axis=1)
+    else:
+        warning = np.zeros(n, dtype=bool)
+
+    # Duplicate handling: repeated IDs are allowed in "By ID Column" mode
+    by_id = duplicate_mode == DUPLICATE_BY_ID and bool(id_column_name) and id_column_name in df.columns
+    if duplicate_masks is None:
+        if duplicates is None:
+            duplicates = DuplicateIndex(df, id_column_name if by_id else None)
+        duplicate_masks = (duplicates.duplicated(), duplicates.duplicated(by_id=True) if by_id else None)
+    dup_all, dup_id = duplicate_masks
+    if by_id:
+        error |= dup_id & dup_all
+        warning |= dup_id & ~dup_all
+        dup_indicator = dup_id
+    else:
+        error |= dup_all
+        dup_indicator = dup_all
+
+    status = np.where(error, STATUS_ERROR, np.where(warning, STATUS_WARNING, STATUS_VALID)).astype(np.int8)
+    issue = np.where(
+        dup_indicator, ROW_ISSUE_DUPLICATE, np.where(status == STATUS_WARNING, ROW_ISSUE_MISSING, ROW_ISSUE_OK)
+    ).astype(np.int8)
+
+    # First missing column per row within quality_cols
+    first_missing = np.full(n, None, dtype=object)
+    if quality_cols and n:
+        miss = df[quality_cols].isna().to_numpy()
+        any_missing = miss.any(axis=1)
+        first_missing[any_missing] = np.asarray(quality_cols, dtype=object)[miss[any_missing].argmax(axis=1)]
+
+    return RowClassification(status, issue, first_missing, validation)
+
+
+def aggregate_daily(status, dates) -> pd.DataFrame:
+    """Per-day valid/warning/error counts from status codes and normalized dates."""
+    status = np.asarray(status)
+    agg = pd.DataFrame({
+        "date": pd.to_datetime(pd.Series(dates)).reset_index(drop=True),
+        "valid": (status == STATUS_VALID).astype(int),
+        "warning": (status == STATUS_WARNING).astype(int),
+        "error": (status == STATUS_ERROR).astype(int),
+    })
+    return agg.groupby("date", as_index=False).sum().sort_values("date").reset_index(drop=True)
+
+
+def rows_frame(df, classification: RowClassification, rows: Optional[np.ndarray] = None, offset: int = 0) -> pd.DataFrame:
+    """Drill-down frame: the original columns plus status/record_id/column/issue.
+
+    ``record_id`` is the row's 1-based position in the file; ``offset`` is the
+    number of rows before ``df`` when it is one chunk of a larger file.
+    """
+    if rows is None:
+        rows = np.ones(len(df), dtype=bool)
+    rows = np.asarray(rows, dtype=bool)
+    out = df[rows].copy()
+    out["status"] = STATUS_LABELS[classification.status[rows]]
+    out["record_id"] = offset + np.flatnonzero(rows) + 1
+    out["column"] = classification.first_missing[rows]
+    out["issue"] = ROW_ISSUE_LABELS[classification.issue[rows]]
+    return out
@@ -0,0 +1,88 @@
+"""
+Test script for the /api/analytics endpoint (runs against the file-backed mock store)
+"""
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import OperationFailure
+
+import backend.db as db
+
+
+def _seed(mock_client):
+    """Client on a mock store with sessions over the last few days and one outside the window."""
+    client = mock_client()
+    sessions = db.get_session_collection()
+    buckets = db.get_session_actions_collection()
+    now = datetime.utcnow()
+    durations = [None, 1.0, 2.0, 3.0, 4.0, 10.0]
+    for i, duration in enumerate(durations):
+        start = now - timedelta(days=i % 3, hours=1)
+        sessions.insert_one({
+            "session_id": f"s{i}",
+            "start_time": start,
+            "end_time": start + timedelta(minutes=duration) if duration is not None else None,
+            "duration_minutes": duration,
+            "action_count": i,
+        })
+        if i:
+            actions = [{"action": "click" if j % 2 else "upload"} for j in range(i)]
+            buckets.insert_one({"session_id": f"s{i}", "seq": 0, "session_start": start, "count": i, "actions": actions})
+    sessions.insert_one({"session_id": "old", "start_time": now - timedelta(days=30), "end_time": now, "duration_minutes": 99.0, "action_count": 1})
+    buckets.insert_one({"session_id": "old", "seq": 0, "session_start": now - timedelta(days=30), "count": 1, "actions": [{"action": "click"}]})
+    return client
+
+
+def test_analytics_totals_and_breakdowns(mock_client):
+    """Totals match the per-document definition; breakdowns cover only the window"""
+    client = _seed(mock_client)
+    resp = client.get("/api/analytics?days=7")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["total_sessions"] == 6
+    assert data["completed_sessions"] == 5
+    # Averages over the five sessions with a duration (action counts 1..5)
+    assert data["avg_duration_minutes"] == 4.0
+    assert data["total_actions"] == 15
+    assert data["avg_actions_per_session"] == 3.0
+    assert "by_day" not in data
+
+    data = client.get("/api/analytics?days=7&breakdown=day,action,percentiles").get_json()
+    assert sum(day["sessions"] for day in data["by_day"]) == 6
+    assert [day["date"] for day in data["by_day"]] == sorted(day["date"] for day in data["by_day"])
+    assert data["by_action"] == [{"action": "upload", "count": 9}, {"action": "click", "count": 6}]
+    assert data["duration_percentiles"] == {"p50": 3.0, "p95": 10.0}
+
+    assert client.get("/api/analytics?breakdown=weekly").status_code == 400
+
+
+def test_action_breakdown_includes_embedded_actions(mock_client):
+    """Sessions stored before bucketing still count their embedded actions"""
+    client = _seed(mock_client)
+    db.get_session_collection().insert_one({
+        "session_id": "legacy", "start_time": datetime.utcnow() - timedelta(hours=2), "end_time": None,
+        "action_count": 3, "actions": [{"action": "click"}, {"action": "export"}, {"action": "click"}],
+    })
+    data = client.get("/api/analytics?days=7&breakdown=action").get_json()
+    assert data["by_action"] == [{"action": "upload", "count": 9}, {"action": "click", "count": 8}, {"action": "export", "count": 1}]
+
+
+def test_percentiles_without_server_support(mock_client):
+    """Servers without $percentile fall back to one sorted lookup per percentile"""
+    class OldServerCollection(db.MockCollection):
+        def aggregate(self, pipeline, **kwargs):
+            if "$percentile" in db._dumps(pipeline):
+                raise OperationFailure("Unrecognized expression '$percentile'")
+            return super().aggregate(pipeline, **kwargs)
+
+    client = _seed(mock_client)
+    sessions = db._collections["sessions"]
+    db._collections["sessions"] = OldServerCollection(sessions.data_store)
+    data = client.get("/api/analytics?days=7&breakdown=percentiles").get_json()
+    assert data["duration_percentiles"] == {"p50": 3.0, "p95": 10.0}
+
+
+if __name__ == "__main__":
+    # The API tests use the fixtures in conftest.py, so run them through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
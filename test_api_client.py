@@ -0,0 +1,90 @@
+"""
+Test script for the pooled session and background health monitor in frontend/api_client.py
+"""
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from frontend.api_client import HealthMonitor, make_session
+
+
+class _HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits += 1
+        self.send_response(200 if self.path == "/health" else 404)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _HealthHandler)
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _free_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def _wait_known(monitor, url, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = monitor.status(url)
+        if status.ok is not None:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"{url} was never probed")
+
+
+def test_watch_never_blocks():
+    """Statuses come from the background thread; a dead backend costs the caller nothing"""
+    server, up = _serve()
+    down = _free_url()
+    monitor = HealthMonitor(make_session(), interval=0.2, timeout=1)
+    try:
+        started = time.time()
+        assert monitor.watch(up).ok is None
+        assert monitor.watch(down).ok is None
+        assert time.time() - started < 0.1
+
+        assert _wait_known(monitor, up).ok is True
+        status = _wait_known(monitor, down)
+        assert status.ok is False and status.error
+        started = time.time()
+        for _ in range(100):
+            monitor.watch(down)
+        assert time.time() - started < 0.1
+
+        # Probed again every interval, not on every watch()
+        hits = server.hits
+        time.sleep(0.5)
+        assert 1 <= server.hits - hits <= 4
+    finally:
+        server.shutdown()
+
+
+def test_status_expires():
+    """A status older than the TTL is reported as unknown"""
+    server, up = _serve()
+    monitor = HealthMonitor(make_session(), interval=60, ttl=0.2)
+    try:
+        assert monitor.probe(up).ok is True
+        assert monitor.status(up + "/").ok is True
+        time.sleep(0.3)
+        assert monitor.status(up).ok is None
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_watch_never_blocks()
+    test_status_expires()
+    print("✅ API client tests passed")
@@ -0,0 +1,119 @@
+"""
+Test script for the headless batch validator in quality_core/batch.py
+"""
+import json
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from quality_core.batch import DUPLICATE_MODES, find_input_files, run_batch, validate_file
+from quality_core.date_detection import detect_date_column
+from quality_core.ingest import read_csv_fast, sniff_delimiter
+from quality_core.validation import DUPLICATE_BY_ID, DuplicateIndex, classify_rows, default_id_column, parse_identity_pairs
+
+
+def test_batch_matches_dashboard_counts():
+    """Every supported file is validated in the pool and results land on disk"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = Path(tmp, "in"), Path(tmp, "out")
+        src.mkdir()
+        sample = pd.read_csv("test_sample_data.csv")
+        sample.to_csv(src / "a.csv", index=False)
+        sample.to_csv(src / "b.txt", sep=";", index=False)
+        (src / "notes.md").write_text("ignored")
+        (src / "broken.csv").write_text("")
+
+        files = find_input_files(src)
+        assert sorted(p.name for p in files) == ["a.csv", "b.txt", "broken.csv"]
+
+        for stream in (False, True):
+            overall = run_batch(files, out, workers=2, stream=stream)
+            assert overall["files"] == 3 and overall["failed"] == 1
+            assert overall["totals"] == {"valid": 8, "warning": 12, "error": 0}
+
+            summary = json.loads((out / "b.txt.summary.json").read_text())
+            assert summary["counts"] == {"valid": 4, "warning": 6, "error": 0}
+            assert summary["id_column"] == "ID"
+            assert summary["date_column"] == "JoinDate"
+            assert sum(day["warning"] for day in summary["daily"]) == 6
+
+            issues = pd.read_csv(out / "a.csv.issues.csv")
+            assert len(issues) == 6
+            # Positions in the file, as the dashboard numbers its drill-down rows
+            assert issues["record_id"].tolist() == [1, 2, 3, 6, 7, 10]
+            assert set(issues["status"]) == {"warning"}
+
+
+def test_streamed_matches_in_memory():
+    """Both modes give the same results and issue rows for the sample CSV"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("id", "all"):
+            results = {}
+            for stream in (False, True):
+                out = Path(tmp, f"{mode}-{stream}")
+                summary = validate_file("test_sample_data.csv", out, duplicate_mode=DUPLICATE_MODES[mode], stream=stream)
+                issues = pd.read_csv(out / "test_sample_data.csv.issues.csv")[["record_id", "status", "issue"]]
+                results[stream] = ({k: summary[k] for k in ("rows", "counts", "rule_hits", "daily", "id_column", "date_column")}, issues)
+            assert results[False][0] == results[True][0], mode
+            pd.testing.assert_frame_equal(results[False][1], results[True][1])
+
+
+def _dashboard_counts(path):
+    """What the upload tab computes for a CSV in its default (in-memory) mode, without a column filter."""
+    data = Path(path).read_bytes()
+    df = read_csv_fast(data, sep=sniff_delimiter(data)).frame
+    id_column = default_id_column(df.columns)
+    classified = classify_rows(
+        df, id_column, DUPLICATE_BY_ID, list(df.columns),
+        duplicates=DuplicateIndex(df, id_column), identity_pairs=parse_identity_pairs(""),
+    )
+    detection = detect_date_column(df)
+    return classified.counts(), detection.column if detection is not None else None
+
+
+def test_in_memory_matches_dashboard():
+    """Batch reads CSVs with inferred types, like the dashboard, and reports its counts and date column"""
+    fixtures = {
+        # Equal once typed: 10 vs 10.0, a date vs the same day as a unix timestamp
+        "mixed.csv": "id,amount,created\n1,10,2024-01-01\n1,10.0,1704067200\n2,,2024-01-02\n",
+        "unix.csv": "id,name,ts\n1,a,1704067200\n2,b,1704153600\n2,,1704240000\n",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in fixtures.items():
+            path = Path(tmp, name)
+            path.write_text(text)
+            summary = validate_file(path, Path(tmp, "out"))
+            counts, date_column = _dashboard_counts(path)
+            assert summary["counts"] == counts, name
+            assert summary["date_column"] == date_column, name
+        assert summary["date_column"] == "ts" and summary["daily"]
+
+
+def test_recursive_duplicate_basenames():
+    """Same-named files in different subdirectories get separate outputs under mirrored paths"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = Path(tmp, "in"), Path(tmp, "out")
+        sample = pd.read_csv("test_sample_data.csv")
+        for sub, rows in (("a", 10), ("b", 4)):
+            (src / sub).mkdir(parents=True)
+            sample.head(rows).to_csv(src / sub / "x.csv", index=False)
+
+        files = find_input_files(src, recursive=True)
+        overall = run_batch(files, out, workers=2, base_dir=src)
+        assert overall["failed"] == 0
+        issues_files = [r["issues_file"] for r in overall["results"]]
+        assert len(set(issues_files)) == 2
+        for sub, rows in (("a", 10), ("b", 4)):
+            summary = json.loads((out / sub / "x.csv.summary.json").read_text())
+            assert summary["rows"] == rows
+            assert summary["issues_file"] == str(out / sub / "x.csv.issues.csv")
+        assert not (out / "x.csv.summary.json").exists()
+
+
+if __name__ == "__main__":
+    test_batch_matches_dashboard_counts()
+    test_streamed_matches_in_memory()
+    test_in_memory_matches_dashboard()
+    test_recursive_duplicate_basenames()
+    print("✅ Batch tests passed")
@@ -0,0 +1,58 @@
+"""
+Test script for the date column auto-detection in quality_core/date_detection.py
+"""
+import pandas as pd
+
+from quality_core.date_detection import (
+    FORMAT_UNIX,
+    describe_date_column,
+    detect_date_column,
+    parse_dates,
+)
+
+
+def test_picks_date_column_and_format():
+    """ID-like names are skipped and the explicit format wins over inference"""
+    df = pd.DataFrame({
+        'order_id': ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'],
+        'name': ['a', 'b', 'c', 'd'],
+        'joined': ['01/02/2024', '01/03/2024', '01/04/2024', 'n/a'],
+    })
+    detection = detect_date_column(df)
+    assert detection.column == 'joined'
+    assert detection.format == '%m/%d/%Y'
+    assert detection.valid_ratio == 0.75
+    assert parse_dates(df['joined'], detection.format).dt.day.tolist()[:3] == [2, 3, 4]
+
+
+def test_sample_winner_confirmed_on_full_column():
+    """A column that only looks like dates in the sample is rejected on the full column"""
+    good = pd.date_range('2024-01-01', periods=50, freq='D').strftime('%Y-%m-%d').tolist()
+    df = pd.DataFrame({
+        'created': good * 2,
+        'noisy': good + ['bad'] * 50,
+    })
+    # A tiny sample can rank 'noisy' first; the full-column check must still hold
+    detection = detect_date_column(df, sample_size=5)
+    assert detection.column == 'created'
+    assert describe_date_column(df['noisy'], sample_size=100, min_valid_ratio=0.6) is None
+
+
+def test_numeric_columns():
+    """Only plausible unix timestamps qualify among numeric columns"""
+    df = pd.DataFrame({
+        'amount': [10.5, 20.0, 30.0],
+        'ts': [1704067200, 1704153600, 1704240000],
+    })
+    detection = detect_date_column(df)
+    assert detection.column == 'ts'
+    assert detection.format == FORMAT_UNIX
+    assert detection.unique_days == 3
+    assert detect_date_column(df[['amount']]) is None
+
+
+if __name__ == "__main__":
+    test_picks_date_column_and_format()
+    test_sample_winner_confirmed_on_full_column()
+    test_numeric_columns()
+    print("✅ Date detection tests passed")
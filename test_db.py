@@ -0,0 +1,299 @@
+"""
+Test script for backend/db.py connection handling and the file-backed mock store
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pytest
+
+import backend.db as db
+from backend.config import load_config
+
+
+def test_handles_resolved_once(mock_store, monkeypatch):
+    """Config is loaded once at init; later lookups reuse the same handles"""
+    calls = []
+    original = db.load_config
+
+    def counting_load_config():
+        calls.append(1)
+        return original()
+
+    monkeypatch.setattr(db, "load_config", counting_load_config)
+    assert db.init_db(force=True) is False
+    first = db.get_session_collection()
+    for _ in range(100):
+        assert db.get_session_collection() is first
+        db.get_feedback_collection()
+        db.get_collection()
+    assert len(calls) == 1
+
+
+def test_pool_settings_from_env():
+    """Pool size, timeouts and write concern come from the environment"""
+    saved = {k: os.environ.get(k) for k in ("MONGO_MAX_POOL_SIZE", "MONGO_WRITE_CONCERN", "MONGO_JOURNAL")}
+    os.environ.update({"MONGO_MAX_POOL_SIZE": "25", "MONGO_WRITE_CONCERN": "majority", "MONGO_JOURNAL": "true"})
+    try:
+        config = load_config()
+        assert config.max_pool_size == 25
+        assert config.server_selection_timeout_ms == 2000
+        assert db._write_concern_w(config.write_concern) == "majority"
+        assert db._write_concern_w("1") == 1
+        assert config.journal is True
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+class _FakeMongo:
+    """Stand-in MongoClient whose ping and create_index fail on demand."""
+    def __init__(self, ping_error=None, index_error=None):
+        self.ping_error, self.index_error = ping_error, index_error
+        self.admin = self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def command(self, name):
+        if self.ping_error:
+            raise self.ping_error
+
+    def __getitem__(self, name):
+        return self
+
+    def create_index(self, *args, **kwargs):
+        if self.index_error:
+            raise self.index_error
+
+
+def test_mongo_fallback_only_when_unreachable(mock_store, monkeypatch, caplog):
+    """Connection failures use the mock store; index errors are logged and keep MongoDB"""
+    from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+    monkeypatch.setattr(db, "_client", None)
+    monkeypatch.setattr(db, "_indexes_ready", False)
+    monkeypatch.setattr(db, "_use_mock", False)
+    monkeypatch.setattr(db, "MongoClient", _FakeMongo(index_error=OperationFailure("Index with name: date_dataset already exists with different options")))
+    assert db.init_db(force=True) is True
+    assert db._use_mock is False and isinstance(db.get_collection(), _FakeMongo)
+    assert "Could not create the MongoDB indexes" in caplog.text
+
+    monkeypatch.setattr(db, "_client", None)
+    monkeypatch.setattr(db, "MongoClient", _FakeMongo(ping_error=ServerSelectionTimeoutError("no servers")))
+    assert db.init_db(force=True) is False
+    assert db._use_mock is True and db._client is None
+
+
+
+def test_forced_reconnect_after_fallback(mock_store, monkeypatch):
+    """After a fallback to the mock store, init_db(force=True) tries MongoDB again"""
+    from pymongo.errors import ServerSelectionTimeoutError
+
+    monkeypatch.setattr(db, "_client", None)
+    monkeypatch.setattr(db, "_indexes_ready", False)
+    monkeypatch.setattr(db, "_use_mock", False)
+    monkeypatch.setattr(db, "MongoClient", _FakeMongo(ping_error=ServerSelectionTimeoutError("no servers")))
+    assert db.init_db(force=True) is False
+    assert db._use_mock is True and isinstance(db.get_collection(), db.MockCollection)
+    assert db._mock_logs
+
+    # The server is back
+    monkeypatch.setattr(db, "MongoClient", _FakeMongo())
+    assert db.init_db(force=True) is True
+    assert db._use_mock is False and isinstance(db.get_collection(), _FakeMongo)
+    assert not db._mock_logs
+
+def test_mock_log_replay_and_compaction():
+    """Mutations are appended one line each; snapshot + log replay restores them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.json")
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        sessions = db.MockCollection(log.load(), log=log)
+        for i in range(50):
+            sessions.insert_one({"session_id": f"s{i}", "start_time": datetime(2024, 1, 1, 12, i), "actions": []})
+        sessions.update_one({"session_id": "s3"}, {"$push": {"actions": {"type": "click"}}, "$inc": {"action_count": 1}})
+        log.close()
+        assert not os.path.exists(path)
+        with open(log.log_path) as f:
+            assert len(f.readlines()) == 51
+
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        docs = log.load()
+        assert len(docs) == 50
+        s3 = next(d for d in docs if d["session_id"] == "s3")
+        assert s3["action_count"] == 1 and s3["actions"] == [{"type": "click"}]
+        assert s3["start_time"] == datetime(2024, 1, 1, 12, 3)
+
+        # Compaction folds the log into the snapshot; a torn tail line is skipped on replay
+        log.compact()
+        log.close()
+        assert not os.path.exists(log.log_path) and not os.path.exists(log.rotated_path)
+        with open(log.log_path, "a") as f:
+            f.write('{"op": "put", "doc": {"_id": "x"')
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        sessions = db.MockCollection(log.load(), log=log)
+        assert len(sessions.data_store) == 50
+        sessions.insert_one({"session_id": "late"})
+        log.close()
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        assert [d["session_id"] for d in log.load()][-1] == "late"
+        log.close()
+
+
+def test_mock_log_background_compaction():
+    """The background thread compacts once the log passes its threshold"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = db.MockLog(os.path.join(tmp, "feedback.json"), fsync_interval=0.01, compact_records=10)
+        feedback = db.MockCollection(log.load(), log=log)
+        for i in range(25):
+            feedback.insert_one({"rating": i})
+        deadline = time.time() + 5
+        while not os.path.exists(log.path) and time.time() < deadline:
+            time.sleep(0.01)
+        log.close()
+        assert os.path.exists(log.path)
+        replayed = db.MockLog(log.path)
+        assert len(replayed.load()) == 25
+        replayed.close()
+
+
+def test_mock_log_interrupted_compaction(caplog):
+    """A rotated log left behind is replayed on load and folded in by the next compaction"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.json")
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        sessions = db.MockCollection(log.load(), log=log)
+        for i in range(5):
+            sessions.insert_one({"session_id": f"s{i}", "n": 0})
+        log.close()
+        # Crash right after the rotation: the snapshot was never written
+        os.replace(log.log_path, log.rotated_path)
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        sessions = db.MockCollection(log.load(), log=log)
+        assert len(sessions.data_store) == 5
+        sessions.update_one({"session_id": "s1"}, {"$inc": {"n": 1}})
+
+        # A snapshot that cannot be read is left alone, and the failure is logged
+        with open(path, "w") as f:
+            f.write("[{")
+        log.compact()
+        assert "Compacting" in caplog.text and os.path.exists(log.rotated_path)
+        os.remove(path)
+
+        log.compact()
+        assert not os.path.exists(log.rotated_path)
+        with open(path) as f:
+            assert len(json.load(f)) == 5
+        sessions.insert_one({"session_id": "late"})
+        log.close()
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        docs = log.load()
+        assert len(docs) == 6 and next(d for d in docs if d["session_id"] == "s1")["n"] == 1
+        log.close()
+
+
+def test_mock_indexes_follow_updates():
+    """session_id lookups use the hash index and stay correct as documents change"""
+    sessions = db.MockCollection([{"_id": f"old_{i}", "session_id": f"s{i}"} for i in range(1000)])
+    sessions.create_index("session_id", name="session_id")
+    sessions.insert_one({"session_id": "new", "end_time": None})
+    assert len(sessions._candidates({"session_id": "s500"})) == 1
+    assert len(sessions._candidates({"_id": "old_7"})) == 1
+    assert sessions.find_one({"_id": "old_7"})["session_id"] == "s7"
+
+    assert sessions.update_one({"session_id": "new", "end_time": None}, {"$set": {"end_time": 1}}).matched_count == 1
+    assert sessions.update_one({"session_id": "new", "end_time": None}, {"$set": {"end_time": 2}}).matched_count == 0
+    sessions.update_one({"session_id": "s1"}, {"$set": {"session_id": "renamed"}})
+    assert sessions.find_one({"session_id": "s1"}) is None
+    assert sessions.find_one({"session_id": "renamed"})["_id"] == "old_1"
+    # Unindexed and range terms still filter
+    assert [d["_id"] for d in sessions.find({"session_id": "renamed", "_id": {"$gte": "old_0"}})] == ["old_1"]
+    assert sessions.find_one({"missing": "x"}) is None
+
+
+def test_mock_operators_projection_and_time_ranges():
+    """$ne/$in/ranges filter, counts honour the query and projections copy only named fields"""
+    sessions = db.MockCollection([])
+    sessions.create_index("start_time", name="start_time")
+    for day in range(1, 31):
+        sessions.insert_one({
+            "session_id": f"s{day}",
+            "start_time": datetime(2024, 1, day, 9),
+            "end_time": datetime(2024, 1, day, 10) if day % 2 else None,
+            "duration_minutes": 60.0 if day % 2 else None,
+            "actions": [{"type": "click"}] * day,
+        })
+    sessions.data_store.append({"_id": "legacy", "session_id": "old", "start_time": "2024-01-10T12:00:00"})
+    sessions._indexes["start_time"].add(sessions.data_store[-1])
+
+    window = {"start_time": {"$gte": datetime(2024, 1, 8), "$lte": datetime(2024, 1, 14, 23)}}
+    assert len(sessions._candidates(window)) == 8
+    assert sessions.count_documents(window) == 8
+    assert sessions.count_documents({**window, "end_time": {"$ne": None}}) == 3
+    assert sessions.count_documents({}) == 31
+    assert sessions.count_documents({"session_id": {"$in": ["s1", "s2", "nope"]}}) == 2
+    assert sessions.count_documents({"session_id": {"$nin": ["s1", "s2"]}}) == 29
+    assert sessions.count_documents({"duration_minutes": {"$exists": False}}) == 1
+
+    rows = list(sessions.find({**window, "duration_minutes": {"$ne": None}}, {"duration_minutes": 1, "action_count": 1}))
+    assert len(rows) == 3
+    assert all(set(r) == {"_id", "duration_minutes"} for r in rows)
+    rows[0]["duration_minutes"] = -1
+    assert sessions.count_documents({"duration_minutes": -1}) == 0
+    assert "actions" not in sessions.find_one({"session_id": "s3"}, {"actions": 0})
+    assert sessions.find_one({"session_id": "s3"}, {"session_id": 1, "_id": 0}) == {"session_id": "s3"}
+
+    # The time index follows updates of the indexed field
+    sessions.update_one({"session_id": "s20"}, {"$set": {"start_time": datetime(2024, 1, 9)}})
+    assert sessions.count_documents(window) == 9
+    assert len(sessions._candidates(window)) == 9
+
+
+def test_mock_upsert_and_find_one_and_update():
+    """Upserts seed from the query and $setOnInsert; find_one_and_update returns before/after images"""
+    buckets = db.MockCollection([])
+    buckets.create_index([("session_id", 1), ("seq", 1)])
+    update = {"$push": {"actions": "a"}, "$inc": {"count": 1}, "$setOnInsert": {"created": 1}}
+    result = buckets.update_one({"session_id": "s", "seq": 0}, update, upsert=True)
+    assert result.matched_count == 0 and result.upserted_id is not None
+    result = buckets.update_one({"session_id": "s", "seq": 0}, {**update, "$setOnInsert": {"created": 2}}, upsert=True)
+    assert result.matched_count == 1 and result.upserted_id is None
+    assert buckets.find_one({"session_id": "s"}, {"_id": 0}) == {"session_id": "s", "seq": 0, "created": 1, "actions": ["a", "a"], "count": 2}
+    assert buckets.update_one({"session_id": "t"}, update).matched_count == 0
+    assert buckets.count_documents({}) == 1
+
+    before = buckets.find_one_and_update({"session_id": "s"}, {"$inc": {"count": 1}}, projection={"count": 1, "_id": 0})
+    assert before == {"count": 2}
+    after = buckets.find_one_and_update({"session_id": "s"}, {"$inc": {"count": 1}}, projection={"count": 1, "_id": 0}, return_document=True)
+    assert after == {"count": 4}
+    assert buckets.find_one_and_update({"session_id": "t"}, {"$inc": {"count": 1}}) is None
+
+
+
+def test_mock_upsert_logs_once():
+    """An upsert appends one log record holding the finished document"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session_actions.json")
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        buckets = db.MockCollection(log.load(), log=log)
+        buckets.create_index("session_id")
+        buckets.update_one({"session_id": "s", "seq": 0}, {"$push": {"actions": "a"}, "$inc": {"count": 1}}, upsert=True)
+        buckets.update_one({"session_id": "s", "seq": 0}, {"$set": {"session_id": "".join(["s"])}})
+        log.close()
+        with open(log.log_path) as f:
+            assert len(f.readlines()) == 2
+        log = db.MockLog(path, fsync_interval=60, compact_records=1000)
+        assert [(d["session_id"], d["actions"], d["count"]) for d in log.load()] == [("s", ["a"], 1)]
+        log.close()
+        assert len(buckets._candidates({"session_id": "s"})) == 1
+
+if __name__ == "__main__":
+    # test_handles_resolved_once uses the fixtures in conftest.py, so run through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,57 @@
+"""
+Test script for the streaming /api/export endpoints (runs against the file-backed mock store)
+"""
+import csv
+import io
+import json
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import backend.db as db
+
+
+def test_feedback_export_streams_in_chunks(mock_client):
+    """Every row is exported, newest first, in several chunks rather than one buffer"""
+    client = mock_client()
+    feedback = db.get_feedback_collection()
+    for i in range(2500):
+        feedback.insert_one({"rating": 1 + i % 5, "text": f"line {i}, with comma", "timestamp": datetime(2024, 1, 1) + timedelta(minutes=i)})
+
+    resp = client.get("/api/export/feedback?format=csv")
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "text/csv"
+    assert "attachment" in resp.headers["Content-Disposition"]
+    chunks = list(resp.response)
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO("".join(c.decode() if isinstance(c, bytes) else c for c in chunks))))
+    assert len(rows) == 2500
+    assert rows[0]["text"] == "line 2499, with comma"
+    assert rows[0]["timestamp"] == "2024-01-02T17:39:00"
+
+    lines = client.get("/api/export/feedback").get_data(as_text=True).splitlines()
+    assert len(lines) == 2500
+    assert json.loads(lines[-1]) == {"timestamp": "2024-01-01T00:00:00", "rating": 1, "text": "line 0, with comma", "_id": json.loads(lines[-1])["_id"]}
+
+
+def test_sessions_export_range_and_errors(mock_client):
+    """Sessions export honours the start_time range; bad parameters are client errors"""
+    client = mock_client()
+    sessions = db.get_session_collection()
+    for day in range(1, 11):
+        sessions.insert_one({"session_id": f"s{day}", "start_time": datetime(2024, 3, day, 12), "action_count": day})
+
+    lines = client.get("/api/export/sessions?start=2024-03-04&end=2024-03-06").get_data(as_text=True).splitlines()
+    assert [json.loads(line)["session_id"] for line in lines] == ["s4", "s5", "s6"]
+    empty = client.get("/api/export/sessions?format=csv&start=2025-01-01").get_data(as_text=True)
+    assert empty.strip() == "session_id,start_time,end_time,duration_minutes,action_count,user_agent,ip_address,_id"
+
+    assert client.get("/api/export/sessions?format=xml").status_code == 400
+    assert client.get("/api/export/sessions?start=March").status_code == 400
+
+
+if __name__ == "__main__":
+    # The API tests use the fixtures in conftest.py, so run them through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
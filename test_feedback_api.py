@@ -0,0 +1,121 @@
+"""
+Test script for feedback storage, GET /api/feedback and the timestamp migration (mock store)
+"""
+import sys
+from datetime import datetime
+
+import pytest
+
+import backend.db as db
+from backend.migrate_feedback_timestamps import migrate, parse_timestamp
+
+
+def test_parse_legacy_timestamps():
+    """Every layout older documents used parses to the same naive-UTC datetime"""
+    expected = datetime(2025, 10, 21, 19, 14, 33)
+    for value in ["2025-10-21 19:14:33.000000", "2025-10-21 19:14:33", "2025-10-21T19:14:33",
+                  "Tue, 21 Oct 2025 19:14:33 GMT", "2025-10-21T21:14:33+02:00", expected]:
+        assert parse_timestamp(value) == expected, value
+    assert parse_timestamp("last tuesday") is None
+    assert parse_timestamp(12) is None
+
+
+def test_migration_and_sorted_reads(mock_client):
+    """Legacy strings become datetimes; reads come back newest first in the frontend's layout"""
+    client = mock_client()
+    feedback = db.get_feedback_collection()
+    for ts in ["2024-01-03 09:00:00.000000", "Tue, 02 Jan 2024 09:00:00 GMT", datetime(2024, 1, 4, 9), "2024-01-01T09:00:00", "garbage"]:
+        feedback.insert_one({"rating": 5, "text": "ok", "timestamp": ts})
+
+    dry = migrate(feedback, dry_run=True)
+    assert dry["converted"] == 3 and len(dry["unparsed"]) == 1
+    assert feedback.count_documents({"timestamp": {"$type": "string"}}) == 4
+
+    summary = migrate(feedback, batch_size=2)
+    assert summary == {**dry, "scanned": 4}
+    assert feedback.count_documents({"timestamp": {"$type": "date"}}) == 4
+    assert migrate(feedback)["converted"] == 0
+
+    resp = client.post("/api/feedback", json={"rating": 4, "text": "new"})
+    assert resp.status_code == 201
+    assert isinstance(feedback.find_one({"text": "new"})["timestamp"], datetime)
+
+    feedback.update_one({"timestamp": "garbage"}, {"$set": {"timestamp": datetime(2023, 12, 31)}})
+    listed = client.get("/api/feedback").get_json()["feedback"]
+    assert listed[0]["text"] == "new"
+    assert [f["timestamp"][:10] for f in listed[1:]] == ["2024-01-04", "2024-01-03", "2024-01-02", "2024-01-01", "2023-12-31"]
+    assert listed[1]["timestamp"] == "2024-01-04 09:00:00.000000"
+
+
+def test_keyset_pagination(mock_client):
+    """Following next_after visits every document once, including ties on timestamp"""
+    client = mock_client()
+    feedback = db.get_feedback_collection()
+    for i in range(25):
+        # Pairs of documents share a timestamp
+        feedback.insert_one({"rating": 1 + i % 5, "text": f"t{i}", "timestamp": datetime(2024, 1, 1 + i // 2)})
+
+    seen = []
+    after = None
+    while True:
+        resp = client.get("/api/feedback", query_string={"limit": 7, **({"after": after} if after else {})})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["total_count"] == 25
+        seen += [f["text"] for f in data["feedback"]]
+        after = data["next_after"]
+        if after is None:
+            break
+    assert len(seen) == 25 and len(set(seen)) == 25
+    days = [int(t[1:]) // 2 for t in seen]
+    assert days == sorted(days, reverse=True)
+
+    # Legacy page numbers still work
+    page2 = client.get("/api/feedback?limit=7&page=2").get_json()
+    assert [f["text"] for f in page2["feedback"]] == seen[7:14]
+    assert page2["page"] == 2
+
+    assert "total_count" not in client.get("/api/feedback?count=none").get_json()
+    assert client.get("/api/feedback?count=exact").get_json()["total_count"] == 25
+    feedback.insert_one({"rating": 5, "text": "late", "timestamp": datetime(2024, 2, 1)})
+    # Exact counts are cached briefly; the estimate reads the collection size
+    assert client.get("/api/feedback?count=exact").get_json()["total_count"] == 25
+    assert client.get("/api/feedback").get_json()["total_count"] == 26
+
+    assert client.get("/api/feedback?after=yesterday").status_code == 400
+    assert client.get("/api/feedback?count=some").status_code == 400
+
+
+def test_paging_before_migration(mock_client):
+    """String timestamps switch paging to page numbers instead of silently stopping"""
+    client = mock_client()
+    feedback = db.get_feedback_collection()
+    for i in range(6):
+        feedback.insert_one({"rating": 5, "text": f"new{i}", "timestamp": datetime(2024, 2, 1 + i)})
+    for i in range(4):
+        feedback.insert_one({"rating": 3, "text": f"old{i}", "timestamp": f"2024-01-0{1 + i} 09:00:00.000000"})
+
+    seen = []
+    params = {"limit": 4}
+    while True:
+        data = client.get("/api/feedback", query_string=params).get_json()
+        seen += [f["text"] for f in data["feedback"]]
+        assert data["next_after"] is None
+        if not data.get("next_page"):
+            break
+        assert data["legacy_timestamps"] and "migrate_feedback_timestamps" in data["warning"]
+        params = {"limit": 4, "page": data["next_page"]}
+    assert sorted(seen) == sorted([f"new{i}" for i in range(6)] + [f"old{i}" for i in range(4)])
+
+    token = f"{datetime(2024, 2, 3).isoformat()},x"
+    resp = client.get("/api/feedback", query_string={"after": token})
+    assert resp.status_code == 409 and resp.get_json()["legacy_timestamps"] is True
+
+    migrate(feedback)
+    data = client.get("/api/feedback?limit=4").get_json()
+    assert data["next_after"] and "legacy_timestamps" not in data
+
+
+if __name__ == "__main__":
+    # The API tests use the fixtures in conftest.py, so run them through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,54 @@
+"""
+Test script for the CSV ingestion path in quality_core/ingest.py
+"""
+import pytest
+
+from quality_core.ingest import read_csv_fast, split_blocks
+
+
+CSV_WITH_BAD_LINES = b'id,name\n1,"multi\nline"\n2,b\n3,c,extra\n4,d\n5,e,f,g\n'
+
+
+def _check_engine(engine):
+    result = read_csv_fast(CSV_WITH_BAD_LINES, engine=engine)
+    assert result.frame['id'].tolist() == [1, 2, 4], engine
+    assert result.frame['name'].tolist()[0] == 'multi\nline', engine
+    assert result.skipped_lines == 2, engine
+    assert result.fallback_blocks == 0, engine
+
+
+def test_bad_lines_counted_for_every_engine():
+    """The built-in engines agree on the rows kept and the number of skipped lines"""
+    for engine in ["c", "python"]:
+        _check_engine(engine)
+
+
+def test_bad_lines_counted_with_pyarrow():
+    """pyarrow is optional; when installed it matches the built-in engines"""
+    pytest.importorskip("pyarrow")
+    _check_engine("pyarrow")
+
+
+def test_blocks_respect_quoted_newlines():
+    """Block boundaries never fall inside a quoted field"""
+    header, blocks = split_blocks(CSV_WITH_BAD_LINES, block_bytes=3)
+    assert header == b'id,name\n'
+    assert blocks[0] == b'1,"multi\nline"\n'
+    assert b''.join(blocks) == CSV_WITH_BAD_LINES[len(header):]
+
+
+def test_failing_blocks_fall_back_to_python():
+    """A tokenizer error only sends the affected block to the python engine"""
+    data = b'a,b\n1,2\n3,4,5\n6,"unterminated\n7,8\n'
+    result = read_csv_fast(data, engine="c", block_bytes=4)
+    assert result.frame.values.tolist() == [[1, 2]]
+    assert result.skipped_lines == 1
+    assert result.fallback_blocks == 1
+
+
+if __name__ == "__main__":
+    test_bad_lines_counted_for_every_engine()
+    test_bad_lines_counted_with_pyarrow()
+    test_blocks_respect_quoted_newlines()
+    test_failing_blocks_fall_back_to_python()
+    print("✅ Ingest tests passed")
@@ -0,0 +1,191 @@
+"""
+Test script for the validation job endpoints (/api/validate)
+"""
+import io
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import backend.app as app_module
+import backend.jobs as jobs
+from quality_core.batch import validate_file
+
+
+SAMPLE = Path(__file__).parent / "test_sample_data.csv"
+
+
+def _wait(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/api/validate/{job_id}").get_json()["status"]
+        if status in jobs.FINISHED_STATES:
+            return status
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_matches_batch_validation(mock_client, mock_store):
+    """A queued job reports the same counts and issue rows as the batch tool"""
+    client = mock_client()
+    for stream in ("false", "true"):
+        resp = client.post("/api/validate", data={"file": (open(SAMPLE, "rb"), SAMPLE.name), "stream": stream}, content_type="multipart/form-data")
+        assert resp.status_code == 202
+        job = resp.get_json()
+        assert job["status"] == jobs.JOB_QUEUED and job["result_url"].endswith("/result")
+        assert _wait(client, job["job_id"]) == jobs.JOB_DONE
+
+        result = client.get(job["result_url"]).get_json()
+        expected = validate_file(SAMPLE, mock_store, stream=stream == "true")
+        assert result["rows"] == expected["rows"]
+        assert result["counts"] == expected["counts"]
+        assert result["rule_hits"] == expected["rule_hits"]
+        assert result["daily"] == expected["daily"]
+        assert "issues_file" not in result
+
+        issues = client.get(result["issues_url"])
+        assert issues.status_code == 200
+        assert issues.data == (mock_store / f"{SAMPLE.name}.issues.csv").read_bytes()
+
+
+def test_job_errors(mock_client):
+    """Bad uploads are rejected up front; unknown, unfinished and failed jobs say so"""
+    client = mock_client()
+    form = lambda name, **extra: {"file": (io.BytesIO(b"a,b\n1,2\n"), name), **extra}
+    assert client.post("/api/validate", data={}, content_type="multipart/form-data").status_code == 400
+    assert client.post("/api/validate", data=form("data.json"), content_type="multipart/form-data").status_code == 400
+    assert client.post("/api/validate", data=form("data.csv", duplicate_mode="some"), content_type="multipart/form-data").status_code == 400
+    assert client.post("/api/validate", data=form("data.csv", identity_pairs="a"), content_type="multipart/form-data").status_code == 400
+
+    assert client.get("/api/validate/deadbeef").status_code == 404
+    assert client.get("/api/validate/..%2Fjobs/result").status_code == 404
+    assert client.get("/api/validate/deadbeef/issues").status_code == 404
+
+    # Not picked up by a worker: the result is not ready yet
+    queued = jobs.JOBS_DIR / "queuedjob"
+    queued.mkdir(parents=True)
+    jobs._write_state(queued, job_id="queuedjob", status=jobs.JOB_QUEUED, file="x.csv", owner_pid=os.getppid())
+    assert client.get("/api/validate/queuedjob/result").status_code == 409
+
+    resp = client.post("/api/validate", data={"file": (io.BytesIO(b""), "empty.csv")}, content_type="multipart/form-data")
+    job_id = resp.get_json()["job_id"]
+    assert _wait(client, job_id) == jobs.JOB_FAILED
+    failed = client.get(f"/api/validate/{job_id}/result")
+    assert failed.status_code == 422 and "empty" in failed.get_json()["error"]
+
+    # Finished jobs past their TTL are cleaned up
+    assert jobs.prune_jobs(ttl_seconds=-1) == 1
+    assert client.get(f"/api/validate/{job_id}").status_code == 404
+    assert client.get("/api/validate/queuedjob").status_code == 200
+
+
+def test_oversized_upload_rejected(mock_client, monkeypatch):
+    """Uploads above MAX_UPLOAD_MB get a JSON 413 and never reach the jobs directory"""
+    monkeypatch.setattr(app_module, "MAX_UPLOAD_MB", 0)
+    client = mock_client()
+    resp = client.post("/api/validate", data={"file": (io.BytesIO(b"a,b\n1,2\n"), "data.csv")}, content_type="multipart/form-data")
+    assert resp.status_code == 413 and "MB" in resp.get_json()["error"]
+    assert not jobs.JOBS_DIR.exists() or not any(jobs.JOBS_DIR.iterdir())
+
+
+def test_dead_worker_replaces_pool(mock_client):
+    """A worker killed mid-flight breaks the pool; the next upload gets a new one"""
+    client = mock_client()
+    upload = lambda: client.post("/api/validate", data={"file": (open(SAMPLE, "rb"), SAMPLE.name)}, content_type="multipart/form-data")
+    assert _wait(client, upload().get_json()["job_id"]) == jobs.JOB_DONE
+
+    pool = jobs._pool()
+    for process in list(pool._processes.values()):
+        process.kill()
+    deadline = time.time() + 30
+    while not pool._broken and time.time() < deadline:
+        time.sleep(0.05)
+    assert pool._broken
+
+    resp = upload()
+    assert resp.status_code == 202
+    assert _wait(client, resp.get_json()["job_id"]) == jobs.JOB_DONE
+    assert jobs._pool() is not pool
+
+
+def test_stale_jobs_fail(mock_client):
+    """Jobs whose API process is gone, that left the pool, or whose worker stopped beating are failed, then pruned"""
+    client = mock_client()
+    dead_pid = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead_pid.wait()
+    jobs_owned = (
+        ("orphaned", dead_pid.pid), ("lost", os.getpid()),
+        ("stuck", os.getppid()), ("busy", os.getppid()), ("waiting", os.getppid()),
+    )
+    for job_id, owner_pid in jobs_owned:
+        job_dir = jobs.JOBS_DIR / job_id
+        job_dir.mkdir(parents=True)
+        jobs._write_state(job_dir, job_id=job_id, status=jobs.JOB_RUNNING, file="x.csv", owner_pid=owner_pid)
+    # Started long ago; only "busy" still has a live worker touching its heartbeat
+    old = time.time() - jobs.JOB_TIMEOUT_SECONDS - 60
+    for job_id in ("stuck", "busy"):
+        os.utime(jobs.JOBS_DIR / job_id / "job.json", (old, old))
+    (jobs.JOBS_DIR / "busy" / "heartbeat").touch()
+
+    # A status request notices an orphaned job right away
+    orphaned = client.get("/api/validate/orphaned").get_json()
+    assert orphaned["status"] == jobs.JOB_FAILED and orphaned["error"].startswith("Interrupted")
+    assert client.get("/api/validate/orphaned/result").status_code == 422
+
+    # Pruning fails the lost and stuck jobs too; all three then expire like finished jobs
+    assert jobs.prune_jobs() == 0
+    assert jobs.get_job("lost")["status"] == jobs.JOB_FAILED
+    assert jobs.get_job("stuck")["status"] == jobs.JOB_FAILED
+    assert jobs.prune_jobs(ttl_seconds=-1) == 3
+    for job_id in ("busy", "waiting"):
+        assert client.get(f"/api/validate/{job_id}").get_json()["status"] == jobs.JOB_RUNNING
+
+
+def test_job_state_writes(mock_store):
+    """Concurrent state writers all land, leave no temp files, and never reopen a finished job"""
+    job_dir = jobs.JOBS_DIR / "racy"
+    job_dir.mkdir(parents=True)
+    jobs._write_state(job_dir, job_id="racy", status=jobs.JOB_RUNNING, file="x.csv", owner_pid=os.getpid())
+    writers = [jobs.threading.Thread(target=jobs._write_state, args=(job_dir,), kwargs={f"key{i}": i}) for i in range(20)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    state = jobs._read_state(job_dir)
+    assert all(state[f"key{i}"] == i for i in range(20))
+    assert not list(job_dir.glob("*.tmp"))
+
+    jobs._write_state(job_dir, status=jobs.JOB_DONE)
+    # "racy" is not in this process's pool, so the stale check would fail it if it could
+    assert jobs._fail_if_stale(job_dir, state, 0)["status"] == jobs.JOB_DONE
+    assert jobs.get_job("racy")["status"] == jobs.JOB_DONE
+    assert "error" not in jobs.get_job("racy")
+
+
+def test_long_job_is_not_failed(mock_client, monkeypatch):
+    """A job still running in this server's pool survives the timeout and its worker keeps beating"""
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.05)
+    job_dir = jobs.JOBS_DIR / "slow"
+    job_dir.mkdir(parents=True)
+    jobs._write_state(job_dir, job_id="slow", status=jobs.JOB_QUEUED, file="x.csv", owner_pid=os.getpid())
+    stop = jobs.threading.Event()
+    beat = jobs.threading.Thread(target=jobs._heartbeat, args=(job_dir, stop), daemon=True)
+    beat.start()
+    jobs._futures["slow"] = None
+    try:
+        time.sleep(0.2)
+        assert (job_dir / "heartbeat").exists()
+        assert jobs.prune_jobs(timeout_seconds=0) == 0
+        assert jobs.get_job("slow")["status"] == jobs.JOB_QUEUED
+    finally:
+        stop.set()
+        jobs._futures.pop("slow")
+    assert jobs.prune_jobs(ttl_seconds=3600) == 0
+    assert jobs.get_job("slow")["status"] == jobs.JOB_FAILED
+
+if __name__ == "__main__":
+    # The API tests use the fixtures in conftest.py, so run them through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
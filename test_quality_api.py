@@ -0,0 +1,151 @@
+"""
+Test script for the /api/quality endpoint (runs against the file-backed mock store)
+"""
+import sys
+from datetime import datetime
+
+import pytest
+
+import backend.db as db
+
+
+def test_quality_range_and_datasets(mock_client, mock_store):
+    """Rollups inside the range are summed per day across datasets"""
+    client = mock_client()
+    collection = db.get_collection()
+    for dataset, day, counts in [
+        ("orders", 1, (10, 2, 1)),
+        ("cards", 1, (5, 0, 3)),
+        ("orders", 2, (7, 1, 0)),
+        ("orders", 5, (9, 9, 9)),
+    ]:
+        valid, warning, error = counts
+        collection.insert_one({"dataset": dataset, "date": datetime(2024, 1, day), "valid": valid, "warning": warning, "error": error})
+    assert (mock_store / "quality_stats.log").exists()
+
+    resp = client.get("/api/quality?start=2024-01-01&end=2024-01-02")
+    assert resp.status_code == 200
+    assert resp.get_json()["data"] == [
+        {"date": "2024-01-01", "valid": 15, "warning": 2, "error": 4},
+        {"date": "2024-01-02", "valid": 7, "warning": 1, "error": 0},
+    ]
+
+    resp = client.get("/api/quality?start=2024-01-01&end=2024-01-31&dataset=cards")
+    assert [d["date"] for d in resp.get_json()["data"]] == ["2024-01-01"]
+
+    # Replayed from disk, the range still matches
+    db.init_db(force=True)
+    resp = client.get("/api/quality?start=2024-01-05&end=2024-01-05")
+    assert resp.get_json()["data"] == [{"date": "2024-01-05", "valid": 9, "warning": 9, "error": 9}]
+
+
+def test_store_upload_rollups(mock_client):
+    """Uploads are upserted per (date, dataset, rules); re-uploads and other files never replace stored days silently"""
+    client = mock_client()
+    daily = [
+        {"date": "2024-03-01", "valid": 8, "warning": 1, "error": 1},
+        {"date": "2024-03-02", "valid": 5, "warning": 0, "error": 2},
+    ]
+    body = {"dataset": "orders.csv", "fingerprint": "abc", "daily": daily}
+    resp = client.post("/api/quality", json=body)
+    assert resp.status_code == 201 and resp.get_json()["stored"] == 2
+
+    collection = db.get_collection()
+    stamp = collection.find_one({"dataset": "orders.csv", "date": datetime(2024, 3, 1)})["updated_at"]
+    resp = client.post("/api/quality", json=body)
+    assert resp.status_code == 200 and resp.get_json()["stored"] == 0
+    assert collection.find_one({"dataset": "orders.csv", "date": datetime(2024, 3, 1)})["updated_at"] == stamp
+
+    # Another file with the same name only adds the days not stored yet
+    other = {"dataset": "orders.csv", "fingerprint": "def", "daily": [
+        {"date": "2024-03-02", "valid": 7, "warning": 0, "error": 0},
+        {"date": "2024-03-03", "valid": 4, "warning": 0, "error": 0},
+    ]}
+    resp = client.post("/api/quality", json=other)
+    assert resp.status_code == 201 and resp.get_json()["stored"] == 1 and resp.get_json()["skipped"] == ["2024-03-02"]
+    assert client.post("/api/quality", json={**other, "daily": other["daily"][:1]}).get_json()["stored"] == 0
+    assert collection.find_one({"dataset": "orders.csv", "date": datetime(2024, 3, 2)})["valid"] == 5
+
+    # Replacing stored days has to be asked for
+    revised = {**other, "daily": other["daily"][:1], "replace": True}
+    assert client.post("/api/quality", json=revised).status_code == 201
+    assert collection.count_documents({"dataset": "orders.csv"}) == 3
+    resp = client.get("/api/quality?start=2024-03-01&end=2024-03-03")
+    assert resp.get_json()["data"] == [
+        {"date": "2024-03-01", "valid": 8, "warning": 1, "error": 1},
+        {"date": "2024-03-02", "valid": 7, "warning": 0, "error": 0},
+        {"date": "2024-03-03", "valid": 4, "warning": 0, "error": 0},
+    ]
+
+    for bad in [
+        {**body, "dataset": ""},
+        {**body, "rules": 1},
+        {**body, "fingerprint": None},
+        {**body, "daily": []},
+        {**body, "daily": [{"date": "03/01/2024", "valid": 1}]},
+        {**body, "daily": [{"date": "2024-03-01", "valid": "many"}]},
+        {**body, "daily": [{"date": "2024-03-01", "valid": -1}]},
+        {**body, "daily": daily + daily[:1]},
+    ]:
+        assert client.post("/api/quality", json=bad).status_code == 400, bad
+
+
+def test_rule_variants_counted_once(mock_client):
+    """One file stored under several rule settings is summed once per day, using its latest variant"""
+    client = mock_client()
+    day = {"date": "2024-04-01", "valid": 8, "warning": 1, "error": 1}
+    for rules, valid in (("duplicates by all columns", 8), ("duplicates by order_id", 6)):
+        body = {"dataset": "orders.csv", "rules": rules, "fingerprint": "abc", "daily": [{**day, "valid": valid}]}
+        assert client.post("/api/quality", json=body).status_code == 201
+    other = {"dataset": "cards.csv", "fingerprint": "xyz", "daily": [{**day, "valid": 1}]}
+    assert client.post("/api/quality", json=other).status_code == 201
+    assert db.get_collection().count_documents({"dataset": "orders.csv"}) == 2
+
+    data = client.get("/api/quality?start=2024-04-01&end=2024-04-01").get_json()["data"]
+    assert data == [{"date": "2024-04-01", "valid": 7, "warning": 2, "error": 2}]
+    data = client.get("/api/quality?start=2024-04-01&end=2024-04-01&dataset=orders.csv&rules=duplicates by all columns").get_json()["data"]
+    assert data[0]["valid"] == 8
+
+    compare = client.get("/api/quality/compare?start=2024-04-01&end=2024-04-01").get_json()
+    assert compare["current"]["valid"] == 7 and compare["current"]["total"] == 11
+    compare = client.get("/api/quality/compare?start=2024-04-01&end=2024-04-01&dataset=orders.csv&rules=duplicates by all columns").get_json()
+    assert compare["current"]["valid"] == 8
+
+
+def test_previous_period_comparison(mock_client):
+    """The previous window is as long as the requested one and ends the day before it"""
+    client = mock_client()
+    collection = db.get_collection()
+    for dataset, day, counts in [
+        ("orders", 1, (1, 1, 1)),     # before both windows
+        ("orders", 4, (6, 2, 2)),     # previous: Jan 4-10
+        ("cards", 10, (100, 0, 0)),
+        ("orders", 11, (8, 1, 1)),    # current: Jan 11-17
+        ("orders", 17, (2, 0, 0)),
+        ("orders", 18, (50, 50, 50)),
+    ]:
+        valid, warning, error = counts
+        collection.insert_one({"dataset": dataset, "date": datetime(2024, 1, day), "valid": valid, "warning": warning, "error": error})
+
+    data = client.get("/api/quality/compare?start=2024-01-11&end=2024-01-17&dataset=orders").get_json()
+    assert (data["previous_start"], data["previous_end"]) == ("2024-01-04", "2024-01-10")
+    assert data["current"] == {"valid": 10, "warning": 1, "error": 1, "total": 12, "dq_score": 83.33}
+    assert data["previous"] == {"valid": 6, "warning": 2, "error": 2, "total": 10, "dq_score": 60.0}
+
+    data = client.get("/api/quality/compare?start=2024-01-11&end=2024-01-17").get_json()
+    assert data["previous"]["valid"] == 106
+    data = client.get("/api/quality/compare?start=2024-03-01&end=2024-03-31").get_json()
+    assert data["previous"] == {"valid": 0, "warning": 0, "error": 0, "total": 0, "dq_score": None}
+    assert client.get("/api/quality/compare?start=2024-02-01&end=2024-01-01").status_code == 400
+
+
+def test_quality_rejects_bad_dates(mock_client):
+    """Malformed or inverted ranges are client errors"""
+    client = mock_client()
+    assert client.get("/api/quality?start=01/02/2024").status_code == 400
+    assert client.get("/api/quality?start=2024-02-01&end=2024-01-01").status_code == 400
+
+
+if __name__ == "__main__":
+    # The API tests use the fixtures in conftest.py, so run them through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
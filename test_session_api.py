@@ -0,0 +1,105 @@
+"""
+Test script for the session endpoints (runs against the file-backed mock store)
+"""
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import backend.db as db
+
+
+def test_actions_are_bucketed(mock_client):
+    """Actions fill fixed-size buckets; the session document only keeps counters"""
+    client = mock_client(actions_per_bucket=3)
+    session_id = client.post("/api/session/start", json={}).get_json()["session_id"]
+    for i in range(7):
+        resp = client.post("/api/session/action", json={"session_id": session_id, "action": f"a{i}", "metadata": {"i": i}})
+        assert resp.status_code == 200
+
+    summary = db.get_session_collection().find_one({"session_id": session_id})
+    assert summary["action_count"] == 7
+    assert "actions" not in summary
+    buckets = sorted(db.get_session_actions_collection().find({"session_id": session_id}), key=lambda b: b["seq"])
+    assert [(b["seq"], b["count"]) for b in buckets] == [(0, 3), (1, 3), (2, 1)]
+    assert [a["action"] for b in buckets for a in b["actions"]] == [f"a{i}" for i in range(7)]
+    assert all(b["session_start"] == summary["start_time"] for b in buckets)
+
+    assert client.post("/api/session/action", json={"session_id": "nope", "action": "x"}).status_code == 404
+    assert client.post("/api/session/end", json={"session_id": session_id}).status_code == 200
+    data = client.get("/api/analytics?breakdown=action").get_json()
+    assert data["total_sessions"] == 1 and len(data["by_action"]) == 7
+
+
+def test_batch_actions(mock_client):
+    """One request records actions for several sessions across bucket boundaries"""
+    client = mock_client(actions_per_bucket=4)
+    first = client.post("/api/session/start", json={"session_id": "first"}).get_json()["session_id"]
+    second = client.post("/api/session/start", json={"session_id": "second"}).get_json()["session_id"]
+    client.post("/api/session/action", json={"session_id": first, "action": "single"})
+
+    actions = [{"action": f"f{i}"} for i in range(6)]
+    actions += [{"session_id": second, "action": "s0", "timestamp": "2024-05-01T10:00:00+02:00"}]
+    actions += [{"session_id": "ghost", "action": "g0"}]
+    resp = client.post("/api/session/actions", json={"session_id": first, "actions": actions})
+    assert resp.status_code == 200
+    assert resp.get_json() == {"message": "Actions tracked successfully", "accepted": 7, "rejected": 1, "unknown_sessions": ["ghost"]}
+
+    sessions = db.get_session_collection()
+    assert sessions.find_one({"session_id": first})["action_count"] == 7
+    assert sessions.find_one({"session_id": "ghost"}) is None
+    buckets = db.get_session_actions_collection()
+    assert [(b["seq"], b["count"]) for b in sorted(buckets.find({"session_id": first}), key=lambda b: b["seq"])] == [(0, 4), (1, 3)]
+    stored = buckets.find_one({"session_id": second})["actions"][0]
+    assert stored["timestamp"] == datetime(2024, 5, 1, 8, 0)
+
+    # Nothing is written unless the whole batch is valid
+    bad = [{"session_id": first, "action": "ok"}, {"session_id": first}]
+    assert client.post("/api/session/actions", json={"actions": bad}).status_code == 400
+    assert client.post("/api/session/actions", json={"actions": [{"session_id": first, "action": "x", "timestamp": "yesterday"}]}).status_code == 400
+    assert client.post("/api/session/actions", json={"actions": []}).status_code == 400
+    assert sessions.find_one({"session_id": first})["action_count"] == 7
+    assert client.post("/api/session/actions", json={"actions": [{"session_id": "ghost", "action": "g"}]}).status_code == 404
+
+
+def test_failed_bucket_writes_release_counts(mock_client):
+    """action_count only keeps the actions whose bucket writes succeeded"""
+    class FailingBuckets(db.MockCollection):
+        def bulk_write(self, requests, ordered=True, **kwargs):
+            # The first bucket update lands, the rest fail
+            super().bulk_write(requests[:1], ordered=ordered)
+            raise BulkWriteError({"writeErrors": [{"index": i, "errmsg": "boom"} for i in range(1, len(requests))]})
+
+    client = mock_client(actions_per_bucket=2)
+    session_id = client.post("/api/session/start", json={}).get_json()["session_id"]
+    buckets = db.get_session_actions_collection()
+    db._collections["session_actions"] = FailingBuckets(buckets.data_store)
+    resp = client.post("/api/session/actions", json={"session_id": session_id, "actions": [{"action": f"a{i}"} for i in range(5)]})
+    assert resp.status_code == 500
+    assert db.get_session_collection().find_one({"session_id": session_id})["action_count"] == 2
+    assert sum(b["count"] for b in db.get_session_actions_collection().find({"session_id": session_id})) == 2
+
+
+def test_end_session_once(mock_client):
+    """Ending computes the duration from start_time in the same write; a second end is a 404"""
+    client = mock_client()
+    client.post("/api/session/start", json={"session_id": "tab"})
+    sessions = db.get_session_collection()
+    sessions.update_one({"session_id": "tab"}, {"$set": {"start_time": datetime.utcnow() - timedelta(minutes=90)}})
+
+    resp = client.post("/api/session/end", json={"session_id": "tab"})
+    assert resp.status_code == 200
+    assert 89.9 < resp.get_json()["duration_minutes"] < 90.1
+    doc = sessions.find_one({"session_id": "tab"})
+    assert doc["duration_minutes"] == resp.get_json()["duration_minutes"]
+    assert doc["end_time"].isoformat() == resp.get_json()["end_time"]
+
+    assert client.post("/api/session/end", json={"session_id": "tab"}).status_code == 404
+    assert client.post("/api/session/end", json={"session_id": "missing"}).status_code == 404
+    assert sessions.find_one({"session_id": "tab"})["duration_minutes"] == doc["duration_minutes"]
+
+
+if __name__ == "__main__":
+    # The API tests use the fixtures in conftest.py, so run them through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,101 @@
+"""
+Test script for chunked validation in quality_core/streaming.py
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+from quality_core.streaming import HashCounter, PairHashes, stream_validate
+from quality_core.validation import aggregate_daily, classify_rows
+
+
+def _csv_bytes():
+    df = pd.DataFrame({
+        'txn_id': ['1', '1', '2', '3', '3', '4', '5', '6', '7', '7'],
+        'user_id': ['u1', 'u1', 'u2', 'u3', 'u3', 'u4', 'u5', 'u5', 'u6', 'u6'],
+        'card_id': ['c1', 'c1', 'c2', 'c3', 'c3', 'c4', 'c5', 'c9', 'c6', 'c6'],
+        'amount': ['10', '10', '-1', '5', '6', None, '7', '8', '9', '9'],
+        'name': ['a', 'a', 'b', None, 'c', 'd', 'e', 'f', 'g', 'g'],
+        'created_date': ['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-02', 'bad',
+                         '2024-01-03', '2024-01-03', '2024-01-04', '2024-01-04', '2024-01-04'],
+    })
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
+
+
+def test_chunked_matches_in_memory():
+    """Tiny chunks give the same counts and daily series as one full pass"""
+    data = _csv_bytes()
+    df = pd.read_csv(io.BytesIO(data), dtype=str)
+    for mode in ["By ID Column", "By All Columns"]:
+        full = classify_rows(df, 'txn_id', mode)
+        summary = stream_validate(data, 'txn_id', mode, chunk_rows=3, sample_rows=4)
+        assert summary.chunks == 4
+        assert summary.rows == len(df)
+        assert summary.counts == full.counts(), mode
+        assert summary.date_col == 'created_date'
+        assert summary.rule_hits['identity_conflicts'] == int(full.validation.identity_conflicts.sum())
+        dates = pd.to_datetime(df['created_date'], format='%Y-%m-%d', errors='coerce')
+        dated = dates.notna().to_numpy()
+        assert summary.daily.equals(aggregate_daily(full.status[dated], dates[dated]))
+        assert summary.sample['record_id'].tolist() == [1, 2, 3, 4]
+
+
+def test_state_spans_the_whole_file():
+    """Conflicts split across chunks are found; a blank first chunk does not hide the date column"""
+    n = 40
+    df = pd.DataFrame({
+        'txn_id': [str(i) for i in range(n)],
+        'user_id': [f'u{i % 10}' for i in range(n)],
+        # u3 gets a second card only in the last chunk; c7 is shared by u7 and u8 there too
+        'card_id': [f'c{i % 10}' for i in range(n - 2)] + ['c99', 'c7'],
+        'amount': ['1'] * n,
+        'created_date': [None] * 10 + [f'03/{1 + i % 28:02d}/2024' for i in range(n - 10)],
+    })
+    df.loc[n - 2, 'user_id'] = 'u3'
+    df.loc[n - 1, 'user_id'] = 'u8'
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    data = buf.getvalue()
+    frame = pd.read_csv(io.BytesIO(data), dtype=str)
+
+    full = classify_rows(frame, 'txn_id', 'By ID Column')
+    summary = stream_validate(data, 'txn_id', 'By ID Column', chunk_rows=10)
+    assert summary.chunks == 4
+    assert summary.counts == full.counts()
+    assert summary.rule_hits['identity_conflicts'] == int(full.validation.identity_conflicts.sum()) > 0
+    assert summary.date_col == 'created_date'
+    assert int(summary.daily[['valid', 'warning', 'error']].to_numpy().sum()) == n - 10
+
+
+def test_pair_hashes_across_merges():
+    """Values with several distinct partners are found on either side, after merges"""
+    pairs = PairHashes()
+    for i in range(40):
+        pairs.add(np.array([i, i], dtype=np.uint64), np.array([100 + i, 100 + i], dtype=np.uint64))
+    pairs.add(np.array([5], dtype=np.uint64), np.array([999], dtype=np.uint64))
+    pairs.add(np.array([77], dtype=np.uint64), np.array([100], dtype=np.uint64))
+    assert pairs.linked_to_many(0).tolist() == [5]
+    assert pairs.linked_to_many(1).tolist() == [100]
+
+
+def test_hash_counter_across_merges():
+    """Repeats are found within a chunk, across chunks and across merges"""
+    counter = HashCounter()
+    for i in range(40):
+        counter.add(np.array([i, 1000 + i, 1000 + i], dtype=np.uint64))
+    counter.add(np.array([5, 39], dtype=np.uint64))
+    repeated = counter.repeated()
+    assert 5 in repeated and 39 in repeated and 1000 in repeated
+    assert 6 not in repeated
+    assert len(repeated) == 42
+
+
+if __name__ == "__main__":
+    test_chunked_matches_in_memory()
+    test_state_spans_the_whole_file()
+    test_pair_hashes_across_merges()
+    test_hash_counter_across_merges()
+    print("✅ Streaming tests passed")
@@ -0,0 +1,156 @@
+"""
+Test script for the row-level validation rules in quality_core/validation.py
+"""
+import numpy as np
+import pandas as pd
+
+from quality_core.validation import (
+    ISSUE_IDENTITY_CONFLICT,
+    ISSUE_INVALID_DATE,
+    ISSUE_MISSING_CRITICAL,
+    ISSUE_NEGATIVE_AMOUNT,
+    DuplicateIndex,
+    aggregate_daily,
+    classify_rows,
+    parse_identity_pairs,
+    validate_data_quality,
+)
+
+
+def _sample():
+    return pd.DataFrame({
+        'txn_id': [1, 2, 3, 4, 5],
+        'user_id': ['u1', 'u1', 'u2', 'u3', 'u4'],
+        'card_id': ['c1', 'c2', 'c3', 'c4', 'c4'],
+        'amount': [10.0, -5.0, None, 20.0, 30.0],
+        'created_date': ['2024-01-01', '2024-01-02', 'not a date', '2024-01-04', None],
+    }, index=[10, 11, 12, 13, 14])
+
+
+def test_masks_and_issue_table():
+    """Masks come straight from the rules and the issue table uses integer codes"""
+    df = _sample()
+    result = validate_data_quality(df, 'txn_id')
+
+    assert result.missing_critical.tolist() == [False, False, True, False, True]
+    assert result.invalid_formats.tolist() == [False, True, True, False, False]
+    # u1 -> two cards, c4 -> two users
+    assert result.identity_conflicts.tolist() == [True, True, False, True, True]
+    assert result.valid_rows.tolist() == []
+
+    assert result.issues['issue'].dtype == np.int8
+    codes = sorted(result.issues['issue'].tolist())
+    assert codes.count(ISSUE_MISSING_CRITICAL) == 2
+    assert codes.count(ISSUE_NEGATIVE_AMOUNT) == 1
+    assert codes.count(ISSUE_INVALID_DATE) == 1
+    assert codes.count(ISSUE_IDENTITY_CONFLICT) == 4
+
+
+def test_records_built_on_demand():
+    """The legacy dict form is rebuilt from the compact table with index labels"""
+    df = _sample()
+    records = validate_data_quality(df, 'txn_id').to_records(df)
+
+    assert {'row': 11, 'field': 'amount', 'issue': 'Negative amount: -5.0'} in records
+    assert {'row': 12, 'field': 'created_date', 'issue': 'Invalid date format: not a date'} in records
+    assert {'row': 10, 'field': 'user_id', 'issue': 'user_id u1 linked to multiple card_id values'} in records
+    assert len(validate_data_quality(df, 'txn_id').to_records(df, limit=2)) == 2
+
+
+def test_configurable_identity_pairs():
+    """Extra pairs are checked in both directions; each issue names the partner column"""
+    df = pd.DataFrame({
+        'txn_id': [1, 2, 3, 4],
+        'user_id': ['u1', 'u1', 'u2', 'u3'],
+        'card_id': ['c1', 'c1', 'c2', 'c3'],
+        'device_id': ['d1', 'd2', 'd3', 'd3'],
+    })
+    assert not validate_data_quality(df, 'txn_id').identity_conflicts.any()
+
+    pairs = parse_identity_pairs("user_id:card_id, user_id:device_id")
+    assert pairs == [('user_id', 'card_id'), ('user_id', 'device_id')]
+    result = validate_data_quality(df, 'txn_id', identity_pairs=pairs)
+    # u1 -> d1/d2, d3 -> u2/u3
+    assert result.identity_conflicts.tolist() == [True, True, True, True]
+    records = result.to_records(df)
+    assert len(records) == 4
+    assert {'row': 0, 'field': 'user_id', 'issue': 'user_id u1 linked to multiple device_id values'} in records
+    assert {'row': 2, 'field': 'device_id', 'issue': 'device_id d3 linked to multiple user_id values'} in records
+
+    # A field in several pairs gets one issue per partner it conflicts with
+    df.loc[1, 'card_id'] = 'c9'
+    records = validate_data_quality(df, 'txn_id', identity_pairs=pairs).to_records(df)
+    assert [r['issue'] for r in records if r['row'] == 1 and r['field'] == 'user_id'] == [
+        'user_id u1 linked to multiple card_id values', 'user_id u1 linked to multiple device_id values',
+    ]
+    assert parse_identity_pairs("") == [('user_id', 'card_id')]
+
+
+def test_empty_frame():
+    """Empty input yields empty masks and no issues"""
+    result = validate_data_quality(pd.DataFrame({'amount': []}))
+    assert result.issues.empty
+    assert result.error_mask.empty
+
+
+def test_classify_rows_single_status_per_row():
+    """Each row gets exactly one status; errors win over warnings"""
+    df = pd.DataFrame({
+        'ID': [1, 1, 2, 2, 3, 4],
+        'Name': ['a', 'a', 'b', 'c', None, 'd'],
+        'JoinDate': ['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-02', '2024-01-03', '2024-01-03'],
+    })
+    by_id = classify_rows(df, 'ID', "By ID Column")
+    # rows 0/1 identical -> error, rows 2/3 same ID different payload -> warning,
+    # row 4 missing Name -> warning
+    assert by_id.status.tolist() == [2, 2, 1, 1, 1, 0]
+    assert by_id.issue.tolist() == [2, 2, 2, 2, 1, 0]
+    assert by_id.first_missing.tolist() == [None, None, None, None, 'Name', None]
+    assert by_id.counts() == {"valid": 1, "warning": 3, "error": 2}
+
+    by_all = classify_rows(df, None, "By All Columns")
+    assert by_all.status.tolist() == [2, 2, 0, 0, 1, 0]
+
+
+def test_aggregate_daily_slices_match_full_counts():
+    """Slicing status codes by date gives the same totals as the per-day series"""
+    df = pd.DataFrame({
+        'ID': [1, 1, 2, 3],
+        'Name': ['a', 'a', None, 'c'],
+        'JoinDate': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-03']),
+    })
+    classified = classify_rows(df, 'ID')
+    view = (df['JoinDate'] >= '2024-01-02').to_numpy()
+    daily = aggregate_daily(classified.status[view], df['JoinDate'][view])
+    assert daily['date'].dt.day.tolist() == [2, 3]
+    assert daily[['valid', 'warning', 'error']].sum().to_dict() == classified.counts(view)
+
+
+def test_duplicate_index_matches_pandas():
+    """Fingerprint lookups agree with DataFrame.duplicated on the full frame and on subsets"""
+    df = pd.DataFrame({
+        'ID': [1, 1, 2, 2, 3, 1, None, None],
+        'Name': ['a', 'a', 'b', 'c', None, 'a', 'x', 'x'],
+    })
+    index = DuplicateIndex(df, 'ID')
+    assert index.duplicated().tolist() == df.duplicated(keep=False).tolist()
+    assert index.duplicated(by_id=True).tolist() == df.duplicated(subset=['ID'], keep=False).tolist()
+    assert index.duplicate_count() == int(df.duplicated().sum())
+
+    subset = np.array([False, True, True, True, False, True, True, False])
+    view = df[subset]
+    assert index.duplicated(rows=subset).tolist() == view.duplicated(keep=False).tolist()
+    assert index.duplicated(by_id=True, rows=subset).tolist() == view.duplicated(subset=['ID'], keep=False).tolist()
+    assert index.strong().tolist() == [True, True, False, False, False, True, True, True]
+    assert index.weak().tolist() == [False, False, True, True, False, False, False, False]
+
+
+if __name__ == "__main__":
+    test_masks_and_issue_table()
+    test_records_built_on_demand()
+    test_configurable_identity_pairs()
+    test_empty_frame()
+    test_classify_rows_single_status_per_row()
+    test_aggregate_daily_slices_match_full_counts()
+    test_duplicate_index_matches_pandas()
+    print("✅ Validation tests passed")